@@ -0,0 +1,170 @@
+"""
+Autenticação JWT sem consulta ao banco a cada requisição.
+
+O token de acesso traz, além do id, o tipo do usuário, a aprovação do
+vendedor e o id da loja (CustomTokenObtainPairSerializer.get_token). Com
+esses claims atuais, CachedJWTAuthentication devolve um UserPrincipal: as
+verificações de tipo e de loja das views não fazem queries, e o usuário
+completo só é carregado quando a view precisa dele (ex: filtrar pedidos),
+a partir de um cache curto (AUTH_USER_CACHE_TIMEOUT) com a loja junto.
+
+Só com AUTH_TRUST_TOKEN_CLAIMS, que requer um cache compartilhado pelos
+processos (Redis): as marcas de alteração ficam no cache, e no cache em
+memória local de um worker não aparecem as alterações feitas em outro.
+Sem ele o usuário é lido do banco a cada requisição, como no
+JWTAuthentication.
+
+Salvar ou excluir o usuário ou a loja grava no cache o momento da
+alteração. Tokens emitidos antes dela têm claims desatualizados: nesse caso
+o usuário é lido do cache/banco e o is_active é verificado, como no
+JWTAuthentication. O refresh emite o token de acesso com os claims atuais.
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+# Claims necessários para o UserPrincipal; tokens sem eles usam o usuário
+PRINCIPAL_CLAIMS = ("iat", "user_type", "is_approved_seller", "store_id")
+
+
+def _user_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def _changed_key(user_id):
+    return f"auth:changed:{user_id}"
+
+
+def user_claims(user):
+    """
+    Claims do usuário adicionados aos tokens.
+    """
+    store = getattr(user, "store", None)
+    return {
+        "user_type": user.user_type,
+        "is_approved_seller": user.is_approved_seller,
+        "store_id": store.id if store else None,
+    }
+
+
+def invalidate_user(user_id):
+    """
+    Descarta o usuário em cache e marca os claims emitidos até agora como
+    desatualizados (pelo tempo de vida dos tokens de acesso).
+    """
+    timeout = api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    cache.set(_changed_key(user_id), time.time(), timeout)
+    cache.delete(_user_key(user_id))
+
+
+def get_cached_user(user_id):
+    """
+    Obtém o usuário com a loja (select_related), usando o cache.
+
+    A entrada guarda o momento da última alteração conhecido na leitura:
+    uma requisição que leu o banco antes de uma alteração grava uma entrada
+    que não é mais usada.
+
+    Raises:
+        User.DoesNotExist: se o usuário não existe
+    """
+    user_key, changed_key = _user_key(user_id), _changed_key(user_id)
+    values = cache.get_many([user_key, changed_key])
+    changed_at = values.get(changed_key)
+    entry = values.get(user_key)
+    if entry is not None and entry[0] == changed_at:
+        return entry[1]
+
+    user = User.objects.select_related("store").get(pk=user_id)
+    cache.set(user_key, (changed_at, user), settings.AUTH_USER_CACHE_TIMEOUT)
+    return user
+
+
+def claims_are_current(token):
+    """
+    Indica se os claims do token refletem o usuário atual.
+    """
+    if any(claim not in token for claim in PRINCIPAL_CLAIMS):
+        return False
+    changed_at = cache.get(_changed_key(token[api_settings.USER_ID_CLAIM]))
+    return changed_at is None or changed_at < token["iat"]
+
+
+class UserPrincipal(SimpleLazyObject):
+    """
+    Usuário autenticado construído a partir dos claims do token.
+
+    id, pk, user_type, is_approved_seller e store_id vêm do token; os
+    demais atributos (inclusive store, quando há loja) carregam o usuário
+    (get_cached_user) no primeiro acesso. Em comparações, filtros e atribuições de FK o principal se
+    comporta como o CustomUser.
+    """
+
+    def __init__(self, token):
+        user_id = token[api_settings.USER_ID_CLAIM]
+        super().__init__(lambda: get_cached_user(user_id))
+        self.__dict__.update(
+            id=user_id,
+            pk=user_id,
+            user_type=token["user_type"],
+            is_approved_seller=token["is_approved_seller"],
+            store_id=token["store_id"],
+            is_active=True,
+            is_authenticated=True,
+            is_anonymous=False,
+        )
+
+    def __bool__(self):
+        # IsAuthenticated testa bool(request.user)
+        return True
+
+    def __getattr__(self, name):
+        # Sem loja no token, store falha sem carregar o usuário (a exceção é
+        # um AttributeError, por isso não pode ser uma property)
+        if name == "store" and self.__dict__["store_id"] is None:
+            raise User.store.RelatedObjectDoesNotExist("CustomUser has no store.")
+        return super().__getattr__(name)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que devolve um UserPrincipal quando os claims do
+    token estão atuais, sem consultar o banco.
+    """
+
+    def get_user(self, validated_token):
+        # A verificação da senha precisa do usuário completo; sem cache
+        # compartilhado, o usuário e o is_active vêm sempre do banco
+        if api_settings.CHECK_REVOKE_TOKEN or not settings.AUTH_TRUST_TOKEN_CLAIMS:
+            return super().get_user(validated_token)
+
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        if claims_are_current(validated_token):
+            return UserPrincipal(validated_token)
+
+        try:
+            user = get_cached_user(validated_token[api_settings.USER_ID_CLAIM])
+        except User.DoesNotExist:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """
+    Esquema de segurança do OpenAPI (drf-spectacular).
+    """
+
+    target_class = CachedJWTAuthentication
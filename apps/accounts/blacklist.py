@@ -0,0 +1,342 @@
+"""
+Blacklist dos tokens refresh com filtro de Bloom e cache na frente das
+tabelas do token_blacklist.
+
+Com ROTATE_REFRESH_TOKENS e BLACKLIST_AFTER_ROTATION cada refresh e cada
+logout adicionam um token à blacklist, e cada refresh consulta se o token
+recebido está nela. A consulta (is_blacklisted) passa por:
+1. Filtro de Bloom do dia de expiração do token: "não está" é definitivo e
+   dispensa o banco. É o caso comum, pois o token recebido é o mais recente
+2. Cache das consultas negativas (falsos positivos do filtro), até o token
+   expirar
+3. Banco, quando o filtro indica que o token pode estar na blacklist ou
+   ainda não foi montado
+
+Há um filtro por dia de expiração: tokens vencidos são recusados de
+qualquer forma, então o filtro de um dia que passou é descartado inteiro e
+os filtros não acumulam os tokens removidos por prune_expired_tokens. Todo
+BlacklistedToken criado (refresh, logout ou admin) entra no filtro e
+invalida a consulta negativa em cache (signal em apps/accounts/signals.py).
+
+O filtro é escolhido pela configuração TOKEN_BLACKLIST_FILTER:
+- "redis": bits compartilhados no Redis (SETBIT/GETBIT, requer REDIS_URL)
+- "memory": bits na memória do processo. Só com um único processo (ex:
+  testes): um token bloqueado por outro processo não aparece no filtro
+- "none": sem filtro nem cache, a consulta vai sempre ao banco
+"""
+
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import batched
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Taxa de falsos positivos de cada filtro com TOKEN_BLACKLIST_BLOOM_CAPACITY
+# tokens no dia
+BLOOM_ERROR_RATE = 0.001
+DAY = 24 * 60 * 60
+# jtis lidos do banco por lote ao montar um filtro
+BUILD_CHUNK_SIZE = 2000
+
+
+def _cache_key(jti):
+    return f"token_blacklist:{jti}"
+
+
+def _remaining(exp):
+    return int(exp - time.time())
+
+
+class BlacklistFilter:
+    """
+    Filtros de Bloom dos jtis na blacklist, um por dia de expiração.
+
+    O bit 0 de cada filtro indica que os tokens do dia já foram lidos do
+    banco (build). Os tokens bloqueados depois são adicionados aos mesmos
+    bits, então uma montagem concorrente não perde nenhum.
+    """
+
+    def __init__(self, capacity=None, error_rate=BLOOM_ERROR_RATE):
+        capacity = capacity or settings.TOKEN_BLACKLIST_BLOOM_CAPACITY
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+
+    def positions(self, jti):
+        digest = hashlib.sha256(jti.encode()).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:16], "big") | 1
+        return [1 + (first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, jti, exp):
+        self._set_bits(exp // DAY, self.positions(jti))
+
+    def might_contain(self, jti, exp):
+        """
+        Consulta o filtro do dia de expiração do token, montando-o na
+        primeira consulta.
+
+        Returns:
+            False se o jti certamente não está na blacklist, True se pode
+            estar, None se o filtro não está disponível (dia passado ou
+            montagem em andamento em outra requisição)
+        """
+        day = exp // DAY
+        if day < time.time() // DAY:
+            return None
+        bits = self._get_bits(day, [0, *self.positions(jti)])
+        if not bits[0]:
+            if not self.build(day):
+                return None
+            bits = self._get_bits(day, [0, *self.positions(jti)])
+        return all(bits)
+
+    def build(self, day):
+        """
+        Adiciona ao filtro os tokens do dia que estão na blacklist no banco.
+
+        Returns:
+            bool: False se outra requisição já está montando o filtro
+        """
+        if not self._acquire(day):
+            return False
+        try:
+            start = datetime.fromtimestamp(day * DAY, tz=dt_timezone.utc)
+            jtis = BlacklistedToken.objects.filter(
+                token__expires_at__gte=start,
+                token__expires_at__lt=start + timedelta(days=1),
+            ).values_list("token__jti", flat=True)
+            for chunk in batched(jtis.iterator(chunk_size=BUILD_CHUNK_SIZE), 500):
+                self._set_bits(day, [p for jti in chunk for p in self.positions(jti)])
+            self._set_bits(day, [0])
+        finally:
+            self._release(day)
+        return True
+
+    # Operações primitivas implementadas pelas subclasses
+
+    def _get_bits(self, day, positions):
+        raise NotImplementedError
+
+    def _set_bits(self, day, positions):
+        raise NotImplementedError
+
+    def _acquire(self, day):
+        raise NotImplementedError
+
+    def _release(self, day):
+        raise NotImplementedError
+
+
+class MemoryBlacklistFilter(BlacklistFilter):
+    """
+    Filtros num bytearray por dia, na memória do processo.
+    """
+
+    def __init__(self, capacity=None, error_rate=BLOOM_ERROR_RATE):
+        super().__init__(capacity, error_rate)
+        self._filters = {}
+        self._building = set()
+        self._lock = threading.Lock()
+
+    def _bits(self, day):
+        # Chamado com o lock; descarta os filtros dos dias que já passaram
+        today = time.time() // DAY
+        for old_day in [old for old in self._filters if old < today]:
+            del self._filters[old_day]
+        if day not in self._filters:
+            self._filters[day] = bytearray(self.size // 8 + 1)
+        return self._filters[day]
+
+    def _get_bits(self, day, positions):
+        with self._lock:
+            bits = self._bits(day)
+            return [bits[p >> 3] >> (p & 7) & 1 for p in positions]
+
+    def _set_bits(self, day, positions):
+        with self._lock:
+            bits = self._bits(day)
+            for p in positions:
+                bits[p >> 3] |= 1 << (p & 7)
+
+    def _acquire(self, day):
+        with self._lock:
+            if day in self._building:
+                return False
+            self._building.add(day)
+            return True
+
+    def _release(self, day):
+        with self._lock:
+            self._building.discard(day)
+
+
+class RedisBlacklistFilter(BlacklistFilter):
+    """
+    Filtros em strings do Redis, compartilhados pelos processos. Cada
+    chave expira um dia depois do seu dia de expiração (folga para o
+    LEEWAY e relógios adiantados).
+    """
+
+    # Tempo máximo (segundos) de uma montagem antes de outra ser permitida
+    BUILD_LOCK_TIMEOUT = 60
+
+    def __init__(self, capacity=None, error_rate=BLOOM_ERROR_RATE, client=None):
+        super().__init__(capacity, error_rate)
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(settings.REDIS_URL)
+        self.client = client
+
+    def key(self, day):
+        return f"token_blacklist:bloom:{day}"
+
+    def _get_bits(self, day, positions):
+        key = self.key(day)
+        pipeline = self.client.pipeline(transaction=False)
+        for p in positions:
+            pipeline.getbit(key, p)
+        return pipeline.execute()
+
+    def _set_bits(self, day, positions):
+        key = self.key(day)
+        pipeline = self.client.pipeline(transaction=False)
+        for p in positions:
+            pipeline.setbit(key, p, 1)
+        pipeline.expireat(key, int((day + 2) * DAY))
+        pipeline.execute()
+
+    def _acquire(self, day):
+        return bool(
+            self.client.set(
+                f"{self.key(day)}:lock", 1, nx=True, ex=self.BUILD_LOCK_TIMEOUT
+            )
+        )
+
+    def _release(self, day):
+        self.client.delete(f"{self.key(day)}:lock")
+
+
+FILTERS = {
+    "memory": MemoryBlacklistFilter,
+    "redis": RedisBlacklistFilter,
+}
+
+_filter = None
+_filter_loaded = False
+_filter_lock = threading.Lock()
+
+
+def get_blacklist_filter():
+    """
+    Retorna o filtro da blacklist do processo, ou None com
+    TOKEN_BLACKLIST_FILTER = "none".
+    """
+    global _filter, _filter_loaded
+    if not _filter_loaded:
+        with _filter_lock:
+            if not _filter_loaded:
+                name = getattr(settings, "TOKEN_BLACKLIST_FILTER", "none")
+                _filter = FILTERS[name]() if name != "none" else None
+                _filter_loaded = True
+    return _filter
+
+
+def reset_blacklist_filter():
+    """
+    Descarta o filtro atual (ex: após trocar a configuração nos testes).
+    """
+    global _filter, _filter_loaded
+    with _filter_lock:
+        _filter, _filter_loaded = None, False
+
+
+def is_blacklisted(jti, exp):
+    """
+    Indica se o token refresh está na blacklist.
+
+    Args:
+        jti: claim jti do token
+        exp: claim exp do token (timestamp)
+    """
+    blacklist_filter = get_blacklist_filter()
+    if blacklist_filter is not None:
+        if blacklist_filter.might_contain(jti, exp) is False:
+            return False
+        if cache.get(_cache_key(jti)) is False:
+            return False
+
+    blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+    if blacklist_filter is not None and not blacklisted and _remaining(exp) > 0:
+        # add: não sobrescreve a marca de um bloqueio feito durante a consulta
+        cache.add(_cache_key(jti), False, _remaining(exp))
+    return blacklisted
+
+
+def token_blacklisted(jti, exp):
+    """
+    Registra no filtro e no cache um token adicionado à blacklist.
+
+    Feito antes do commit: se a transação for desfeita, o token só passa
+    a ser consultado no banco.
+    """
+    blacklist_filter = get_blacklist_filter()
+    if blacklist_filter is None:
+        return
+    blacklist_filter.add(jti, exp)
+    # Qualquer valor diferente de False leva a consulta ao banco
+    cache.set(_cache_key(jti), True, max(_remaining(exp), 1))
+
+
+def prune_expired_tokens(batch_size=1000):
+    """
+    Remove os tokens vencidos das tabelas do token_blacklist, em lotes
+    (cada lote em uma transação curta).
+
+    Os lotes seguem a ordem do id: como os tokens vencem na ordem em que são
+    criados, os vencidos estão no início da tabela e cada lote é encontrado
+    sem percorrê-la inteira.
+
+    Returns:
+        tuple: (tokens removidos, dos quais estavam na blacklist)
+    """
+    now = timezone.now()
+    outstanding = blacklisted = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            _, deleted = OutstandingToken.objects.filter(id__in=ids).delete()
+        outstanding += deleted.get(OutstandingToken._meta.label, 0)
+        blacklisted += deleted.get(BlacklistedToken._meta.label, 0)
+    return outstanding, blacklisted
+
+
+class BlacklistRefreshToken(RefreshToken):
+    """
+    RefreshToken que consulta a blacklist por is_blacklisted.
+    """
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if is_blacklisted(jti, self.payload["exp"]):
+            raise TokenError(_("Token is blacklisted"))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from apps.accounts.blacklist import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    """
+    Remove os tokens refresh vencidos das tabelas do token_blacklist
+    (outstanding e blacklist), em lotes. Agende execuções periódicas (ex:
+    cron diário) para que as tabelas não cresçam com cada refresh e logout.
+
+    Exemplos:
+        python manage.py prune_tokens
+        python manage.py prune_tokens --batch-size 5000
+    """
+
+    help = "Remove em lotes os tokens vencidos do token_blacklist."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Tokens removidos por transação (padrão: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        outstanding, blacklisted = prune_expired_tokens(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{outstanding} tokens vencidos removidos "
+                f"({blacklisted} na blacklist)."
+            )
+        )
@@ -1,12 +1,21 @@
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth import get_user_model
+from apps.core.serializers import EagerLoadingMixin
+from .authentication import get_cached_user, user_claims
+from .blacklist import BlacklistRefreshToken
 from .models import Store
 
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer para o modelo User.
     Utilizado para exibir informações básicas do usuário.
@@ -69,12 +78,14 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class StoreSerializer(serializers.ModelSerializer):
+class StoreSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer para o modelo Store.
     Inclui informações do proprietário da loja.
     """
 
+    select_related_fields = ("owner",)
+
     owner = UserSerializer(read_only=True, help_text="Proprietário da loja")
 
     class Meta:
@@ -97,7 +108,8 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
         token["email"] = user.email
         token["name"] = user.get_full_name() or user.username
-        token["user_type"] = user.user_type
+        # Claims do UserPrincipal (ver apps/accounts/authentication.py)
+        token.payload.update(user_claims(user))
         return token
 
     def validate(self, attrs):
@@ -124,3 +136,26 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
             "user_type": self.user.user_type,
         }
         return data
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Serializer para renovação do token JWT.
+    O novo token de acesso recebe os claims atuais do usuário, e não os do
+    login copiados do token refresh. A blacklist é consultada pelo filtro de
+    apps/accounts/blacklist.py.
+    """
+
+    token_class = BlacklistRefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data["access"])
+        try:
+            user = get_cached_user(access[api_settings.USER_ID_CLAIM])
+        except User.DoesNotExist:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        access.payload.update(user_claims(user))
+        access.set_iat()
+        data["access"] = str(access)
+        return data
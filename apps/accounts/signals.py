@@ -0,0 +1,53 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from .authentication import invalidate_user
+from .blacklist import token_blacklisted
+from .models import CustomUser, Store
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_on_change(sender, instance, update_fields=None, **kwargs):
+    """
+    Invalida o usuário em cache e os claims dos tokens já emitidos quando o
+    usuário é salvo ou excluído.
+
+    Args:
+        sender: Modelo que enviou o sinal (CustomUser)
+        instance: Usuário alterado
+        update_fields: campos salvos; o last_login gravado no login não
+            altera os claims
+    """
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+def invalidate_owner_on_store_change(sender, instance, **kwargs):
+    """
+    Invalida o dono da loja quando a loja é salva ou excluída.
+
+    Args:
+        sender: Modelo que enviou o sinal (Store)
+        instance: Loja alterada
+    """
+    invalidate_user(instance.owner_id)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_to_blacklist_filter(sender, instance, created, **kwargs):
+    """
+    Adiciona ao filtro da blacklist os tokens bloqueados no refresh, no
+    logout ou pelo admin.
+
+    Args:
+        sender: Modelo que enviou o sinal (BlacklistedToken)
+        instance: Token adicionado à blacklist
+        created: True na criação
+    """
+    if created:
+        token = instance.token
+        token_blacklisted(token.jti, int(token.expires_at.timestamp()))
@@ -1,10 +1,30 @@
-from django.test import TestCase
+import time
+from io import StringIO
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from . import blacklist
+from .blacklist import BlacklistRefreshToken, is_blacklisted
 from .models import Store
+from .serializers import CustomTokenObtainPairSerializer
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
 
 User = get_user_model()
 
@@ -348,3 +368,277 @@ class StoreAPITest(APITestCase):
         url = reverse("approve_seller", kwargs={"user_id": pending_seller.id})
         response = self.client.post(url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CachedJWTAuthenticationTest(APITestCase):
+    """Testes para a autenticação JWT a partir dos claims do token"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.seller = User.objects.create_user(
+            username="seller",
+            email="seller@example.com",
+            password="sellerpass123",
+            user_type="seller",
+            is_approved_seller=True,
+        )
+        self.store = Store.objects.create(name="Test Store", owner=self.seller)
+        self.buyer = User.objects.create_user(
+            username="buyer",
+            email="buyer@example.com",
+            password="buyerpass123",
+            user_type="buyer",
+        )
+        # Alterações anteriores aos tokens (evita a marca de alteração no
+        # mesmo segundo da emissão)
+        cache.clear()
+
+    def authenticate(self, user):
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_checks_without_queries(self):
+        """Testa as verificações de tipo de usuário sem consultar o banco"""
+        self.authenticate(self.buyer)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("pending_sellers"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_store_loaded_once(self):
+        """Testa o usuário e a loja carregados numa query e depois do cache"""
+        self.authenticate(self.seller)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("manage_store"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["name"], "Test Store")
+        self.assertEqual(response.data["owner"]["username"], "seller")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("manage_store"))
+        self.assertEqual(response.data["id"], self.store.id)
+
+    def test_seller_without_store(self):
+        """Testa o vendedor sem loja sem carregar o usuário"""
+        self.store.delete()
+        cache.clear()
+        self.authenticate(self.seller)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("manage_store"))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_principal_as_foreign_key(self):
+        """Testa o principal atribuído como dono de uma loja"""
+        self.store.delete()
+        cache.clear()
+        self.authenticate(self.seller)
+        response = self.client.post(
+            reverse("create_store"), {"name": "Outra Loja"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Store.objects.get().owner, self.seller)
+
+    def test_outdated_claims_use_current_user(self):
+        """Testa que alterações após a emissão do token são respeitadas"""
+        self.authenticate(self.buyer)
+        self.buyer.user_type = "admin"
+        self.buyer.save()
+        response = self.client.get(reverse("pending_sellers"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_inactive_user_rejected(self):
+        """Testa a rejeição do token de um usuário desativado"""
+        self.authenticate(self.buyer)
+        self.buyer.is_active = False
+        self.buyer.save()
+        response = self.client.get(reverse("user_profile"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TRUST_TOKEN_CLAIMS=False)
+    def test_deactivation_without_shared_cache(self):
+        """Testa a desativação feita em outro processo, sem cache compartilhado"""
+        self.buyer.user_type = "admin"
+        self.buyer.save()
+        cache.clear()
+        self.authenticate(self.buyer)
+        response = self.client.get(reverse("pending_sellers"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # update() não passa pelos signals: a marca de alteração não chega ao
+        # cache, como num cache em memória local de outro worker
+        User.objects.filter(pk=self.buyer.pk).update(user_type="buyer")
+        response = self.client.get(reverse("pending_sellers"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        User.objects.filter(pk=self.buyer.pk).update(is_active=False)
+        response = self.client.get(reverse("user_profile"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_updates_claims(self):
+        """Testa que o refresh emite o token com os claims atuais"""
+        refresh = CustomTokenObtainPairSerializer.get_token(self.buyer)
+        self.assertIsNone(refresh["store_id"])
+        self.buyer.user_type = "seller"
+        self.buyer.save()
+        store = Store.objects.create(name="Nova Loja", owner=self.buyer)
+
+        response = self.client.post(
+            reverse("token_refresh"), {"refresh": str(refresh)}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        access = AccessToken(response.data["access"])
+        self.assertEqual(access["user_type"], "seller")
+        self.assertEqual(access["store_id"], store.id)
+
+    def test_login_keeps_claims_current(self):
+        """Testa que o last_login gravado no login não invalida os claims"""
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "buyer", "password": "buyerpass123"},
+            format="json",
+        )
+        access = response.data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("pending_sellers"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TokenBlacklistTest(APITestCase):
+    """Testes para a blacklist de tokens com filtro de Bloom e cache"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        blacklist.reset_blacklist_filter()
+        cache.clear()
+
+    def tearDown(self):
+        blacklist.reset_blacklist_filter()
+
+    def refresh(self, token):
+        return self.client.post(
+            reverse("token_refresh"), {"refresh": str(token)}, format="json"
+        )
+
+    def test_rotated_token_rejected(self):
+        """Testa que o token refresh usado no refresh não pode ser reutilizado"""
+        token = RefreshToken.for_user(self.user)
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.refresh(response.data["refresh"]).status_code, 200)
+
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_blacklists_token(self):
+        """Testa que o token do logout é recusado no refresh"""
+        token = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token.access_token}")
+        response = self.client.post(
+            reverse("logout"), {"refresh": str(token)}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_check_without_queries(self):
+        """Testa a consulta de um token fora da blacklist sem o banco"""
+        RefreshToken.for_user(self.user).blacklist()
+        first, second = (str(RefreshToken.for_user(self.user)) for _ in range(2))
+        # A primeira consulta do dia monta o filtro a partir do banco
+        BlacklistRefreshToken(first)
+        with self.assertNumQueries(0):
+            BlacklistRefreshToken(second)
+
+    def test_filter_built_from_database(self):
+        """Testa os tokens bloqueados antes de o filtro existir"""
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+        blacklist.reset_blacklist_filter()
+        cache.clear()
+
+        self.assertTrue(is_blacklisted(token["jti"], token["exp"]))
+
+    def test_negative_lookup_cached(self):
+        """Testa o cache de um falso positivo do filtro até o bloqueio"""
+        token = RefreshToken.for_user(self.user)
+        blacklist.get_blacklist_filter().add(token["jti"], token["exp"])
+
+        with self.assertNumQueries(2):
+            # Montagem do filtro do dia e consulta ao banco
+            self.assertFalse(is_blacklisted(token["jti"], token["exp"]))
+        with self.assertNumQueries(0):
+            self.assertFalse(is_blacklisted(token["jti"], token["exp"]))
+
+        token.blacklist()
+        self.assertTrue(is_blacklisted(token["jti"], token["exp"]))
+
+    def test_removed_from_blacklist(self):
+        """Testa que um token retirado da blacklist volta a ser aceito"""
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+        BlacklistedToken.objects.filter(token__jti=token["jti"]).delete()
+        self.assertFalse(is_blacklisted(token["jti"], token["exp"]))
+
+    @override_settings(TOKEN_BLACKLIST_FILTER="none")
+    def test_without_filter(self):
+        """Testa a consulta direta ao banco sem o filtro"""
+        blacklist.reset_blacklist_filter()
+        token = RefreshToken.for_user(self.user)
+        with self.assertNumQueries(1):
+            self.assertFalse(is_blacklisted(token["jti"], token["exp"]))
+        token.blacklist()
+        self.assertTrue(is_blacklisted(token["jti"], token["exp"]))
+
+    def test_prune_expired_tokens(self):
+        """Testa a remoção em lotes dos tokens vencidos"""
+        expired = timezone.now() - timedelta(days=1)
+        for number in range(5):
+            outstanding = OutstandingToken.objects.create(
+                user=self.user, jti=f"expired-{number}", token="", expires_at=expired
+            )
+            if number % 2:
+                BlacklistedToken.objects.create(token=outstanding)
+        valid = RefreshToken.for_user(self.user)
+        valid.blacklist()
+
+        call_command("prune_tokens", batch_size=2, stdout=StringIO())
+
+        self.assertEqual(
+            list(OutstandingToken.objects.values_list("jti", flat=True)),
+            [valid["jti"]],
+        )
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+
+@skipUnless(fakeredis, "fakeredis não instalado")
+class RedisBlacklistFilterTest(TestCase):
+    """Filtro da blacklist compartilhado no Redis (fakeredis)"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.client = fakeredis.FakeRedis()
+        self.filter = blacklist.RedisBlacklistFilter(capacity=1000, client=self.client)
+        self.exp = int(time.time()) + 3600
+
+    def test_add_and_check(self):
+        """Testa a consulta de tokens adicionados e desconhecidos"""
+        self.filter.add("bloqueado", self.exp)
+        self.assertTrue(self.filter.might_contain("bloqueado", self.exp))
+        self.assertFalse(self.filter.might_contain("desconhecido", self.exp))
+        day = self.exp // blacklist.DAY
+        self.assertGreater(self.client.ttl(self.filter.key(day)), 0)
+
+    def test_build_in_progress(self):
+        """Testa a consulta ao banco enquanto outro processo monta o filtro"""
+        day = self.exp // blacklist.DAY
+        self.assertTrue(self.filter._acquire(day))
+        self.assertIsNone(self.filter.might_contain("desconhecido", self.exp))
+        self.filter._release(day)
+        self.assertFalse(self.filter.might_contain("desconhecido", self.exp))
+
+    def test_past_day_unavailable(self):
+        """Testa que os filtros de dias passados não são usados"""
+        exp = int(time.time()) - 2 * blacklist.DAY
+        self.assertIsNone(self.filter.might_contain("desconhecido", exp))
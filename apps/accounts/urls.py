@@ -1,12 +1,12 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
 from . import views
 
-
 urlpatterns = [
     # Authentcation
     path("token/", views.CustomTokenObtainPairView.as_view(), name="token_obtain_pair"),
-    path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path(
+        "token/refresh/", views.CustomTokenRefreshView.as_view(), name="token_refresh"
+    ),
     path("register/", views.register, name="register"),
     path("logout/", views.logout, name="logout"),
     path("profile/", views.get_user_profile, name="user_profile"),
@@ -3,11 +3,12 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .blacklist import BlacklistRefreshToken
 from .models import Store
 from .serializers import (
     CustomTokenObtainPairSerializer,
+    CustomTokenRefreshSerializer,
     StoreSerializer,
     UserRegistrationSerializer,
     UserSerializer,
@@ -26,6 +27,15 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
 
+class CustomTokenRefreshView(TokenRefreshView):
+    """
+    View personalizada para renovação do token JWT.
+    Emite o token de acesso com os claims atuais do usuário.
+    """
+
+    serializer_class = CustomTokenRefreshSerializer
+
+
 @api_view(["POST"])
 @permission_classes([AllowAny])
 def register(request):
@@ -63,7 +73,7 @@ def logout(request):
     try:
         refresh_token = request.data.get("refresh")
         if refresh_token:
-            token = RefreshToken(refresh_token)
+            token = BlacklistRefreshToken(refresh_token)
             token.blacklist()
         return Response(
             {"message": "Logout realizado com sucesso."}, status=status.HTTP_200_OK
@@ -163,7 +173,9 @@ def get_pending_sellers(request):
     if request.user.user_type != "admin":
         return Response({"error": "Permissão negada"}, status=status.HTTP_403_FORBIDDEN)
 
-    pending_sellers = User.objects.filter(user_type="seller", is_approved_seller=False)
+    pending_sellers = UserSerializer.setup_eager_loading(
+        User.objects.filter(user_type="seller", is_approved_seller=False)
+    )
     serializer = UserSerializer(pending_sellers, many=True)
     return Response(serializer.data)
 
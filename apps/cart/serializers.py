@@ -1,14 +1,26 @@
+from decimal import Decimal
+
+from django.db.models import DecimalField, ExpressionWrapper, F, Prefetch, Sum, Window
 from rest_framework import serializers
+from apps.core.serializers import EagerLoadingMixin, nested_select_related
 from .models import Cart, CartItem
 from apps.products.serializers import ProductListSerializer
 
+# Subtotal de um item calculado no banco (preço * quantidade)
+SUB_TOTAL = ExpressionWrapper(
+    F("quantity") * F("product__price"),
+    output_field=DecimalField(max_digits=12, decimal_places=2),
+)
+
 
-class CartItemSerializer(serializers.ModelSerializer):
+class CartItemSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer para itens do carrinho de compras.
     Inclui informações do produto e calcula o subtotal.
     """
 
+    select_related_fields = nested_select_related("product", ProductListSerializer)
+
     product = ProductListSerializer(read_only=True, help_text="Produto no carrinho")
     sub_total = serializers.SerializerMethodField(
         help_text="Subtotal do item (preço * quantidade)"
@@ -18,20 +30,39 @@ class CartItemSerializer(serializers.ModelSerializer):
         model = CartItem
         fields = ["id", "product", "quantity", "sub_total"]
 
+    @classmethod
+    def with_totals(cls, queryset):
+        """
+        Itens com produtos e lojas (uma única query), anotados com o subtotal
+        de cada item e o total do carrinho (soma em janela por carrinho).
+        """
+        return cls.setup_eager_loading(queryset).annotate(
+            sub_total=SUB_TOTAL,
+            cart_total=Window(Sum(SUB_TOTAL), partition_by=[F("cart_id")]),
+        )
+
     def get_sub_total(self, obj):
         """
-        Calcula o subtotal do item (preço * quantidade).
+        Retorna o subtotal do item (preço * quantidade), calculado no banco
+        quando o item vem de with_totals().
         """
-        total = obj.product.price * obj.quantity
-        return total
+        sub_total = getattr(obj, "sub_total", None)
+        if sub_total is None:
+            sub_total = obj.product.price * obj.quantity
+        return sub_total
 
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer para o carrinho de compras.
     Inclui todos os itens e calcula o total do carrinho.
     """
 
+    @classmethod
+    def get_prefetch_related(cls):
+        items = CartItemSerializer.with_totals(CartItem.objects.order_by("id"))
+        return [Prefetch("cartitems", queryset=items)]
+
     cartitems = CartItemSerializer(
         read_only=True, many=True, help_text="Itens do carrinho"
     )
@@ -43,19 +74,50 @@ class CartSerializer(serializers.ModelSerializer):
 
     def get_cart_total(self, cart):
         """
-        Calcula o total do carrinho somando os subtotais de todos os itens.
+        Retorna o total do carrinho, calculado no banco junto com os itens
+        (ver CartItemSerializer.with_totals).
         """
         items = cart.cartitems.all()
-        total = sum([item.quantity * item.product.price for item in items])
+        if not items:
+            return Decimal("0.00")
+        total = getattr(items[0], "cart_total", None)
+        if total is None:
+            total = sum(item.quantity * item.product.price for item in items)
         return total
 
 
-class CartStatSerializer(serializers.ModelSerializer):
+class StoredCartSerializer(serializers.Serializer):
+    """
+    Serializer para carrinhos anônimos fora do banco (ver apps/cart/storage.py).
+    Produz o mesmo formato do CartSerializer; os itens não possuem id.
+    """
+
+    id = serializers.IntegerField(read_only=True, allow_null=True)
+    cart_code = serializers.CharField(read_only=True)
+    cartitems = CartItemSerializer(
+        read_only=True, many=True, help_text="Itens do carrinho"
+    )
+    cart_total = serializers.SerializerMethodField(help_text="Total do carrinho")
+
+    def get_cart_total(self, cart):
+        """
+        Calcula o total do carrinho somando os subtotais de todos os itens.
+        """
+        # Decimal também no carrinho vazio, como no CartSerializer
+        return sum(
+            (item.quantity * item.product.price for item in cart.cartitems),
+            Decimal("0.00"),
+        )
+
+
+class CartStatSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer para estatísticas do carrinho.
     Inclui apenas informações básicas e a quantidade total de itens.
     """
 
+    prefetch_related_fields = ("cartitems",)
+
     total_quantity = serializers.SerializerMethodField(
         help_text="Quantidade total de itens no carrinho"
     )
@@ -0,0 +1,453 @@
+"""
+Armazenamento dos carrinhos anônimos.
+
+Os carrinhos de usuários autenticados ficam sempre no banco (Cart e
+CartItem). Os carrinhos anônimos usam o backend definido em
+CART_STORAGE_BACKEND:
+
+- "database": Cart/CartItem no banco (padrão)
+- "redis": um hash do Redis por carrinho ({product_id: quantidade}) com TTL
+- "cache": o cache do Django (ex: locmem em desenvolvimento e testes)
+- ou o caminho de uma classe (ex: "meu_app.carts.MeuCartStore")
+
+Os carrinhos fora do banco só são gravados em Cart/CartItem quando são
+mesclados ao carrinho do usuário (merge_carts) ou no checkout
+(promote_to_database).
+"""
+
+import random
+import string
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Least
+from django.utils.module_loading import import_string
+
+from apps.products.models import Product
+from apps.products.serializers import ProductListSerializer
+from .models import Cart, CartItem
+from .serializers import CartSerializer, StoredCartSerializer
+
+CART_CODE_LENGTH = 11
+
+
+def generate_cart_code():
+    """
+    Gera um código aleatório para um carrinho.
+    """
+    return "".join(
+        random.choices(string.ascii_letters + string.digits, k=CART_CODE_LENGTH)
+    )
+
+
+class CartStockError(Exception):
+    """
+    A quantidade pedida excede o estoque disponível do produto.
+    """
+
+    def __init__(self, available):
+        super().__init__(
+            f"Quantidade solicitada excede o estoque disponível. "
+            f"Apenas {available} disponível."
+        )
+        self.available = available
+
+
+class StoredCart:
+    """
+    Carrinho lido de um armazenamento fora do banco, no formato esperado
+    pelo StoredCartSerializer.
+    """
+
+    def __init__(self, cart_code, items):
+        self.id = None
+        self.cart_code = cart_code
+        self.cartitems = items
+
+
+class BaseCartStore:
+    """
+    Interface dos armazenamentos de carrinhos anônimos.
+
+    Todos os métodos recebem o código do carrinho; os métodos que retornam
+    dados do carrinho retornam o payload serializado (mesmo formato do
+    CartSerializer) ou None quando o carrinho não existe.
+    """
+
+    def create_cart(self):
+        """
+        Cria um carrinho vazio e retorna o payload serializado.
+        """
+        raise NotImplementedError
+
+    def get_cart_data(self, cart_code):
+        raise NotImplementedError
+
+    def add_item(self, cart_code, product_id, quantity):
+        """
+        Soma a quantidade ao item do carrinho, criando o carrinho se
+        necessário, e retorna o payload serializado.
+
+        Raises:
+            Product.DoesNotExist: produto inexistente ou fora de estoque
+            CartStockError: a nova quantidade excede o estoque
+        """
+        raise NotImplementedError
+
+    def get_items(self, cart_code):
+        """
+        Retorna os itens do carrinho ({product_id: quantidade}), ou None se
+        o carrinho não existe.
+        """
+        raise NotImplementedError
+
+    def delete_cart(self, cart_code):
+        raise NotImplementedError
+
+    def _available_product(self, product_id):
+        return Product.objects.only("id", "stock_quantity").get(
+            id=product_id, in_stock=True
+        )
+
+
+class DatabaseCartStore(BaseCartStore):
+    """
+    Carrinhos anônimos em Cart/CartItem, como os dos usuários.
+    """
+
+    def create_cart(self):
+        cart = Cart.objects.create(cart_code=generate_cart_code())
+        return CartSerializer(cart).data
+
+    def get_cart_data(self, cart_code):
+        try:
+            cart = Cart.objects.get(cart_code=cart_code)
+        except Cart.DoesNotExist:
+            return None
+        return serialize_cart(cart)
+
+    def add_item(self, cart_code, product_id, quantity):
+        with transaction.atomic():
+            cart, _ = Cart.objects.get_or_create(cart_code=cart_code)
+            add_item_to_cart(cart, product_id, quantity)
+        return self.get_cart_data(cart_code)
+
+    def get_items(self, cart_code):
+        try:
+            cart = Cart.objects.get(cart_code=cart_code)
+        except Cart.DoesNotExist:
+            return None
+        return dict(cart.cartitems.values_list("product_id", "quantity"))
+
+    def delete_cart(self, cart_code):
+        Cart.objects.filter(cart_code=cart_code).delete()
+
+
+class ExternalCartStore(BaseCartStore):
+    """
+    Base dos armazenamentos fora do banco. As subclasses guardam apenas
+    {product_id: quantidade}; os produtos são lidos numa única query ao
+    serializar.
+    """
+
+    # Marca a existência de carrinhos vazios
+    CREATED_FIELD = "_created"
+
+    def __init__(self):
+        self.ttl = getattr(settings, "CART_STORAGE_TTL", 60 * 60 * 24 * 7)
+
+    def key(self, cart_code):
+        return f"cart:{cart_code}"
+
+    # Operações primitivas implementadas pelas subclasses
+
+    def _create(self, cart_code):
+        raise NotImplementedError
+
+    def _read(self, cart_code):
+        """
+        Retorna {product_id: quantidade} ou None se o carrinho não existe.
+        """
+        raise NotImplementedError
+
+    def _increment(self, cart_code, product_id, quantity):
+        """
+        Soma a quantidade ao item (criando o carrinho) e retorna o novo valor.
+        """
+        raise NotImplementedError
+
+    def _delete(self, cart_code):
+        raise NotImplementedError
+
+    def create_cart(self):
+        cart_code = generate_cart_code()
+        self._create(cart_code)
+        return self.serialize(cart_code, {})
+
+    def get_cart_data(self, cart_code):
+        items = self._read(cart_code)
+        if items is None:
+            return None
+        return self.serialize(cart_code, items)
+
+    def add_item(self, cart_code, product_id, quantity):
+        product = self._available_product(product_id)
+        new_quantity = self._increment(cart_code, product.id, quantity)
+        if new_quantity > product.stock_quantity:
+            self._increment(cart_code, product.id, -quantity)
+            raise CartStockError(product.stock_quantity)
+        return self.get_cart_data(cart_code)
+
+    def get_items(self, cart_code):
+        return self._read(cart_code)
+
+    def delete_cart(self, cart_code):
+        self._delete(cart_code)
+
+    def serialize(self, cart_code, items):
+        products = ProductListSerializer.setup_eager_loading(
+            Product.objects.filter(id__in=items)
+        ).in_bulk()
+        cart_items = [
+            CartItem(product=products[product_id], quantity=quantity)
+            for product_id, quantity in items.items()
+            if product_id in products and quantity > 0
+        ]
+        return StoredCartSerializer(StoredCart(cart_code, cart_items)).data
+
+
+class CacheCartStore(ExternalCartStore):
+    """
+    Carrinhos no cache do Django, um dict por carrinho.
+
+    A leitura e escrita do dict não são atômicas entre processos; use em
+    desenvolvimento e testes (locmem) ou prefira o RedisCartStore.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def _create(self, cart_code):
+        cache.set(self.key(cart_code), {}, self.ttl)
+
+    def _read(self, cart_code):
+        return cache.get(self.key(cart_code))
+
+    def _increment(self, cart_code, product_id, quantity):
+        with self._lock:
+            items = cache.get(self.key(cart_code)) or {}
+            items[product_id] = items.get(product_id, 0) + quantity
+            cache.set(self.key(cart_code), items, self.ttl)
+        return items[product_id]
+
+    def _delete(self, cart_code):
+        cache.delete(self.key(cart_code))
+
+
+class RedisCartStore(ExternalCartStore):
+    """
+    Carrinhos em hashes do Redis (HINCRBY atômico) com expiração renovada
+    a cada escrita.
+    """
+
+    def __init__(self, client=None):
+        super().__init__()
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(settings.REDIS_URL)
+        self.client = client
+
+    def _create(self, cart_code):
+        key = self.key(cart_code)
+        pipeline = self.client.pipeline()
+        pipeline.hset(key, self.CREATED_FIELD, int(time.time()))
+        pipeline.expire(key, self.ttl)
+        pipeline.execute()
+
+    def _read(self, cart_code):
+        fields = self.client.hgetall(self.key(cart_code))
+        if not fields:
+            return None
+        return {
+            int(field): int(value)
+            for field, value in fields.items()
+            if not field.startswith(b"_")
+        }
+
+    def _increment(self, cart_code, product_id, quantity):
+        key = self.key(cart_code)
+        pipeline = self.client.pipeline()
+        pipeline.hsetnx(key, self.CREATED_FIELD, int(time.time()))
+        pipeline.hincrby(key, product_id, quantity)
+        pipeline.expire(key, self.ttl)
+        return pipeline.execute()[1]
+
+    def _delete(self, cart_code):
+        self.client.delete(self.key(cart_code))
+
+
+BACKENDS = {
+    "database": DatabaseCartStore,
+    "cache": CacheCartStore,
+    "redis": RedisCartStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_cart_store():
+    """
+    Retorna a instância do armazenamento de carrinhos anônimos do processo.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                name = getattr(settings, "CART_STORAGE_BACKEND", "database")
+                backend = BACKENDS.get(name) or import_string(name)
+                _store = backend()
+    return _store
+
+
+def reset_cart_store():
+    """
+    Descarta o armazenamento atual (ex: após trocar a configuração nos testes).
+    """
+    global _store
+    with _store_lock:
+        _store = None
+
+
+def serialize_cart(cart):
+    """
+    Serializa um carrinho do banco. Os itens, produtos e lojas são lidos
+    numa única query, com os subtotais e o total calculados no banco.
+    """
+    CartSerializer.setup_eager_loading_for([cart])
+    return CartSerializer(cart).data
+
+
+def add_item_to_cart(cart, product_id, quantity):
+    """
+    Soma a quantidade ao item de um carrinho do banco, validando o estoque.
+
+    Raises:
+        Product.DoesNotExist: produto inexistente ou fora de estoque
+        CartStockError: a nova quantidade excede o estoque
+    """
+    product = Product.objects.select_for_update().get(id=product_id, in_stock=True)
+    cartitem, _ = CartItem.objects.get_or_create(
+        product=product, cart=cart, defaults={"quantity": 0}
+    )
+    new_quantity = cartitem.quantity + quantity
+    if product.stock_quantity < new_quantity:
+        raise CartStockError(product.stock_quantity)
+    cartitem.quantity = new_quantity
+    cartitem.save()
+
+
+def merge_into_cart(cart, items):
+    """
+    Soma itens ao carrinho do banco, limitando cada quantidade ao estoque.
+
+    As quantidades finais são calculadas numa única query (quantidade atual
+    + quantidade recebida, limitada a stock_quantity com Least) e gravadas
+    com um único INSERT ... ON CONFLICT DO UPDATE, em vez de um
+    get_or_create e um save por item. Produtos inexistentes, fora de
+    estoque ou sem estoque são ignorados.
+
+    Args:
+        cart: Cart de destino
+        items: dict {product_id: quantidade}
+
+    Returns:
+        int: número de itens gravados
+    """
+    items = {
+        int(product_id): quantity
+        for product_id, quantity in items.items()
+        if quantity > 0
+    }
+    if not items:
+        return 0
+
+    current = CartItem.objects.filter(cart=cart, product=OuterRef("pk")).values(
+        "quantity"
+    )
+    # Um WHEN por quantidade distinta (em geral poucas), não por produto
+    by_quantity = {}
+    for product_id, quantity in items.items():
+        by_quantity.setdefault(quantity, []).append(product_id)
+    incoming = Case(
+        *(
+            When(pk__in=product_ids, then=Value(quantity))
+            for quantity, product_ids in by_quantity.items()
+        ),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    merged = (
+        Product.objects.filter(id__in=items, in_stock=True)
+        .annotate(
+            merged_quantity=Least(
+                Coalesce(Subquery(current), 0) + incoming,
+                F("stock_quantity"),
+                output_field=IntegerField(),
+            )
+        )
+        .filter(merged_quantity__gt=0)
+        .values_list("id", "merged_quantity")
+    )
+
+    cart_items = [
+        CartItem(cart=cart, product_id=product_id, quantity=quantity)
+        for product_id, quantity in merged
+    ]
+    CartItem.objects.bulk_create(
+        cart_items,
+        update_conflicts=True,
+        unique_fields=["cart", "product"],
+        update_fields=["quantity"],
+    )
+    return len(cart_items)
+
+
+def promote_to_database(cart_code):
+    """
+    Retorna o Cart do banco com o código informado, gravando-o a partir do
+    armazenamento de carrinhos anônimos se necessário (ex: no checkout).
+
+    Raises:
+        Cart.DoesNotExist: o carrinho não existe em nenhum armazenamento
+    """
+    try:
+        return Cart.objects.get(cart_code=cart_code)
+    except Cart.DoesNotExist:
+        store = get_cart_store()
+        if isinstance(store, DatabaseCartStore):
+            raise
+
+    items = store.get_items(cart_code)
+    if items is None:
+        raise Cart.DoesNotExist()
+
+    with transaction.atomic():
+        # Removido do armazenamento apenas quando o carrinho estiver no banco
+        transaction.on_commit(lambda: store.delete_cart(cart_code))
+        cart = Cart.objects.create(cart_code=cart_code)
+        existing = set(
+            Product.objects.filter(id__in=items).values_list("id", flat=True)
+        )
+        CartItem.objects.bulk_create(
+            CartItem(cart=cart, product_id=product_id, quantity=quantity)
+            for product_id, quantity in items.items()
+            if product_id in existing and quantity > 0
+        )
+    return cart
@@ -1,13 +1,23 @@
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
+from . import storage
 from .models import Cart, CartItem
 from apps.products.models import Product, Category
 from apps.accounts.models import Store
 
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
 User = get_user_model()
 
 
@@ -247,7 +257,9 @@ class CartAPITest(APITestCase):
         # Mescla os carrinhos
         url = reverse("merge_carts")
         data = {"temp_cart_code": "TEMP12345678"}
-        response = self.client.post(url, data, format="json")
+        # O carrinho temporário é removido após o commit
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         # Verifica se os itens foram movidos para o carrinho do usuário
@@ -258,3 +270,292 @@ class CartAPITest(APITestCase):
         # Verifica se o carrinho temporário foi removido
         with self.assertRaises(Cart.DoesNotExist):
             Cart.objects.get(cart_code="TEMP12345678")
+
+
+class CartReadQueryTest(TestCase):
+    """Testes para a leitura do carrinho (serialize_cart)"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        seller = User.objects.create_user(
+            username="seller",
+            email="seller@example.com",
+            password="testpass123",
+            user_type="seller",
+        )
+        store = Store.objects.create(name="Test Store", owner=seller)
+        self.products = Product.objects.bulk_create(
+            Product(
+                name=f"Produto {i}",
+                slug=f"produto-{i}",
+                price=Decimal("10.99") + i,
+                store=store,
+                stock_quantity=100,
+            )
+            for i in range(50)
+        )
+
+    def test_constant_queries_with_db_totals(self):
+        """Testa uma query para os itens e os totais calculados no banco"""
+        for total in (1, 50):
+            with self.subTest(total=total):
+                cart = Cart.objects.create(cart_code=f"QUERY{total:06d}")
+                CartItem.objects.bulk_create(
+                    CartItem(cart=cart, product=product, quantity=3)
+                    for product in self.products[:total]
+                )
+                cart = Cart.objects.get(pk=cart.pk)
+
+                # Uma única query para itens, produtos, lojas e totais
+                with self.assertNumQueries(1):
+                    data = storage.serialize_cart(cart)
+
+                expected = sum(p.price * 3 for p in self.products[:total])
+                self.assertEqual(len(data["cartitems"]), total)
+                self.assertEqual(data["cartitems"][0]["sub_total"], Decimal("32.97"))
+                self.assertEqual(
+                    data["cartitems"][0]["product"]["store_name"], "Test Store"
+                )
+                self.assertEqual(data["cart_total"], expected)
+
+    def test_empty_cart_total(self):
+        """Testa o total de um carrinho vazio"""
+        cart = Cart.objects.create(cart_code="EMPTY0000000")
+        data = storage.serialize_cart(cart)
+        self.assertEqual(data["cartitems"], [])
+        self.assertEqual(data["cart_total"], 0)
+
+
+class MergeIntoCartTest(TestCase):
+    """Testes para a mescla de carrinhos em lote (merge_into_cart)"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        seller = User.objects.create_user(
+            username="seller",
+            email="seller@example.com",
+            password="testpass123",
+            user_type="seller",
+        )
+        store = Store.objects.create(name="Test Store", owner=seller)
+        self.products = Product.objects.bulk_create(
+            Product(
+                name=f"Produto {i}",
+                slug=f"produto-{i}",
+                price=10,
+                store=store,
+                stock_quantity=5,
+            )
+            for i in range(200)
+        )
+        self.cart = Cart.objects.create(cart_code="USER00000000")
+
+    def quantities(self):
+        return dict(self.cart.cartitems.values_list("product_id", "quantity"))
+
+    def test_sums_and_clamps_to_stock(self):
+        """Testa a soma das quantidades limitada ao estoque"""
+        first, second, third, unavailable = self.products[:4]
+        Product.objects.filter(pk=unavailable.pk).update(in_stock=False)
+        CartItem.objects.create(cart=self.cart, product=first, quantity=2)
+        CartItem.objects.create(cart=self.cart, product=second, quantity=4)
+
+        storage.merge_into_cart(
+            self.cart,
+            {first.id: 1, second.id: 3, third.id: 2, unavailable.id: 1, 999999: 1},
+        )
+
+        self.assertEqual(self.quantities(), {first.id: 3, second.id: 5, third.id: 2})
+
+    def test_constant_queries(self):
+        """Testa o mesmo número de queries para 1 e 200 itens"""
+        for total in (1, 200):
+            with self.subTest(total=total):
+                self.cart.cartitems.all().delete()
+                items = {product.id: 2 for product in self.products[:total]}
+
+                # Uma query para as quantidades finais e outra para gravá-las
+                with self.assertNumQueries(2):
+                    storage.merge_into_cart(self.cart, items)
+                with self.assertNumQueries(2):
+                    storage.merge_into_cart(self.cart, items)
+
+                self.assertEqual(
+                    self.quantities(),
+                    {product.id: 4 for product in self.products[:total]},
+                )
+
+
+class ExternalCartStoreTestMixin:
+    """Testes comuns dos carrinhos anônimos fora do banco"""
+
+    def make_store(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        storage._store = self.make_store()
+        self.addCleanup(storage.reset_cart_store)
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.seller = User.objects.create_user(
+            username="seller",
+            email="seller@example.com",
+            password="testpass123",
+            user_type="seller",
+        )
+        self.store = Store.objects.create(name="Test Store", owner=self.seller)
+        self.product = Product.objects.create(
+            name="Test Product", price=10, store=self.store, stock_quantity=5
+        )
+
+    def create_cart(self):
+        response = self.client.post(reverse("create_cart"))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["cart_code"]
+
+    def add(self, cart_code, quantity):
+        return self.client.post(
+            reverse("add_to_cart"),
+            {
+                "product_id": self.product.id,
+                "quantity": quantity,
+                "cart_code": cart_code,
+            },
+            format="json",
+        )
+
+    def authenticate(self):
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    def test_anonymous_cart_not_in_database(self):
+        """Testa que o carrinho anônimo não grava no banco"""
+        cart_code = self.create_cart()
+        self.add(cart_code, 2)
+        response = self.add(cart_code, 1)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["cartitems"][0]["quantity"], 3)
+        self.assertEqual(response.data["cart_total"], 30)
+        self.assertFalse(Cart.objects.exists())
+        self.assertFalse(CartItem.objects.exists())
+
+        response = self.client.get(reverse("get_cart", kwargs={"cart_code": cart_code}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["cartitems"][0]["product"]["id"], self.product.id
+        )
+
+    def test_empty_cart_total(self):
+        """Testa o total do carrinho vazio no mesmo formato do banco"""
+        response = self.client.post(reverse("create_cart"))
+        self.assertEqual(response.data["cart_total"], Decimal("0.00"))
+        self.assertIsInstance(response.data["cart_total"], Decimal)
+        self.assertIn(b'"cart_total":0.00', response.content)
+
+    def test_insufficient_stock(self):
+        """Testa que a quantidade acima do estoque é rejeitada"""
+        cart_code = self.create_cart()
+        self.add(cart_code, 4)
+        response = self.add(cart_code, 2)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            storage.get_cart_store().get_items(cart_code), {self.product.id: 4}
+        )
+
+    def test_get_cart_not_found(self):
+        """Testa a obtenção de um carrinho inexistente"""
+        response = self.client.get(
+            reverse("get_cart", kwargs={"cart_code": "NONEXISTENT"})
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_user_cart_by_code(self):
+        """Testa que carrinhos do banco continuam acessíveis pelo código"""
+        Cart.objects.create(user=self.user, cart_code="USER1234567")
+        response = self.client.get(
+            reverse("get_cart", kwargs={"cart_code": "USER1234567"})
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_merge_promotes_to_database(self):
+        """Testa a gravação no banco ao mesclar com o carrinho do usuário"""
+        cart_code = self.create_cart()
+        self.add(cart_code, 2)
+
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("merge_carts"), {"temp_cart_code": cart_code}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        user_cart = Cart.objects.get(user=self.user)
+        self.assertEqual(user_cart.cartitems.get().quantity, 2)
+        self.assertIsNone(storage.get_cart_store().get_items(cart_code))
+
+    def test_failed_merge_keeps_anonymous_cart(self):
+        """Testa que o carrinho do visitante não se perde se a mescla falhar"""
+        cart_code = self.create_cart()
+        self.add(cart_code, 2)
+
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True), mock.patch(
+            "apps.cart.views.merge_into_cart", side_effect=RuntimeError("falha")
+        ):
+            response = self.client.post(
+                reverse("merge_carts"), {"temp_cart_code": cart_code}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            storage.get_cart_store().get_items(cart_code), {self.product.id: 2}
+        )
+
+    def test_checkout_promotes_to_database(self):
+        """Testa a gravação no banco no checkout"""
+        cart_code = self.create_cart()
+        self.add(cart_code, 2)
+
+        self.authenticate()
+        response = self.client.post(
+            reverse("create_order"),
+            {
+                "cart_code": cart_code,
+                "shipping_address": "Rua 1",
+                "payment_method": "reference",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 3)
+        self.assertEqual(Cart.objects.get(cart_code=cart_code).cartitems.count(), 0)
+
+
+class CacheCartStoreTest(ExternalCartStoreTestMixin, APITestCase):
+    """Carrinhos anônimos no cache do Django (locmem)"""
+
+    def make_store(self):
+        cache.clear()
+        return storage.CacheCartStore()
+
+
+@skipUnless(fakeredis, "fakeredis não instalado")
+class RedisCartStoreTest(ExternalCartStoreTestMixin, APITestCase):
+    """Carrinhos anônimos em hashes do Redis (fakeredis)"""
+
+    def make_store(self):
+        return storage.RedisCartStore(client=fakeredis.FakeRedis())
+
+    def test_ttl_renewed_on_write(self):
+        """Testa que o carrinho expira e a expiração é renovada"""
+        cart_code = self.create_cart()
+        store = storage.get_cart_store()
+        key = store.key(cart_code)
+        store.client.expire(key, 10)
+
+        self.add(cart_code, 1)
+        self.assertGreater(store.client.ttl(key), 10)
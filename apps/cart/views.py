@@ -5,7 +5,16 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from .models import Cart, CartItem
 from apps.products.models import Product
-from .serializers import CartItemSerializer, CartSerializer
+from .serializers import CartItemSerializer
+from .storage import (
+    CartStockError,
+    DatabaseCartStore,
+    add_item_to_cart,
+    generate_cart_code,
+    get_cart_store,
+    merge_into_cart,
+    serialize_cart,
+)
 
 
 @api_view(["GET"])
@@ -20,14 +29,15 @@ def get_cart(request, cart_code):
     Retorna:
     - Detalhes do carrinho ou mensagem de erro
     """
-    try:
-        cart = Cart.objects.get(cart_code=cart_code)
-        serializer = CartSerializer(cart)
-        return Response(serializer.data)
-    except Cart.DoesNotExist:
+    data = get_cart_store().get_cart_data(cart_code)
+    if data is None and not isinstance(get_cart_store(), DatabaseCartStore):
+        # Carrinhos de usuários ficam sempre no banco
+        data = DatabaseCartStore().get_cart_data(cart_code)
+    if data is None:
         return Response(
             {"error": "Carrinho não encontrado."}, status=status.HTTP_404_NOT_FOUND
         )
+    return Response(data)
 
 
 @api_view(["POST"])
@@ -40,13 +50,8 @@ def create_cart(request):
     Retorna:
     - Detalhes do carrinho criado
     """
-    import random
-    import string
-
-    cart_code = "".join(random.choices(string.ascii_letters + string.digits, k=11))
-    cart = Cart.objects.create(cart_code=cart_code)
-    serializer = CartSerializer(cart)
-    return Response(serializer.data, status=status.HTTP_201_CREATED)
+    data = get_cart_store().create_cart()
+    return Response(data, status=status.HTTP_201_CREATED)
 
 
 @api_view(["POST"])
@@ -72,58 +77,38 @@ def add_to_cart(request):
         )
 
     try:
-        with transaction.atomic():
-            # 1. VERIFICAR AUTENTICAÇÃO PRIMEIRO
-            if request.user.is_authenticated:
-                # USUÁRIO AUTENTICADO: Obter ou criar carrinho vinculado ao usuário
+        # 1. VERIFICAR AUTENTICAÇÃO PRIMEIRO
+        if request.user.is_authenticated:
+            # USUÁRIO AUTENTICADO: carrinho vinculado ao usuário, sempre no banco
+            with transaction.atomic():
                 try:
                     cart = request.user.cart
                 except Cart.DoesNotExist:
                     # Se não existir, cria um novo carrinho para o usuário
-                    import random
-                    import string
-                    cart_code = "".join(random.choices(string.ascii_letters + string.digits, k=11))
-                    cart = Cart.objects.create(user=request.user, cart_code=cart_code)
-            
-            else:
-                # USUÁRIO ANÔNIMO: Exigir o código do carrinho
-                cart_code = request.data.get("cart_code")
-                if not cart_code:
-                    return Response(
-                        {"error": "Código do carrinho é obrigatório para usuários anônimos."},
-                        status=status.HTTP_400_BAD_REQUEST,
+                    cart = Cart.objects.create(
+                        user=request.user, cart_code=generate_cart_code()
                     )
-                cart, created = Cart.objects.get_or_create(cart_code=cart_code)
-
-            # 2. LÓGICA COMUM PARA ADICIONAR O ITEM (independente de ser anônimo ou autenticado)
-            product = Product.objects.select_for_update().get(
-                id=product_id, in_stock=True
-            )
-
-            cartitem, item_created = CartItem.objects.get_or_create(
-                product=product, cart=cart, defaults={"quantity": 0}
-            )
 
-            new_quantity = cartitem.quantity + quantity
+                # 2. ADICIONAR O ITEM (valida o estoque)
+                add_item_to_cart(cart, product_id, quantity)
 
-            # Verificar estoque
-            if product.stock_quantity < new_quantity:
-                return Response(
-                    {
-                        "error": f"Quantidade solicitada excede o estoque disponível. "
-                        f"Apenas {product.stock_quantity} disponível."
-                    },
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+            # 3. RETORNAR O CARRINHO ATUALIZADO
+            return Response(serialize_cart(cart))
 
-            cartitem.quantity = new_quantity
-            cartitem.save()
+        # USUÁRIO ANÔNIMO: Exigir o código do carrinho
+        cart_code = request.data.get("cart_code")
+        if not cart_code:
+            return Response(
+                {"error": "Código do carrinho é obrigatório para usuários anônimos."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        # 3. RETORNAR O CARRINHO ATUALIZADO
-        cart.refresh_from_db()
-        serializer = CartSerializer(cart)
-        return Response(serializer.data)
+        # Armazenamento configurado em CART_STORAGE_BACKEND (ver storage.py)
+        data = get_cart_store().add_item(cart_code, product_id, quantity)
+        return Response(data)
 
+    except CartStockError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Product.DoesNotExist:
         return Response(
             {"error": "Produto não encontrado ou fora de estoque."},
@@ -153,7 +138,9 @@ def update_cartitem_quantity(request):
     quantity = request.data.get("quantity")
 
     try:
-        cartitem = CartItem.objects.get(id=cartitem_id)
+        cartitem = CartItemSerializer.setup_eager_loading(CartItem.objects.all()).get(
+            id=cartitem_id
+        )
         product = cartitem.product
 
         # Verificar se a nova quantidade excede o estoque
@@ -213,20 +200,14 @@ def create_user_cart(request):
     """
     Endpoint para criar ou obter o carrinho do usuário autenticado.
     """
-    import random
-    import string
-
     # Tenta obter o carrinho existente
     try:
         cart = request.user.cart
-        serializer = CartSerializer(cart)
-        return Response(serializer.data)
+        return Response(serialize_cart(cart))
     except Cart.DoesNotExist:
         # Cria um novo carrinho
-        cart_code = "".join(random.choices(string.ascii_letters + string.digits, k=11))
-        cart = Cart.objects.create(user=request.user, cart_code=cart_code)
-        serializer = CartSerializer(cart)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        cart = Cart.objects.create(user=request.user, cart_code=generate_cart_code())
+        return Response(serialize_cart(cart), status=status.HTTP_201_CREATED)
 
 
 @api_view(["GET"])
@@ -237,8 +218,7 @@ def get_user_cart(request):
     """
     try:
         cart = request.user.cart
-        serializer = CartSerializer(cart)
-        return Response(serializer.data)
+        return Response(serialize_cart(cart))
     except Cart.DoesNotExist:
         return Response(
             {"error": "Carrinho não encontrado."}, status=status.HTTP_404_NOT_FOUND
@@ -254,56 +234,29 @@ def merge_carts(request):
     """
     try:
         with transaction.atomic():
-            user_cart, created = Cart.objects.get_or_create(user=request.user)
-            if created:
-                import random
-                import string
-
-                user_cart.cart_code = "".join(
-                    random.choices(string.ascii_letters + string.digits, k=11)
+            try:
+                user_cart = request.user.cart
+            except Cart.DoesNotExist:
+                user_cart = Cart.objects.create(
+                    user=request.user, cart_code=generate_cart_code()
                 )
-                user_cart.save()
 
             temp_cart_code = request.data.get("temp_cart_code")
-            if temp_cart_code:
-                try:
-                    temp_cart = Cart.objects.get(cart_code=temp_cart_code)
-
-                    for item in temp_cart.cartitems.all():
-                        # Verificar se produto está disponível
-                        if not item.product.in_stock:
-                            continue
-
-                        # Buscar ou criar item no carrinho do usuário
-                        user_item, item_created = CartItem.objects.get_or_create(
-                            cart=user_cart,
-                            product=item.product,
-                            defaults={"quantity": 0},
-                        )
-
-                        # SOMAR quantidades
-                        new_quantity = user_item.quantity + item.quantity
-
-                        # Verificar estoque
-                        if item.product.stock_quantity < new_quantity:
-                            # Ajustar para quantidade máxima disponível
-                            new_quantity = item.product.stock_quantity
-
-                        if new_quantity > 0:  # Só adiciona se houver estoque
-                            user_item.quantity = new_quantity
-                            user_item.save()
-
-                        user_item.quantity = new_quantity
-                        user_item.save()
-
-                    # Deletar carrinho temporário
-                    temp_cart.delete()
-
-                except Cart.DoesNotExist:
-                    pass
-
-        serializer = CartSerializer(user_cart)
-        return Response(serializer.data)
+            # Itens do carrinho temporário ({product_id: quantidade})
+            temp_items = None
+            if temp_cart_code and temp_cart_code != user_cart.cart_code:
+                store = get_cart_store()
+                temp_items = store.get_items(temp_cart_code)
+                if temp_items is not None:
+                    # Removido do armazenamento apenas quando a mescla estiver
+                    # no banco; se ela falhar, o carrinho do visitante continua
+                    transaction.on_commit(lambda: store.delete_cart(temp_cart_code))
+
+            if temp_items:
+                # Quantidades somadas e limitadas ao estoque em lote
+                merge_into_cart(user_cart, temp_items)
+
+        return Response(serialize_cart(user_cart))
 
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,103 @@
+"""
+GET condicional (ETag / Last-Modified) para os endpoints de leitura.
+
+Os validadores são calculados a partir de um "estado" barato do recurso
+(ex: contagem e max(updated_at) do queryset, numa única query) antes de
+executar a view. Quando o cliente ou a CDN envia If-None-Match /
+If-Modified-Since com a versão atual, a resposta é um 304 sem corpo e a
+view (queries da página e serialização) não é executada.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def queryset_state(queryset, *timestamp_fields):
+    """
+    Estado de um queryset numa única query de agregação.
+
+    Args:
+        queryset: QuerySet do recurso
+        timestamp_fields: campos DateTime (ex: "updated_at", "store__updated_at")
+
+    Returns:
+        tuple: (contagem, max de cada campo na ordem informada)
+    """
+    aggregates = {f"max_{i}": Max(field) for i, field in enumerate(timestamp_fields)}
+    state = queryset.order_by().aggregate(count=Count("pk"), **aggregates)
+    return (state["count"],) + tuple(
+        state[f"max_{i}"] for i in range(len(timestamp_fields))
+    )
+
+
+def latest(*timestamps):
+    """
+    Mais recente dos timestamps informados, ignorando None.
+    """
+    timestamps = [timestamp for timestamp in timestamps if timestamp is not None]
+    return max(timestamps) if timestamps else None
+
+
+def make_etag(request, state):
+    """
+    ETag fraco do estado; inclui o Accept, pois JSON e a API navegável do
+    DRF são representações diferentes do mesmo estado.
+    """
+    key = f"{state!r}|{request.META.get('HTTP_ACCEPT', '')}"
+    return f'W/"{hashlib.md5(key.encode()).hexdigest()}"'
+
+
+def _set_validators(response, etag, last_modified):
+    response.headers.setdefault("ETag", etag)
+    if last_modified is not None:
+        response.headers.setdefault("Last-Modified", http_date(last_modified))
+    # Armazenável por clientes e CDNs, mas sempre revalidado
+    patch_cache_control(response, public=True, no_cache=True)
+
+
+def conditional_get(validators):
+    """
+    Decorator de views GET que responde 304 sem executar a view quando o
+    cliente já possui a versão atual do recurso.
+
+    Usar abaixo de @api_view/@permission_classes, para que autenticação e
+    throttling continuem valendo.
+
+    Args:
+        validators: função (request, *args, **kwargs) que retorna
+            (estado, last_modified: datetime ou None), ou None quando o
+            recurso não tem validadores (a view é executada normalmente)
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            result = validators(request, *args, **kwargs)
+            if result is None:
+                return view(request, *args, **kwargs)
+
+            state, last_modified = result
+            etag = make_etag(request, state)
+            last_modified = last_modified and int(last_modified.timestamp())
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = view(request, *args, **kwargs)
+            # Erros (ex: 404, 412) não recebem validadores
+            if response.status_code != 304 and not 200 <= response.status_code < 300:
+                return response
+            _set_validators(response, etag, last_modified)
+            return response
+
+        return wrapper
+
+    return decorator
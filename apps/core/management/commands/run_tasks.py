@@ -0,0 +1,107 @@
+import multiprocessing
+import signal
+import threading
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+
+STOP_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+@contextmanager
+def stop_on_signals():
+    """
+    Evento acionado por SIGINT/SIGTERM: o worker termina a tarefa atual e
+    para. Os handlers anteriores são restaurados na saída.
+    """
+    stop = threading.Event()
+    previous = {signum: signal.getsignal(signum) for signum in STOP_SIGNALS}
+    for signum in STOP_SIGNALS:
+        signal.signal(signum, lambda *args: stop.set())
+    try:
+        yield stop
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+
+def worker_process(burst, poll_interval):
+    """
+    Ponto de entrada de cada processo worker (iniciado com spawn).
+    """
+    import django
+
+    django.setup()
+    from apps.core.tasks import run_worker
+
+    with stop_on_signals() as stop:
+        run_worker(stop, burst, poll_interval)
+
+
+class Command(BaseCommand):
+    """
+    Executa os workers da fila de tarefas em segundo plano (pagamentos e
+    classificações dos produtos). Ver apps/core/tasks.py.
+
+    Exemplos:
+        python manage.py run_tasks
+        python manage.py run_tasks --workers 4
+        python manage.py run_tasks --burst
+    """
+
+    help = "Executa as tarefas em segundo plano com N processos worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Número de processos worker (padrão: 1; use 1 no SQLite).",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Termina quando não houver tarefas prontas.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=None,
+            help="Segundos de espera com a fila vazia (padrão: TASK_POLL_INTERVAL).",
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        if workers < 1:
+            raise CommandError("--workers deve ser pelo menos 1.")
+        burst, poll_interval = options["burst"], options["poll_interval"]
+
+        if workers == 1:
+            from apps.core.tasks import run_worker
+
+            with stop_on_signals() as stop:
+                executed = run_worker(stop, burst, poll_interval)
+            self.stdout.write(self.style.SUCCESS(f"{executed} tarefas executadas."))
+            return
+
+        # spawn funciona em todas as plataformas e não herda as conexões
+        # abertas com o banco
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=worker_process, args=(burst, poll_interval))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f"{workers} workers iniciados.")
+
+        def stop_workers(*args):
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        for signum in STOP_SIGNALS:
+            signal.signal(signum, stop_workers)
+        for process in processes:
+            process.join()
+        self.stdout.write(self.style.SUCCESS("Workers encerrados."))
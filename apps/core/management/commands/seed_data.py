@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.seeding import DataSeeder
+
+
+class Command(BaseCommand):
+    """
+    Gera dados sintéticos em grande volume para benchmarks (bulk_create em
+    lotes, semente fixa). Ver apps/core/seeding.py.
+
+    Exemplos:
+        python manage.py seed_data
+        python manage.py seed_data --products 1000000 --reviews 2000000
+        python manage.py seed_data --clear --seed 7
+    """
+
+    help = "Gera lojas, produtos, carrinhos, pedidos, avaliações e favoritos em massa."
+
+    def add_arguments(self, parser):
+        for name, default in DataSeeder.DEFAULTS.items():
+            parser.add_argument(
+                f"--{name}",
+                type=int,
+                default=default,
+                help=f"Quantidade de {name} (padrão: {default}).",
+            )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--prefix",
+            default="seed",
+            help="Prefixo dos usuários, lojas e categorias gerados.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--max-items",
+            type=int,
+            default=5,
+            help="Máximo de itens por pedido e por carrinho.",
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Remove os dados gerados anteriormente com o mesmo prefixo.",
+        )
+
+    def handle(self, *args, **options):
+        seeder = DataSeeder(
+            seed=options["seed"],
+            prefix=options["prefix"],
+            batch_size=options["batch_size"],
+            max_items=options["max_items"],
+            stdout=self.stdout,
+            **{name: options[name] for name in DataSeeder.DEFAULTS},
+        )
+        if options["clear"]:
+            seeder.clear()
+        try:
+            seeder.run()
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS("Dados sintéticos gerados."))
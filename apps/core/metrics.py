@@ -0,0 +1,185 @@
+"""
+Métricas das requisições no formato de exposição do Prometheus.
+
+O registro é mantido em memória por processo: com vários workers (ex:
+gunicorn) cada um expõe as suas métricas e o Prometheus agrega por
+instância. As métricas são coletadas pelo MetricsMiddleware
+(apps/core/middleware.py) e expostas em /metrics.
+"""
+
+import threading
+from bisect import bisect_left
+
+# Limites superiores dos buckets de cada histograma
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Contador monotônico por combinação de labels.
+    """
+
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def inc(self, labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in sorted(self._values.items()):
+            yield self.name, tuple(zip(self.labelnames, labels)), value
+
+
+class Histogram:
+    """
+    Histograma com buckets cumulativos, soma e contagem por combinação
+    de labels.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> [contagens por bucket, soma, contagem]
+
+    def observe(self, labels, value):
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            state[0][index] += 1
+        state[1] += value
+        state[2] += 1
+
+    def samples(self):
+        for labels, (bucket_counts, total, count) in sorted(self._values.items()):
+            base = tuple(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", base + (("le", bound),), cumulative
+            yield f"{self.name}_bucket", base + (("le", "+Inf"),), count
+            yield f"{self.name}_sum", base, total
+            yield f"{self.name}_count", base, count
+
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas das requisições HTTP e do banco de dados.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter(
+            "http_requests_total",
+            "Total de requisições por rota, método e status.",
+            ("view", "method", "status"),
+        )
+        self.latency = Histogram(
+            "http_request_duration_seconds",
+            "Latência das requisições por rota.",
+            ("view", "method"),
+            LATENCY_BUCKETS,
+        )
+        self.response_size = Histogram(
+            "http_response_size_bytes",
+            "Tamanho do corpo das respostas por rota.",
+            ("view", "method"),
+            SIZE_BUCKETS,
+        )
+        self.queries = Histogram(
+            "db_queries_per_request",
+            "Queries executadas por requisição, por rota.",
+            ("view", "method"),
+            QUERY_COUNT_BUCKETS,
+        )
+        self.db_time = Counter(
+            "db_query_duration_seconds_total",
+            "Tempo total gasto no banco de dados por rota.",
+            ("view", "method"),
+        )
+        self.metrics = (
+            self.requests,
+            self.latency,
+            self.response_size,
+            self.queries,
+            self.db_time,
+        )
+
+    def observe_request(
+        self, view, method, status, duration, size, query_count, query_time
+    ):
+        """
+        Registra uma requisição concluída.
+
+        Args:
+            view: nome da rota (ex: "products:product_list")
+            method: método HTTP
+            status: código de status da resposta
+            duration: latência em segundos
+            size: tamanho do corpo em bytes (None para respostas em streaming)
+            query_count: número de queries executadas
+            query_time: tempo gasto no banco em segundos
+        """
+        labels = (view, method)
+        with self._lock:
+            self.requests.inc((view, method, str(status)))
+            self.latency.observe(labels, duration)
+            if size is not None:
+                self.response_size.observe(labels, size)
+            self.queries.observe(labels, query_count)
+            self.db_time.inc(labels, query_time)
+
+    def render(self):
+        """
+        Retorna as métricas no formato de texto do Prometheus (0.0.4).
+        """
+        lines = []
+        with self._lock:
+            for metric in self.metrics:
+                lines.append(f"# HELP {metric.name} {metric.documentation}")
+                lines.append(f"# TYPE {metric.name} {metric.type}")
+                for name, labels, value in metric.samples():
+                    lines.append(
+                        f"{name}{_format_labels(labels)} {_format_value(value)}"
+                    )
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """
+        Descarta os valores coletados (ex: entre testes).
+        """
+        with self._lock:
+            for metric in self.metrics:
+                metric._values.clear()
+
+
+registry = MetricsRegistry()
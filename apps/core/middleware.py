@@ -0,0 +1,72 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import registry
+
+
+class QueryRecorder:
+    """
+    Hook de connection.execute_wrapper que conta as queries e o tempo
+    gasto no banco.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """
+    Coleta latência, queries, tempo de banco e tamanho da resposta por
+    rota (nome da URL) e registra em apps.core.metrics.registry.
+
+    Ativado por METRICS_ENABLED; quando desativado o Django remove o
+    middleware da cadeia (MiddlewareNotUsed) e não há custo por requisição.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        registry.observe_request(
+            view=self.get_view_name(request),
+            method=request.method,
+            status=response.status_code,
+            duration=duration,
+            size=None if response.streaming else len(response.content),
+            query_count=recorder.count,
+            query_time=recorder.duration,
+        )
+        return response
+
+    def get_view_name(self, request):
+        """
+        Nome da rota resolvida; requisições sem rota são agrupadas para
+        não criar uma série por URL.
+        """
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "<unresolved>"
+        return match.view_name or match.route
@@ -0,0 +1,42 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    Tarefa da fila em segundo plano (ver apps/core/tasks.py).
+
+    Tarefas concluídas são removidas; as que esgotam as tentativas ficam
+    com status "failed" e o último erro, para inspeção.
+    """
+
+    QUEUED = "queued"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Na fila"),
+        (FAILED, "Falhou"),
+    ]
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField()
+    run_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Próximas tarefas prontas; as que falharam ficam fora do índice
+            models.Index(
+                fields=["run_at", "id"],
+                condition=models.Q(status="queued"),
+                name="core_task_queued_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status}, tentativa {self.attempts})"
@@ -0,0 +1,220 @@
+import base64
+import binascii
+import json
+from collections import namedtuple
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+Cursor = namedtuple("Cursor", ["ordering", "value", "pk", "reverse"])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) com ordenação estável por (campo, id).
+
+    Em vez de OFFSET, cada página filtra a partir da última posição vista
+    (ex: created_at < X OR (created_at = X AND id < Y)), de modo que a página
+    1000 custa o mesmo que a primeira quando existe um índice sobre
+    (campo, id). Os cursores são opacos (base64) para o cliente.
+
+    Os campos de ordenação devem ser não nulos.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering_query_param = "ordering"
+    ordering_fields = ("created_at",)
+    default_ordering = "-created_at"
+    invalid_cursor_message = "Cursor inválido."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request)
+        self.cursor = self.decode_cursor(request, queryset.model)
+
+        field = self.ordering.lstrip("-")
+        descending = self.ordering.startswith("-")
+        reverse = self.cursor.reverse if self.cursor else False
+
+        # Ao navegar para trás, percorremos a ordenação invertida
+        if reverse:
+            descending = not descending
+
+        prefix = "-" if descending else ""
+        queryset = queryset.order_by(f"{prefix}{field}", f"{prefix}pk")
+
+        if self.cursor is not None:
+            lookup = "lt" if descending else "gt"
+            # O limite redundante em field (lte/gte) deixa o banco percorrer
+            # só o intervalo do índice; o OR sozinho pode virar um scan
+            queryset = queryset.filter(
+                Q(**{f"{field}__{lookup}e": self.cursor.value}),
+                Q(**{f"{field}__{lookup}": self.cursor.value})
+                | Q(**{field: self.cursor.value, f"pk__{lookup}": self.cursor.pk}),
+            )
+
+        # Busca um item extra para saber se existe uma próxima página
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Cursor de paginação (opaco).",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Itens por página (máximo {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.ordering_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Ordenação dos resultados.",
+                "schema": {"type": "string", "enum": self.get_valid_orderings()},
+            },
+        ]
+
+    def get_page_size(self, request):
+        """
+        Obtém o tamanho da página a partir da query string, limitado
+        a max_page_size.
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_valid_orderings(self):
+        orderings = []
+        for field in self.ordering_fields:
+            orderings.extend([field, f"-{field}"])
+        return orderings
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_query_param)
+        if ordering in self.get_valid_orderings():
+            return ordering
+        return self.default_ordering
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        """
+        Gera o link com o cursor posicionado no objeto informado.
+        """
+        value = getattr(instance, self.ordering.lstrip("-"))
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        else:
+            value = str(value)
+
+        payload = {"o": self.ordering, "v": value, "p": instance.pk}
+        if reverse:
+            payload["r"] = 1
+        return self.build_cursor_link(payload)
+
+    def build_cursor_link(self, payload):
+        """
+        Codifica o payload do cursor e o coloca na URL da requisição.
+        """
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode()
+        ).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def load_cursor_payload(self, request):
+        """
+        Retorna o payload do cursor da requisição, ou None na primeira página.
+        Erros de decodificação são propagados para o chamador.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        return json.loads(base64.urlsafe_b64decode(encoded.encode()))
+
+    def decode_cursor(self, request, model):
+        """
+        Decodifica o cursor da requisição. Retorna None na primeira página.
+        """
+        try:
+            payload = self.load_cursor_payload(request)
+            if payload is None:
+                return None
+            ordering = payload["o"]
+            if ordering != self.ordering:
+                raise ValueError(ordering)
+            field = model._meta.get_field(ordering.lstrip("-"))
+            value = field.to_python(payload["v"])
+            pk = model._meta.pk.to_python(payload["p"])
+            reverse = bool(payload.get("r"))
+        except (
+            binascii.Error,
+            json.JSONDecodeError,
+            KeyError,
+            TypeError,
+            ValueError,
+            ValidationError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(ordering=ordering, value=value, pk=pk, reverse=reverse)
@@ -0,0 +1,35 @@
+"""
+Parser JSON rápido (orjson) com fallback para o JSONParser do DRF.
+"""
+
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser que usa o orjson quando instalado e o corpo está em UTF-8.
+
+    Números com casas decimais chegam como float, como no parser do DRF; os
+    DecimalField (até 15 dígitos) convertem pelo repr mais curto, que
+    reproduz exatamente o texto enviado (ex: 10.99 -> Decimal("10.99")).
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            # orjson rejeita NaN e Infinity, como o modo STRICT_JSON do DRF
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,87 @@
+"""
+Verificação dos planos de execução (EXPLAIN) das consultas da API.
+
+full_scans() roda EXPLAIN em cada consulta capturada (por exemplo, com
+CaptureQueriesContext durante uma requisição) e retorna as leituras
+sequenciais completas das tabelas informadas:
+- SQLite: "SCAN <tabela>" sem índice ("SCAN ... USING INDEX" percorre um
+  índice, como na paginação por cursor, e não conta)
+- PostgreSQL: "Seq Scan on <tabela>"; com poucos registros o planner
+  prefere o Seq Scan mesmo havendo índice, por isso full_scans() desliga
+  enable_seqscan: o Seq Scan só aparece se nenhum índice servir
+"""
+
+import re
+
+from django.db import connection as default_connection
+
+# Tabela e alias das consultas do Django: FROM "orders_orderitem" U0
+ALIAS_RE = re.compile(r'"(\w+)" ([A-Z]\d+)\b')
+SQLITE_SCAN_RE = re.compile(r"^SCAN (\w+)$")
+POSTGRES_SCAN_RE = re.compile(r"Seq Scan on (\w+)")
+
+EXPLAINED_STATEMENTS = ("SELECT", "UPDATE", "DELETE")
+
+
+def explain(sql, connection=default_connection):
+    """
+    Linhas do plano de execução da consulta.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return [row[3] for row in cursor.fetchall()]
+        cursor.execute(f"EXPLAIN {sql}")
+        return [row[0] for row in cursor.fetchall()]
+
+
+def scanned_tables(sql, plan, vendor):
+    """
+    Tabelas lidas sequencialmente por inteiro no plano.
+    """
+    if vendor == "sqlite":
+        aliases = dict((alias, table) for table, alias in ALIAS_RE.findall(sql))
+        names = [
+            match.group(1)
+            for match in map(SQLITE_SCAN_RE.match, plan)
+            if match is not None
+        ]
+        return {aliases.get(name, name) for name in names}
+    return {
+        match.group(1) for line in plan for match in POSTGRES_SCAN_RE.finditer(line)
+    }
+
+
+def full_scans(queries, tables, connection=default_connection):
+    """
+    Leituras completas das tabelas informadas nas consultas.
+
+    Args:
+        queries: consultas capturadas (dicts com "sql", como em
+            CaptureQueriesContext.captured_queries)
+        tables: nomes das tabelas grandes (ex: {"products_product"})
+        connection: conexão onde as consultas rodaram
+
+    Returns:
+        list: (tabela, sql) de cada leitura completa encontrada
+    """
+    statements = [
+        query["sql"]
+        for query in queries
+        if query["sql"].lstrip().upper().startswith(EXPLAINED_STATEMENTS)
+    ]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+    try:
+        found = []
+        for sql in statements:
+            plan = explain(sql, connection)
+            for table in sorted(scanned_tables(sql, plan, connection.vendor)):
+                if table in tables:
+                    found.append((table, sql))
+        return found
+    finally:
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("RESET enable_seqscan")
@@ -0,0 +1,66 @@
+"""
+Renderer JSON rápido (orjson) com fallback para o JSONRenderer do DRF.
+
+O orjson serializa dicts, listas, strings e números nativamente, em C; os
+demais tipos passam pelo JSONEncoder do DRF, de modo que a saída é a mesma
+do renderer padrão. A exceção são os Decimal fora dos serializers (ex:
+totais do carrinho em SerializerMethodField): o DRF os converte para float,
+aqui são escritos como número JSON com todas as casas decimais.
+
+O orjson.Fragment, usado nesses Decimal, existe a partir do orjson 3.9;
+com uma versão anterior instalada as respostas usam o renderer do DRF.
+"""
+
+import decimal
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    if isinstance(obj, decimal.Decimal) and obj.is_finite():
+        # Fragment insere o texto do número sem passar por float
+        return orjson.Fragment(str(obj))
+    return _encoder.default(obj)
+
+
+if orjson is not None:
+    OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        # Datas no formato do DRF ("Z" em UTC, sem microssegundos extras)
+        | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer que usa o orjson quando instalado.
+
+    Respostas indentadas (indent no Accept, API navegável) ou com
+    UNICODE_JSON/COMPACT_JSON desativados continuam com o renderer do DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            # orjson < 3.9, sem Fragment para os Decimal
+            or not hasattr(orjson, "Fragment")
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        content = orjson.dumps(data, default=_default, option=OPTIONS)
+        # Como o DRF, escapa U+2028 e U+2029, inválidos em JavaScript
+        return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
@@ -0,0 +1,200 @@
+"""
+Cache de respostas com stale-while-revalidate para as views públicas.
+
+Cada entrada guarda os dados da resposta e o instante em que deixa de ser
+fresca (TTL suave); o cache a remove após o TTL rígido. Entre os dois a
+entrada ainda é servida ("STALE") enquanto uma única requisição a
+recalcula em segundo plano.
+
+O recálculo é protegido por um lock com cache.add (SET NX no Redis;
+atômico dentro do processo no locmem): quando uma chave popular expira,
+apenas uma requisição executa a view e as demais servem a entrada antiga
+ou aguardam o resultado, evitando o efeito manada. O lock guarda um token
+do recálculo que o obteve; um recálculo mais longo que o timeout do lock
+não remove o lock obtido depois por outra requisição.
+
+As chaves incluem contadores de geração ("product", "category", "store")
+trocados pelos signals a cada escrita; invalidar é só trocar a geração, e
+as entradas antigas expiram sozinhas.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.response import Response
+
+# Intervalo (segundos) entre as verificações de quem aguarda o recálculo
+WAIT_INTERVAL = 0.05
+
+
+def _generation_key(name):
+    return f"response_cache:generation:{name}"
+
+
+def _new_generation():
+    # Baseada no relógio para que uma geração despejada do cache não volte
+    # a apontar para entradas antigas
+    return time.time_ns()
+
+
+def get_generations(names):
+    """
+    Retorna as gerações atuais, criando as que ainda não existem.
+    """
+    keys = [_generation_key(name) for name in names]
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            value = _new_generation()
+            if not cache.add(key, value, None):
+                # Outra requisição criou a geração primeiro
+                value = cache.get(key, value)
+            values[key] = value
+    return [values[key] for key in keys]
+
+
+def bump_generations(*names):
+    """
+    Invalida as respostas que dependem das gerações informadas.
+
+    Deve ser chamada por qualquer escrita que não passe pelos signals (ex:
+    update() em massa do estoque).
+    """
+    version = _new_generation()
+    cache.set_many({_generation_key(name): version for name in names}, None)
+
+
+def _entry_key(name, generations, request, kwargs):
+    # Uma entrada por combinação de parâmetros da URL e da query string
+    params = sorted(kwargs.items()), sorted(request.GET.lists())
+    digest = hashlib.md5(repr(params).encode()).hexdigest()
+    generation = ":".join(str(value) for value in generations)
+    return f"response_cache:{name}:{generation}:{digest}"
+
+
+def _lock_key(key):
+    return f"{key}:lock"
+
+
+def _respond(entry, status):
+    return Response(entry["data"], headers={"X-Cache": status})
+
+
+class _Recompute:
+    """
+    Executa a view e grava a resposta (apenas 200) no cache.
+    """
+
+    def __init__(self, view, key, soft_ttl, hard_ttl):
+        self.view = view
+        self.key = key
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        # Valor do lock deste recálculo
+        self.token = uuid.uuid4().hex
+
+    def acquire(self, timeout):
+        return cache.add(_lock_key(self.key), self.token, timeout)
+
+    def release(self):
+        # Só remove o lock se ainda for deste recálculo: vencido o timeout,
+        # outra requisição pode ter obtido um lock novo
+        lock = _lock_key(self.key)
+        if cache.get(lock) == self.token:
+            cache.delete(lock)
+
+    def __call__(self, request, *args, **kwargs):
+        try:
+            response = self.view(request, *args, **kwargs)
+            if response.status_code == 200 and isinstance(response, Response):
+                entry = {
+                    "data": response.data,
+                    "fresh_until": time.time() + self.soft_ttl,
+                }
+                cache.set(self.key, entry, self.hard_ttl)
+            return response
+        finally:
+            self.release()
+
+    def in_background(self, request, *args, **kwargs):
+        def run():
+            try:
+                self(request, *args, **kwargs)
+            finally:
+                # As conexões do banco são por thread
+                connections.close_all()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+
+def cached_response(name, depends_on, soft_ttl=None, hard_ttl=None):
+    """
+    Decorator de views GET públicas com cache stale-while-revalidate.
+
+    Usar abaixo de @api_view/@permission_classes (e de @conditional_get);
+    a resposta leva o cabeçalho X-Cache (HIT, STALE ou MISS).
+
+    Args:
+        name: prefixo das chaves no cache
+        depends_on: gerações que invalidam a resposta ("product", ...)
+        soft_ttl: segundos em que a entrada é fresca
+            (padrão: RESPONSE_CACHE_SOFT_TTL)
+        hard_ttl: segundos até a entrada ser removida do cache
+            (padrão: RESPONSE_CACHE_HARD_TTL)
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            key = _entry_key(name, get_generations(depends_on), request, kwargs)
+            recompute = _Recompute(
+                view,
+                key,
+                soft_ttl or settings.RESPONSE_CACHE_SOFT_TTL,
+                hard_ttl or settings.RESPONSE_CACHE_HARD_TTL,
+            )
+            lock_timeout = settings.RESPONSE_CACHE_LOCK_TIMEOUT
+
+            entry = cache.get(key)
+            if entry is not None:
+                if time.time() < entry["fresh_until"]:
+                    return _respond(entry, "HIT")
+                if not recompute.acquire(lock_timeout):
+                    # Outra requisição já está recalculando
+                    return _respond(entry, "STALE")
+                if settings.RESPONSE_CACHE_BACKGROUND_REFRESH:
+                    recompute.in_background(request, *args, **kwargs)
+                    return _respond(entry, "STALE")
+            elif not recompute.acquire(lock_timeout):
+                # Aguarda a requisição que detém o lock
+                deadline = time.monotonic() + lock_timeout
+                while time.monotonic() < deadline:
+                    time.sleep(WAIT_INTERVAL)
+                    values = cache.get_many([key, _lock_key(key)])
+                    if key in values:
+                        return _respond(values[key], "HIT")
+                    if _lock_key(key) not in values:
+                        # Lock liberado sem entrada: a resposta não foi
+                        # gravada (ex: 404, 400)
+                        break
+                # Sem resultado: executa sem o cache
+                return view(request, *args, **kwargs)
+
+            response = recompute(request, *args, **kwargs)
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,569 @@
+"""
+Geração de dados sintéticos em grande volume para benchmarks.
+
+Ao contrário de setup_test_data.py (poucos registros com get_or_create),
+todos os registros são criados com bulk_create em lotes, a partir de um
+gerador pseudoaleatório com semente fixa: a mesma semente e os mesmos
+volumes geram sempre os mesmos dados.
+
+bulk_create não dispara signals nem save(), então os slugs, códigos e
+números de pedido são gerados aqui, e a classificação dos produtos
+(ProductRating) e a contagem de produtos das categorias são reconstruídas
+no fim com recompute_ratings() e recompute_category_counts().
+
+A popularidade dos produtos segue uma distribuição enviesada (poucos
+produtos concentram muitos pedidos, avaliações e favoritos), como numa
+loja real.
+"""
+
+import random
+import string
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+from apps.accounts.models import Store
+from apps.cart.models import Cart, CartItem
+from apps.orders.models import Order, OrderItem, Payment
+from apps.products.counts import recompute_category_counts
+from apps.products.models import Category, Product
+from apps.reviews.models import ProductRating, Review
+from apps.reviews.ratings import recompute_ratings
+from apps.wishlist.models import Wishlist
+
+User = get_user_model()
+
+PASSWORD = "Test@123"
+CENTS = Decimal("0.01")
+
+CATEGORY_NAMES = [
+    "Eletrônicos",
+    "Roupas",
+    "Livros",
+    "Móveis",
+    "Calçados",
+    "Beleza",
+    "Desporto",
+    "Brinquedos",
+    "Alimentação",
+    "Informática",
+    "Telemóveis",
+    "Casa e Cozinha",
+]
+PRODUCT_NOUNS = [
+    "Smartphone",
+    "Portátil",
+    "Camisa",
+    "Sapatilha",
+    "Mesa",
+    "Cadeira",
+    "Livro",
+    "Relógio",
+    "Mochila",
+    "Auscultadores",
+    "Televisor",
+    "Frigorífico",
+    "Vestido",
+    "Perfume",
+    "Bola",
+    "Panela",
+]
+PRODUCT_ADJECTIVES = [
+    "Premium",
+    "Clássico",
+    "Moderno",
+    "Compacto",
+    "Profissional",
+    "Económico",
+    "Elegante",
+    "Resistente",
+    "Leve",
+    "Inteligente",
+]
+PRODUCT_BRANDS = ["Kwanza", "Lubango", "Huíla", "Namibe", "Benguela", "Tundavala"]
+DESCRIPTION_WORDS = [
+    "qualidade",
+    "garantia",
+    "original",
+    "algodão",
+    "madeira",
+    "bateria",
+    "entrega",
+    "rápida",
+    "durável",
+    "confortável",
+    "tamanho",
+    "cor",
+    "novo",
+    "importado",
+    "nacional",
+]
+ORDER_STATUS_WEIGHTS = {
+    "delivered": 50,
+    "shipped": 10,
+    "processing": 10,
+    "confirmed": 15,
+    "pending": 10,
+    "cancelled": 5,
+}
+PAYMENT_STATUS_BY_ORDER_STATUS = {
+    "pending": "pending",
+    "cancelled": "refunded",
+}
+# Order.payment_status -> Payment.payment_status
+PAYMENT_RECORD_STATUS = {
+    "paid": "completed",
+    "pending": "pending",
+    "refunded": "refunded",
+}
+
+
+class DataSeeder:
+    """
+    Cria os registros sintéticos. Os volumes são passados por keyword;
+    os usuários e lojas criados usam o prefixo informado, o que permite
+    removê-los (e tudo o que depende deles) com clear().
+
+    Exemplo:
+        DataSeeder(seed=42, products=1_000_000, reviews=2_000_000).run()
+    """
+
+    DEFAULTS = {
+        "categories": 20,
+        "stores": 100,
+        "products": 100_000,
+        "buyers": 10_000,
+        "carts": 10_000,
+        "orders": 50_000,
+        "reviews": 100_000,
+        "wishlist": 50_000,
+    }
+
+    def __init__(
+        self,
+        seed=42,
+        prefix="seed",
+        batch_size=5000,
+        max_items=5,
+        stdout=None,
+        **volumes,
+    ):
+        unknown = set(volumes) - set(self.DEFAULTS)
+        if unknown:
+            raise ValueError(f"Volumes desconhecidos: {', '.join(sorted(unknown))}")
+        self.volumes = {**self.DEFAULTS, **volumes}
+        self.seed = seed
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.max_items = max_items
+        self.stdout = stdout
+        # A semente inclui o prefixo para que execuções com prefixos
+        # diferentes não gerem códigos únicos repetidos
+        self.rng = random.Random(f"{seed}:{prefix}")
+
+        self.category_ids = []
+        self.seller_ids = []
+        self.store_ids = []
+        self.buyer_ids = []
+        self.product_ids = []
+        self.product_prices = []
+
+    # Utilitários
+
+    def log(self, message, ending="\n"):
+        if self.stdout is not None:
+            self.stdout.write(message, ending=ending)
+            self.stdout.flush()
+
+    def bulk_create(self, label, model, objects, total):
+        """
+        Grava os objetos de um gerador em lotes, mostrando o progresso.
+
+        Returns:
+            list: IDs criados, na ordem do gerador
+        """
+        ids = []
+        start = time.perf_counter()
+        batch = []
+
+        def flush():
+            created = model.objects.bulk_create(batch)
+            ids.extend(obj.pk for obj in created)
+            batch.clear()
+            elapsed = time.perf_counter() - start
+            self.log(
+                f"\r  {label}: {len(ids):,}/{total:,}"
+                f" ({len(ids) / elapsed if elapsed else 0:,.0f}/s)",
+                ending="",
+            )
+
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                flush()
+        if batch:
+            flush()
+        self.log(f"\r  {label}: {len(ids):,} em {time.perf_counter() - start:.1f} s")
+        return ids
+
+    def popular_product(self):
+        """
+        Índice de um produto com viés para os primeiros (mais populares).
+        """
+        return int(len(self.product_ids) * self.rng.random() ** 3)
+
+    def unique_pairs(self, total, first_ids, pick_second):
+        """
+        Gera até `total` pares únicos (id, índice do produto).
+        """
+        seen = set()
+        attempts = 0
+        while len(seen) < total and attempts < total * 10:
+            attempts += 1
+            pair = (self.rng.choice(first_ids), pick_second())
+            if pair not in seen:
+                seen.add(pair)
+                yield pair
+
+    def unique_code(self, seen, length, alphabet=string.ascii_letters + string.digits):
+        while True:
+            code = "".join(self.rng.choices(alphabet, k=length))
+            if code not in seen:
+                seen.add(code)
+                return code
+
+    def seeded_products(self):
+        # Subquery em vez da lista de IDs (limite de parâmetros do SQLite)
+        return Product.objects.filter(store__slug__startswith=f"{self.prefix}-loja-")
+
+    # Etapas
+
+    def clear(self):
+        """
+        Remove os dados gerados com o prefixo: usuários, lojas, produtos,
+        categorias e tudo o que depende deles (carrinhos, pedidos,
+        avaliações, favoritos e classificações).
+
+        As tabelas são esvaziadas de baixo para cima com DELETEs diretos.
+        O delete() em cascata buscaria cada objeto para disparar os
+        signals (ex: uma atualização de ProductRating por avaliação).
+        """
+        users = User.objects.filter(username__startswith=f"{self.prefix}_")
+        products = self.seeded_products()
+        orders = Order.objects.filter(
+            Q(user__in=users) | Q(items__product__in=products)
+        )
+        carts = Cart.objects.filter(
+            Q(user__in=users) | Q(cartitems__product__in=products)
+        )
+        steps = [
+            ("pagamentos", Payment.objects.filter(order__in=orders)),
+            ("itens de pedido", OrderItem.objects.filter(order__in=orders)),
+            ("pedidos", orders),
+            ("itens de carrinho", CartItem.objects.filter(cart__in=carts)),
+            ("carrinhos", carts),
+            (
+                "avaliações",
+                Review.objects.filter(Q(user__in=users) | Q(product__in=products)),
+            ),
+            ("classificações", ProductRating.objects.filter(product__in=products)),
+            (
+                "favoritos",
+                Wishlist.objects.filter(Q(user__in=users) | Q(product__in=products)),
+            ),
+            ("produtos", products),
+            ("lojas", Store.objects.filter(owner__in=users)),
+            (
+                "categorias",
+                Category.objects.filter(slug__startswith=f"{self.prefix}-").exclude(
+                    products__in=Product.objects.exclude(pk__in=products)
+                ),
+            ),
+        ]
+        with transaction.atomic():
+            # Os IDs são lidos antes de qualquer remoção: os filtros dependem
+            # das tabelas esvaziadas nas etapas anteriores
+            plan = [
+                (
+                    label,
+                    queryset,
+                    list(queryset.values_list("pk", flat=True).distinct()),
+                )
+                for label, queryset in steps
+            ]
+            for label, queryset, ids in plan:
+                for start in range(0, len(ids), self.batch_size):
+                    batch = ids[start : start + self.batch_size]
+                    queryset.model.objects.filter(pk__in=batch)._raw_delete(queryset.db)
+                self.log(f"  {label}: {len(ids):,} removidos")
+            # Usuários com delete() normal: remove também tokens e permissões
+            count, _ = users.delete()
+            self.log(f"  usuários: {count:,} registros removidos")
+
+    def create_categories(self):
+        total = self.volumes["categories"]
+        self.category_ids = self.bulk_create(
+            "categorias",
+            Category,
+            (
+                Category(
+                    name=f"{CATEGORY_NAMES[i % len(CATEGORY_NAMES)]} {i // len(CATEGORY_NAMES) + 1}",
+                    slug=f"{self.prefix}-categoria-{i}",
+                )
+                for i in range(total)
+            ),
+            total,
+        )
+
+    def create_users(self, label, user_type, total):
+        password = make_password(PASSWORD)  # um hash para todos (lento por design)
+        return self.bulk_create(
+            label,
+            User,
+            (
+                User(
+                    username=f"{self.prefix}_{user_type}_{i}",
+                    email=f"{self.prefix}_{user_type}_{i}@example.com",
+                    password=password,
+                    first_name=user_type.capitalize(),
+                    last_name=str(i),
+                    user_type=user_type,
+                    is_approved_seller=user_type == "seller",
+                )
+                for i in range(total)
+            ),
+            total,
+        )
+
+    def create_stores(self):
+        total = self.volumes["stores"]
+        self.seller_ids = self.create_users("vendedores", "seller", total)
+        self.store_ids = self.bulk_create(
+            "lojas",
+            Store,
+            (
+                Store(
+                    name=f"Loja {self.rng.choice(PRODUCT_BRANDS)} {i}",
+                    slug=f"{self.prefix}-loja-{i}",
+                    description="Loja gerada para benchmarks",
+                    owner_id=owner_id,
+                )
+                for i, owner_id in enumerate(self.seller_ids)
+            ),
+            total,
+        )
+
+    def create_products(self):
+        total = self.volumes["products"]
+        self.product_prices = []
+
+        def products():
+            for i in range(total):
+                name = (
+                    f"{self.rng.choice(PRODUCT_NOUNS)} "
+                    f"{self.rng.choice(PRODUCT_ADJECTIVES)} "
+                    f"{self.rng.choice(PRODUCT_BRANDS)} {i}"
+                )
+                price = Decimal(self.rng.randint(100, 1_000_000)).quantize(CENTS)
+                stock = self.rng.choice((0, *range(1, 500)))
+                self.product_prices.append(price)
+                yield Product(
+                    name=name,
+                    slug=f"{self.prefix}-{slugify(name)}",
+                    description=" ".join(self.rng.choices(DESCRIPTION_WORDS, k=12)),
+                    price=price,
+                    stock_quantity=stock,
+                    in_stock=stock > 0,
+                    featured=self.rng.random() < 0.05,
+                    category_id=(
+                        self.rng.choice(self.category_ids)
+                        if self.category_ids
+                        else None
+                    ),
+                    store_id=self.rng.choice(self.store_ids),
+                )
+
+        self.product_ids = self.bulk_create("produtos", Product, products(), total)
+
+    def create_buyers(self):
+        self.buyer_ids = self.create_users(
+            "compradores", "buyer", self.volumes["buyers"]
+        )
+
+    def create_carts(self):
+        total = self.volumes["carts"]
+        codes = set()
+        # Metade dos carrinhos pertence a compradores, o resto é anônimo
+        owners = self.rng.sample(self.buyer_ids, min(total // 2, len(self.buyer_ids)))
+        owners += [None] * (total - len(owners))
+        cart_ids = self.bulk_create(
+            "carrinhos",
+            Cart,
+            (
+                Cart(user_id=user_id, cart_code=self.unique_code(codes, 11))
+                for user_id in owners
+            ),
+            total,
+        )
+
+        def items():
+            for cart_id in cart_ids:
+                count = self.rng.randint(1, self.max_items)
+                for index in {self.popular_product() for _ in range(count)}:
+                    yield CartItem(
+                        cart_id=cart_id,
+                        product_id=self.product_ids[index],
+                        quantity=self.rng.randint(1, 3),
+                    )
+
+        self.bulk_create(
+            "itens de carrinho", CartItem, items(), total * (self.max_items + 1) // 2
+        )
+
+    def create_orders(self):
+        total = self.volumes["orders"]
+        numbers = set()
+        statuses = list(ORDER_STATUS_WEIGHTS)
+        weights = list(ORDER_STATUS_WEIGHTS.values())
+        order_items = []  # [(índices dos produtos, quantidades)] por pedido
+        payment_statuses = []
+
+        def orders():
+            for _ in range(total):
+                indexes = list(
+                    {
+                        self.popular_product()
+                        for _ in range(self.rng.randint(1, self.max_items))
+                    }
+                )
+                quantities = [self.rng.randint(1, 3) for _ in indexes]
+                order_items.append((indexes, quantities))
+                order_status = self.rng.choices(statuses, weights)[0]
+                payment_status = PAYMENT_STATUS_BY_ORDER_STATUS.get(
+                    order_status, "paid"
+                )
+                payment_statuses.append(payment_status)
+                yield Order(
+                    order_number=f"ORD-{self.unique_code(numbers, 12, string.hexdigits[:16]).upper()}",
+                    user_id=self.rng.choice(self.buyer_ids),
+                    status=order_status,
+                    payment_status=payment_status,
+                    total_amount=sum(
+                        self.product_prices[index] * quantity
+                        for index, quantity in zip(indexes, quantities)
+                    ),
+                    shipping_address="Rua das Acácias, 123, Lubango, Huíla, Angola",
+                )
+
+        order_ids = self.bulk_create("pedidos", Order, orders(), total)
+
+        def items():
+            for order_id, (indexes, quantities) in zip(order_ids, order_items):
+                for index, quantity in zip(indexes, quantities):
+                    yield OrderItem(
+                        order_id=order_id,
+                        product_id=self.product_ids[index],
+                        quantity=quantity,
+                        price=self.product_prices[index],
+                    )
+
+        self.bulk_create(
+            "itens de pedido", OrderItem, items(), total * (self.max_items + 1) // 2
+        )
+
+        def payments():
+            for order_id, (indexes, quantities), payment_status in zip(
+                order_ids, order_items, payment_statuses
+            ):
+                amount = sum(
+                    self.product_prices[index] * quantity
+                    for index, quantity in zip(indexes, quantities)
+                )
+                yield Payment(
+                    order_id=order_id,
+                    payment_method=self.rng.choice(("reference", "mobile", "card")),
+                    payment_status=PAYMENT_RECORD_STATUS[payment_status],
+                    amount=amount,
+                    transaction_id=f"TXN-SEED{order_id}",
+                )
+
+        self.bulk_create("pagamentos", Payment, payments(), total)
+
+    def create_reviews(self):
+        total = self.volumes["reviews"]
+        self.bulk_create(
+            "avaliações",
+            Review,
+            (
+                Review(
+                    user_id=user_id,
+                    product_id=self.product_ids[index],
+                    rating=self.rng.choices((1, 2, 3, 4, 5), (5, 5, 15, 35, 40))[0],
+                    comment=" ".join(self.rng.choices(DESCRIPTION_WORDS, k=8)),
+                )
+                for user_id, index in self.unique_pairs(
+                    total, self.buyer_ids, self.popular_product
+                )
+            ),
+            total,
+        )
+
+    def create_wishlist(self):
+        total = self.volumes["wishlist"]
+        self.bulk_create(
+            "favoritos",
+            Wishlist,
+            (
+                Wishlist(user_id=user_id, product_id=self.product_ids[index])
+                for user_id, index in self.unique_pairs(
+                    total, self.buyer_ids, self.popular_product
+                )
+            ),
+            total,
+        )
+
+    def create_ratings(self):
+        start = time.perf_counter()
+        total = recompute_ratings(self.seeded_products().values("id"))
+        self.log(f"  classificações: {total:,} em {time.perf_counter() - start:.1f} s")
+
+    def create_category_counts(self):
+        start = time.perf_counter()
+        total = recompute_category_counts(
+            Category.objects.filter(
+                slug__startswith=f"{self.prefix}-categoria-"
+            ).values("id")
+        )
+        self.log(
+            f"  contagens das categorias: {total:,} em"
+            f" {time.perf_counter() - start:.1f} s"
+        )
+
+    def run(self):
+        """
+        Cria todos os registros, na ordem das dependências.
+        """
+        if User.objects.filter(username__startswith=f"{self.prefix}_").exists():
+            raise ValueError(
+                f"Já existem dados com o prefixo '{self.prefix}'. "
+                "Use outro prefixo ou remova-os antes."
+            )
+
+        start = time.perf_counter()
+        self.create_categories()
+        self.create_stores()
+        self.create_products()
+        self.create_buyers()
+        if self.product_ids and self.buyer_ids:
+            self.create_carts()
+            self.create_orders()
+            self.create_reviews()
+            self.create_wishlist()
+        self.create_ratings()
+        self.create_category_counts()
+        self.log(f"Concluído em {time.perf_counter() - start:.1f} s")
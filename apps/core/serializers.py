@@ -0,0 +1,62 @@
+from django.db.models import prefetch_related_objects
+
+
+def nested_select_related(field, serializer_class):
+    """
+    Retorna os caminhos de select_related de um serializer aninhado
+    prefixados pelo nome do campo (ex: "product", "product__store").
+    """
+    return (field,) + tuple(
+        f"{field}__{related}" for related in serializer_class.select_related_fields
+    )
+
+
+class EagerLoadingMixin:
+    """
+    Contrato para serializers declararem as relações que leem.
+
+    Cada serializer informa os select_related, prefetch_related e only()
+    necessários para serializar uma lista sem consultas extras por item,
+    e as views aplicam esse formato ao queryset com setup_eager_loading().
+
+    Exemplo:
+        products = ProductListSerializer.setup_eager_loading(Product.objects.all())
+        serializer = ProductListSerializer(products, many=True)
+    """
+
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    only_fields = ()
+
+    @classmethod
+    def get_prefetch_related(cls):
+        """
+        Retorna os lookups de prefetch. Subclasses podem sobrescrever para
+        construir objetos Prefetch com querysets de serializers aninhados.
+        """
+        return list(cls.prefetch_related_fields)
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Aplica ao queryset as relações e campos lidos pelo serializer.
+        """
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+        prefetches = cls.get_prefetch_related()
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        if cls.only_fields:
+            queryset = queryset.only(*cls.only_fields)
+        return queryset
+
+    @classmethod
+    def setup_eager_loading_for(cls, instances):
+        """
+        Carrega as relações prefetch de instâncias já obtidas
+        (ex: request.user.cart). Os select_related não se aplicam aqui.
+        """
+        prefetches = cls.get_prefetch_related()
+        if prefetches:
+            prefetch_related_objects(list(instances), *prefetches)
+        return instances
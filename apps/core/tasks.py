@@ -0,0 +1,172 @@
+"""
+Fila de tarefas em segundo plano persistida no banco (modelo Task).
+
+Uma função vira tarefa com o decorator @task e é enfileirada com
+.delay(*args, **kwargs); os argumentos precisam ser serializáveis em JSON
+(ids, não instâncias). A linha da tarefa é gravada na transação de quem
+enfileira: se a requisição é desfeita, a tarefa também é, e o worker só a
+enxerga depois do commit.
+
+Os workers (python manage.py run_tasks) pegam uma tarefa pronta por vez
+com SELECT ... FOR UPDATE SKIP LOCKED e a executam dentro da mesma
+transação: as escritas da tarefa e a sua remoção da fila são confirmadas
+juntas, e se o worker morrer no meio a transação é desfeita e a tarefa
+volta a ficar disponível. Workers concorrentes pulam as linhas bloqueadas
+em vez de esperar por elas. Uma exceção desfaz as escritas da tarefa e a
+reagenda com espera exponencial (TASK_RETRY_DELAY * 2^(tentativa-1), até
+TASK_RETRY_MAX_DELAY); após TASK_MAX_ATTEMPTS tentativas fica "failed".
+
+No SQLite (sem SKIP LOCKED nem bloqueio de linhas) use um único worker.
+Com TASK_QUEUE_EAGER (ativo nos testes) .delay() executa a tarefa na hora.
+"""
+
+import logging
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+# Nome da tarefa -> função, preenchido pelo decorator @task
+TASKS = {}
+
+
+def task(function=None, *, max_attempts=None):
+    """
+    Registra a função como tarefa e adiciona .delay() para enfileirá-la.
+
+    Exemplo:
+        @task(max_attempts=3)
+        def send_order_email(order_id): ...
+
+        send_order_email.delay(order.id)
+    """
+
+    def decorator(function):
+        name = f"{function.__module__}.{function.__qualname__}"
+        TASKS[name] = function
+        function.task_name = name
+        function.delay = lambda *args, **kwargs: enqueue(
+            name, args, kwargs, max_attempts=max_attempts
+        )
+        return function
+
+    return decorator(function) if function is not None else decorator
+
+
+def enqueue(name, args=(), kwargs=None, max_attempts=None, delay=0):
+    """
+    Enfileira a tarefa registrada com o nome informado.
+
+    Args:
+        name: nome da tarefa (módulo.função)
+        args, kwargs: argumentos serializáveis em JSON
+        max_attempts: tentativas antes de falhar (padrão TASK_MAX_ATTEMPTS)
+        delay: segundos até a tarefa ficar pronta
+
+    Returns:
+        Task criada, ou None no modo TASK_QUEUE_EAGER
+    """
+    kwargs = kwargs or {}
+    if settings.TASK_QUEUE_EAGER:
+        TASKS[name](*args, **kwargs)
+        return None
+    return Task.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def retry_delay(attempts):
+    """
+    Segundos de espera antes da próxima tentativa.
+    """
+    delay = settings.TASK_RETRY_DELAY * 2 ** (attempts - 1)
+    return min(delay, settings.TASK_RETRY_MAX_DELAY)
+
+
+def run_next_task():
+    """
+    Executa a próxima tarefa pronta, se houver.
+
+    Returns:
+        bool: True se alguma tarefa foi executada (com sucesso ou não)
+    """
+    with transaction.atomic():
+        task = (
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(status=Task.QUEUED, run_at__lte=timezone.now())
+            .order_by("run_at", "id")
+            .first()
+        )
+        if task is None:
+            return False
+
+        task.attempts += 1
+        try:
+            # Savepoint: uma exceção desfaz só as escritas da tarefa
+            with transaction.atomic():
+                TASKS[task.name](*task.args, **task.kwargs)
+        except Exception:
+            logger.exception("Tarefa %s falhou", task)
+            task.last_error = traceback.format_exc()
+            if task.attempts >= task.max_attempts:
+                task.status = Task.FAILED
+            else:
+                task.run_at = timezone.now() + timedelta(
+                    seconds=retry_delay(task.attempts)
+                )
+            task.save(
+                update_fields=[
+                    "attempts",
+                    "status",
+                    "run_at",
+                    "last_error",
+                    "updated_at",
+                ]
+            )
+        else:
+            task.delete()
+    return True
+
+
+def run_worker(stop=None, burst=False, poll_interval=None):
+    """
+    Executa tarefas até stop (threading.Event) ser acionado.
+
+    Args:
+        stop: evento de parada, verificado entre as tarefas
+        burst: termina quando não houver tarefas prontas
+        poll_interval: segundos de espera com a fila vazia
+
+    Returns:
+        int: número de tarefas executadas
+    """
+    stop = stop or threading.Event()
+    if poll_interval is None:
+        poll_interval = settings.TASK_POLL_INTERVAL
+    executed = 0
+    while not stop.is_set():
+        try:
+            ran = run_next_task()
+        except DatabaseError:
+            # Ex: banco indisponível ou bloqueado; a transação foi desfeita e
+            # a tarefa volta para a fila
+            logger.exception("Erro ao executar a fila de tarefas")
+            ran = False
+        if ran:
+            executed += 1
+        elif burst:
+            break
+        else:
+            stop.wait(poll_interval)
+    return executed
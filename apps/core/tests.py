@@ -0,0 +1,679 @@
+import json
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import F, Sum
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from apps.accounts.models import Store
+from apps.cart.models import Cart
+from apps.orders.models import Order, OrderItem
+from apps.products.models import Category, Product
+from apps.reviews.models import ProductRating, Review
+from apps.wishlist.models import Wishlist
+from .metrics import MetricsRegistry, registry
+from .models import Task
+from .parsers import FastJSONParser
+from .query_plans import full_scans
+from .renderers import FastJSONRenderer
+from .response_cache import bump_generations, cached_response
+from .seeding import DataSeeder
+from .tasks import run_next_task, task
+
+User = get_user_model()
+
+# Chamadas das tarefas de teste da fila
+task_calls = []
+
+
+@task
+def record_call(value):
+    task_calls.append(value)
+
+
+@task(max_attempts=2)
+def create_category_and_fail(name):
+    Category.objects.create(name=name)
+    raise RuntimeError("gateway indisponível")
+
+
+class MetricsRegistryTest(TestCase):
+    """Testes para o formato de exposição das métricas"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Testa os buckets, a soma e a contagem do histograma"""
+        metrics = MetricsRegistry()
+        for duration in (0.003, 0.02, 3.0):
+            metrics.observe_request("product_list", "GET", 200, duration, 10, 1, 0.001)
+
+        output = metrics.render()
+        self.assertIn("# TYPE http_request_duration_seconds histogram", output)
+        self.assertIn(
+            'http_request_duration_seconds_bucket{view="product_list",method="GET",le="0.005"} 1',
+            output,
+        )
+        self.assertIn(
+            'http_request_duration_seconds_bucket{view="product_list",method="GET",le="0.025"} 2',
+            output,
+        )
+        self.assertIn(
+            'http_request_duration_seconds_bucket{view="product_list",method="GET",le="+Inf"} 3',
+            output,
+        )
+        self.assertIn(
+            'http_request_duration_seconds_count{view="product_list",method="GET"} 3',
+            output,
+        )
+        self.assertIn(
+            'http_requests_total{view="product_list",method="GET",status="200"} 3',
+            output,
+        )
+
+    def test_label_values_are_escaped(self):
+        """Testa o escape de aspas nos labels"""
+        metrics = MetricsRegistry()
+        metrics.observe_request('a"b', "GET", 200, 0.1, 10, 0, 0.0)
+        self.assertIn('view="a\\"b"', metrics.render())
+
+
+class MetricsMiddlewareTest(TestCase):
+    """Testes para a coleta de métricas por rota"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        registry.reset()
+        self.addCleanup(registry.reset)
+        seller = User.objects.create_user(
+            username="seller",
+            email="seller@example.com",
+            password="sellerpass123",
+            user_type="seller",
+        )
+        store = Store.objects.create(name="Test Store", owner=seller)
+        Product.objects.create(name="Test Product", price=10, store=store)
+
+    @override_settings(METRICS_ENABLED=True, METRICS_TOKEN="metrics-token")
+    def test_records_requests_per_route(self):
+        """Testa o registro de latência, queries e tamanho por nome da rota"""
+        response = self.client.get(reverse("product_list"))
+        self.client.get("/rota-inexistente/")
+
+        output = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer metrics-token"
+        ).content.decode()
+        labels = 'view="product_list",method="GET"'
+        self.assertIn(
+            f'http_requests_total{{{labels},status="200"}} 1',
+            output,
+        )
+        self.assertIn(f"http_request_duration_seconds_count{{{labels}}} 1", output)
+        # Uma query para a página; os validadores vêm das gerações do cache
+        self.assertIn(f'db_queries_per_request_bucket{{{labels},le="1"}} 1', output)
+        self.assertIn(f'db_queries_per_request_bucket{{{labels},le="0"}} 0', output)
+        self.assertIn(
+            f"http_response_size_bytes_sum{{{labels}}} {len(response.content)}",
+            output,
+        )
+        self.assertIn('view="<unresolved>"', output)
+
+    def test_disabled_by_default(self):
+        """Testa que nada é coletado com METRICS_ENABLED desativado"""
+        self.client.get(reverse("product_list"))
+        self.assertNotIn("http_requests_total{", registry.render())
+
+    @override_settings(METRICS_TOKEN="metrics-token")
+    def test_metrics_requires_token(self):
+        """Testa que /metrics só responde com o token, qualquer que seja o IP"""
+        for authorization in ("", "Bearer outro-token", "Basic metrics-token"):
+            with self.subTest(authorization=authorization):
+                # Atrás do nginx todas as requisições vêm de 127.0.0.1
+                response = self.client.get(
+                    reverse("metrics"),
+                    REMOTE_ADDR="127.0.0.1",
+                    HTTP_AUTHORIZATION=authorization,
+                )
+                self.assertEqual(response.status_code, 403)
+
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer metrics-token"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            response["Content-Type"].startswith("text/plain; version=0.0.4")
+        )
+
+    @override_settings(METRICS_TOKEN="")
+    def test_metrics_closed_without_token(self):
+        """Testa que /metrics fica fechado sem METRICS_TOKEN configurado"""
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer ")
+        self.assertEqual(response.status_code, 403)
+
+
+class SeedDataCommandTest(TestCase):
+    """Testes para o comando seed_data"""
+
+    VOLUMES = [
+        "--categories=3",
+        "--stores=2",
+        "--products=40",
+        "--buyers=10",
+        "--carts=6",
+        "--orders=15",
+        "--reviews=30",
+        "--wishlist=12",
+        "--batch-size=7",
+    ]
+
+    def seed(self, *args):
+        call_command("seed_data", *self.VOLUMES, *args, stdout=StringIO())
+
+    def test_creates_requested_volumes(self):
+        """Testa as quantidades criadas e a consistência dos dados"""
+        self.seed()
+
+        self.assertEqual(Category.objects.count(), 3)
+        self.assertEqual(Store.objects.count(), 2)
+        self.assertEqual(Product.objects.count(), 40)
+        self.assertEqual(User.objects.filter(user_type="buyer").count(), 10)
+        self.assertEqual(Cart.objects.count(), 6)
+        self.assertEqual(Order.objects.count(), 15)
+        self.assertEqual(Review.objects.count(), 30)
+        self.assertEqual(Wishlist.objects.count(), 12)
+
+        # O total de cada pedido é a soma dos seus itens
+        for order in Order.objects.all():
+            items_total = OrderItem.objects.filter(order=order).aggregate(
+                total=Sum(F("price") * F("quantity"))
+            )["total"]
+            self.assertEqual(order.total_amount, items_total)
+
+        # Classificações criadas a partir das avaliações
+        for rating in ProductRating.objects.all():
+            reviews = Review.objects.filter(product=rating.product)
+            self.assertEqual(rating.total_reviews, reviews.count())
+            self.assertEqual(
+                rating.rating_sum, reviews.aggregate(total=Sum("rating"))["total"]
+            )
+        self.assertEqual(
+            ProductRating.objects.count(),
+            Review.objects.values("product").distinct().count(),
+        )
+
+        # Contagens das categorias a partir dos produtos
+        for category in Category.objects.all():
+            self.assertEqual(
+                category.product_count,
+                category.products.filter(is_listed=True, in_stock=True).count(),
+            )
+        self.assertGreater(
+            sum(Category.objects.values_list("product_count", flat=True)), 0
+        )
+
+    def test_same_seed_generates_same_data(self):
+        """Testa que a mesma semente gera os mesmos dados"""
+        self.seed("--seed=7")
+        first = list(Product.objects.order_by("id").values_list("name", "price"))
+
+        self.seed("--seed=7", "--clear")
+        self.assertEqual(Product.objects.count(), 40)
+        second = list(Product.objects.order_by("id").values_list("name", "price"))
+        self.assertEqual(first, second)
+
+    def test_clear_removes_seeded_data_only(self):
+        """Testa que --clear remove apenas os dados com o prefixo"""
+        seller = User.objects.create_user(
+            username="vendedor",
+            email="vendedor@example.com",
+            password="testpass123",
+            user_type="seller",
+        )
+        store = Store.objects.create(name="Loja Real", owner=seller)
+        Product.objects.create(name="Produto Real", price=10, store=store)
+
+        self.seed()
+        call_command(
+            "seed_data",
+            "--clear",
+            "--products=0",
+            "--stores=0",
+            "--categories=0",
+            "--buyers=0",
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(
+            list(Product.objects.values_list("name", flat=True)), ["Produto Real"]
+        )
+        self.assertFalse(Review.objects.exists())
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(Cart.objects.exists())
+        self.assertTrue(User.objects.filter(username="vendedor").exists())
+
+    def test_existing_prefix_is_rejected(self):
+        """Testa o erro ao repetir um prefixo sem --clear"""
+        self.seed()
+        with self.assertRaisesMessage(CommandError, "prefixo"):
+            self.seed()
+
+
+class ResponseCacheTest(TestCase):
+    """Testes para o cache stale-while-revalidate de respostas"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        cache.clear()
+        self.factory = RequestFactory()
+        self.calls = 0
+        self.status = 200
+
+        @cached_response("test", depends_on=("product",))
+        def view(request):
+            self.calls += 1
+            data = {"calls": self.calls, "page": request.GET.get("page")}
+            return Response(data, status=self.status)
+
+        self.view = view
+
+    def get(self, **params):
+        return self.view(self.factory.get("/catalogo/", params))
+
+    def stale(self):
+        # Relógio adiantado além do TTL suave e aquém do TTL rígido
+        return mock.patch("time.time", return_value=time.time() + 60)
+
+    def test_hit_after_miss(self):
+        """Testa que a view é executada uma única vez"""
+        first = self.get()
+        second = self.get()
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(self.calls, 1)
+
+    def test_key_per_query_parameters(self):
+        """Testa uma entrada por combinação de parâmetros"""
+        self.assertEqual(self.get(page=1, size=2)["X-Cache"], "MISS")
+        self.assertEqual(self.get(page=2, size=2)["X-Cache"], "MISS")
+        self.assertEqual(self.get(size=2, page=1)["X-Cache"], "HIT")
+
+    def test_invalidated_by_generation(self):
+        """Testa a invalidação ao trocar a geração"""
+        self.get()
+        bump_generations("category")
+        self.assertEqual(self.get()["X-Cache"], "HIT")
+        bump_generations("product")
+        self.assertEqual(self.get()["X-Cache"], "MISS")
+
+    def test_invalidated_by_model_signals(self):
+        """Testa a troca da geração ao salvar um produto"""
+        seller = User.objects.create_user(username="seller", user_type="seller")
+        store = Store.objects.create(name="Loja", owner=seller)
+        self.get()
+        Product.objects.create(name="Produto", price=10, store=store)
+        self.assertEqual(self.get()["X-Cache"], "MISS")
+
+    def test_errors_not_cached(self):
+        """Testa que respostas de erro não são gravadas"""
+        self.status = 404
+        self.get()
+        self.get()
+        self.assertEqual(self.calls, 2)
+
+    def test_stale_refreshed_by_single_request(self):
+        """Testa que a entrada vencida é recalculada por uma só requisição"""
+        self.get()
+        with self.stale():
+            refreshed = self.get()
+            self.assertEqual(self.get()["X-Cache"], "HIT")
+        self.assertEqual(refreshed["X-Cache"], "MISS")
+        self.assertEqual(refreshed.data["calls"], 2)
+        self.assertEqual(self.calls, 2)
+
+    def test_stale_served_while_locked(self):
+        """Testa a entrada vencida servida enquanto outra requisição recalcula"""
+        self.get()
+        with self.stale(), mock.patch.object(cache, "add", return_value=False):
+            response = self.get()
+        self.assertEqual(response["X-Cache"], "STALE")
+        self.assertEqual(response.data["calls"], 1)
+        self.assertEqual(self.calls, 1)
+
+    @override_settings(RESPONSE_CACHE_BACKGROUND_REFRESH=True)
+    def test_stale_refreshed_in_background(self):
+        """Testa o recálculo em segundo plano da entrada vencida"""
+        self.get()
+        with self.stale():
+            with mock.patch("threading.Thread.start", autospec=True) as start:
+                response = self.get()
+            self.assertEqual(response["X-Cache"], "STALE")
+            self.assertEqual(response.data["calls"], 1)
+
+            # Executa a thread de recálculo na thread do teste, sem fechar
+            # a conexão da transação do teste
+            thread = start.call_args.args[0]
+            with mock.patch("apps.core.response_cache.connections"):
+                thread.run()
+            refreshed = self.get()
+        self.assertEqual(refreshed["X-Cache"], "HIT")
+        self.assertEqual(refreshed.data["calls"], 2)
+
+    def test_waiters_stop_when_lock_released_without_entry(self):
+        """Testa que quem aguarda não espera o timeout por uma resposta de erro"""
+        self.status = 404
+        add = cache.add
+
+        def lock_held(key, *args, **kwargs):
+            # Outra requisição detém o lock e o libera com um 404 (sem entrada)
+            if key.endswith(":lock"):
+                return False
+            return add(key, *args, **kwargs)
+
+        with mock.patch.object(cache, "add", side_effect=lock_held), mock.patch(
+            "apps.core.response_cache.time.sleep"
+        ) as sleep:
+            response = self.get()
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(sleep.call_count, 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_expired_lock_taken_by_another_request_is_kept(self):
+        """Testa que um recálculo longo não remove o lock de outra requisição"""
+        locks = []
+        add = cache.add
+
+        def record_lock(key, *args, **kwargs):
+            if key.endswith(":lock"):
+                locks.append(key)
+            return add(key, *args, **kwargs)
+
+        @cached_response("slow", depends_on=("product",))
+        def slow_view(request):
+            # O lock venceu durante a view e outra requisição obteve um novo
+            cache.set(locks[0], "outra-requisicao", 30)
+            return Response({})
+
+        with mock.patch.object(cache, "add", side_effect=record_lock):
+            response = slow_view(self.factory.get("/catalogo/"))
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(cache.get(locks[0]), "outra-requisicao")
+
+    def test_lock_released_after_recompute(self):
+        """Testa que o recálculo remove o próprio lock"""
+        self.status = 404
+        self.get()
+        self.get()
+        # Sem lock pendente, a segunda requisição também executa a view
+        self.assertEqual(self.calls, 2)
+
+    @override_settings(RESPONSE_CACHE_LOCK_TIMEOUT=0)
+    def test_miss_while_locked_falls_back_to_view(self):
+        """Testa a execução sem cache quando o lock não é liberado a tempo"""
+        with mock.patch.object(cache, "add", return_value=False):
+            response = self.get()
+        self.assertFalse(response.has_header("X-Cache"))
+        self.assertEqual(self.calls, 1)
+
+
+class FastJSONTest(TestCase):
+    """Testes para o renderer e o parser JSON com orjson"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.renderer = FastJSONRenderer()
+        self.parser = FastJSONParser()
+
+    def test_same_output_as_drf(self):
+        """Testa a mesma saída do JSONRenderer do DRF"""
+        data = {
+            "name": "Café ☕",
+            "price": "10.99",
+            "created_at": datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            "label": gettext_lazy("Produto"),
+            "errors": [ErrorDetail("Obrigatório", code="required")],
+            "items": {1: 2},
+            "empty": None,
+        }
+        self.assertEqual(self.renderer.render(data), JSONRenderer().render(data))
+
+    def test_decimal_without_float(self):
+        """Testa que Decimal é escrito sem passar por float"""
+        content = self.renderer.render({"total": Decimal("12345678901234.57")})
+        self.assertEqual(content, b'{"total":12345678901234.57}')
+        self.assertEqual(
+            json.loads(content, parse_float=Decimal)["total"],
+            Decimal("12345678901234.57"),
+        )
+
+    def test_line_separators_escaped(self):
+        """Testa o escape de U+2028 e U+2029, como no DRF"""
+        content = self.renderer.render({"text": "a\u2028b\u2029c"})
+        self.assertEqual(content, b'{"text":"a\\u2028b\\u2029c"}')
+
+    def test_indent_uses_drf_renderer(self):
+        """Testa a saída indentada pelo renderer do DRF"""
+        content = self.renderer.render({"a": 1}, "application/json; indent=4", {})
+        self.assertEqual(content, b'{\n    "a": 1\n}')
+
+    def test_fallback_without_orjson(self):
+        """Testa o json da biblioteca padrão quando o orjson não está instalado"""
+        with mock.patch("apps.core.renderers.orjson", None), mock.patch(
+            "apps.core.parsers.orjson", None
+        ):
+            self.assertEqual(self.renderer.render({"a": 1}), b'{"a":1}')
+            self.assertEqual(self.parser.parse(BytesIO(b'{"a": 1}')), {"a": 1})
+
+    def test_fallback_without_fragment(self):
+        """Testa o renderer do DRF com um orjson anterior ao 3.9 (sem Fragment)"""
+        old_orjson = mock.Mock(spec=["dumps", "loads", "JSONDecodeError"])
+        with mock.patch("apps.core.renderers.orjson", old_orjson):
+            content = self.renderer.render({"total": Decimal("12.50")})
+        self.assertEqual(content, JSONRenderer().render({"total": Decimal("12.50")}))
+        old_orjson.dumps.assert_not_called()
+
+    def test_parse(self):
+        """Testa a leitura do corpo e os preços decimais"""
+        body = b'{"name": "Caf\xc3\xa9", "price": 12345678.99}'
+        data = self.parser.parse(BytesIO(body))
+        self.assertEqual(data["name"], "Café")
+        self.assertEqual(Decimal(str(data["price"])), Decimal("12345678.99"))
+        self.assertEqual(data, JSONParser().parse(BytesIO(body)))
+
+    def test_parse_error(self):
+        """Testa o erro 400 para JSON inválido"""
+        for body in (b'{"a": ', b'{"a": NaN}'):
+            with self.subTest(body=body):
+                with self.assertRaisesMessage(ParseError, "JSON parse error"):
+                    self.parser.parse(BytesIO(body))
+
+    def test_api_uses_fast_renderer(self):
+        """Testa o renderer padrão da API"""
+        response = self.client.get(reverse("category_list"))
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(response.json(), [])
+
+
+@override_settings(TASK_QUEUE_EAGER=False, TASK_RETRY_DELAY=10)
+class TaskQueueTest(TestCase):
+    """Testes para a fila de tarefas em segundo plano"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        task_calls.clear()
+
+    def test_enqueue_and_run(self):
+        """Testa que a tarefa é gravada e removida da fila após executar"""
+        record_call.delay("a")
+        record_call.delay(value="b")
+        self.assertEqual(task_calls, [])
+        self.assertEqual(Task.objects.count(), 2)
+
+        self.assertTrue(run_next_task())
+        self.assertTrue(run_next_task())
+        self.assertFalse(run_next_task())
+        self.assertEqual(task_calls, ["a", "b"])
+        self.assertFalse(Task.objects.exists())
+
+    def test_retry_with_backoff_then_fail(self):
+        """Testa o reagendamento após erro e a falha após as tentativas"""
+        create_category_and_fail.delay("Desfeita")
+        before = time.time()
+        with self.assertLogs("apps.core.tasks", "ERROR") as logs:
+            self.assertTrue(run_next_task())
+        self.assertIn("tentativa 1", logs.output[0])
+
+        queued = Task.objects.get()
+        self.assertEqual((queued.status, queued.attempts), (Task.QUEUED, 1))
+        self.assertIn("gateway indisponível", queued.last_error)
+        self.assertGreaterEqual(queued.run_at.timestamp(), before + 10)
+        # As escritas da tarefa que falhou são desfeitas
+        self.assertFalse(Category.objects.exists())
+        # Ainda não está pronta
+        self.assertFalse(run_next_task())
+
+        Task.objects.update(run_at=F("created_at"))
+        with self.assertLogs("apps.core.tasks", "ERROR"):
+            self.assertTrue(run_next_task())
+        failed = Task.objects.get()
+        self.assertEqual((failed.status, failed.attempts), (Task.FAILED, 2))
+        self.assertFalse(run_next_task())
+
+    def test_eager(self):
+        """Testa a execução imediata com TASK_QUEUE_EAGER"""
+        with override_settings(TASK_QUEUE_EAGER=True):
+            self.assertIsNone(record_call.delay("a"))
+        self.assertEqual(task_calls, ["a"])
+        self.assertFalse(Task.objects.exists())
+
+    def test_run_tasks_command(self):
+        """Testa o comando run_tasks --burst"""
+        for value in range(3):
+            record_call.delay(value)
+        out = StringIO()
+        call_command("run_tasks", "--burst", stdout=out)
+        self.assertIn("3 tarefas executadas", out.getvalue())
+        self.assertEqual(task_calls, [0, 1, 2])
+
+        with self.assertRaises(CommandError):
+            call_command("run_tasks", "--workers=0")
+
+
+class QueryPlanTest(TestCase):
+    """
+    Roda EXPLAIN nas consultas de cada endpoint sobre dados sintéticos e
+    falha se alguma ler inteira uma das tabelas grandes.
+    """
+
+    LARGE_TABLES = {
+        "accounts_customuser",
+        "cart_cart",
+        "cart_cartitem",
+        "orders_order",
+        "orders_orderitem",
+        "orders_payment",
+        "products_product",
+        "reviews_productrating",
+        "reviews_review",
+        "wishlist_wishlist",
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        DataSeeder(
+            categories=5,
+            stores=5,
+            products=300,
+            buyers=30,
+            carts=20,
+            orders=200,
+            reviews=300,
+            wishlist=100,
+        ).run()
+        cls.buyer = (
+            User.objects.filter(user_type="buyer", orders__isnull=False)
+            .distinct()
+            .first()
+        )
+        cls.store = Store.objects.filter(products__isnull=False).first()
+        cls.product = cls.store.products.first()
+
+    def assertNoFullScans(self, method, name, user=None, kwargs=None, **params):
+        cache.clear()
+        self.client.force_login(user) if user else self.client.logout()
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(
+                reverse(name, kwargs=kwargs), params
+            )
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertLess(response.status_code, 500)
+        self.assertEqual(full_scans(queries.captured_queries, self.LARGE_TABLES), [])
+
+    def test_detects_full_scan(self):
+        """Testa que uma consulta sem índice é apontada"""
+        with CaptureQueriesContext(connection) as queries:
+            list(Product.objects.filter(description="x"))
+            list(Product.objects.filter(slug="x"))
+        scans = full_scans(queries.captured_queries, self.LARGE_TABLES)
+        self.assertEqual([table for table, _ in scans], ["products_product"])
+        self.assertIn('"description"', scans[0][1])
+
+    def test_catalog(self):
+        """Testa os endpoints públicos do catálogo"""
+        category = self.product.category
+        cases = [
+            ("product_list", None, {}),
+            ("product_list", None, {"ordering": "price"}),
+            ("product_list", None, {"store": self.store.slug}),
+            ("product_list", None, {"category": category.id}),
+            ("product_detail", {"slug": self.product.slug}, {}),
+            ("category_list", None, {}),
+            ("category_detail", {"slug": category.slug}, {}),
+            ("store_products", {"slug": self.store.slug}, {}),
+            ("store_products", {"slug": self.store.slug}, {"ordering": "price"}),
+            ("product_reviews", {"product_id": self.product.id}, {}),
+        ]
+        for name, kwargs, params in cases:
+            with self.subTest(name=name, **params):
+                self.assertNoFullScans("get", name, kwargs=kwargs, **params)
+
+    def test_buyer(self):
+        """Testa os endpoints do comprador"""
+        order = self.buyer.orders.first()
+        cases = [
+            ("get", "user_orders", None, {}),
+            ("get", "order_detail", {"order_number": order.order_number}, {}),
+            ("get", "user_reviews", None, {}),
+            ("get", "get_user_wishlist", None, {}),
+            ("get", "get_user_cart", None, {}),
+            ("post", "add_review", None, {"product_id": self.product.id, "rating": 5}),
+        ]
+        for method, name, kwargs, params in cases:
+            with self.subTest(name=name):
+                self.assertNoFullScans(method, name, self.buyer, kwargs, **params)
+
+    def test_seller(self):
+        """Testa os endpoints do vendedor"""
+        cases = [
+            "seller_products",
+            "store_orders",
+            "store_reviews",
+            "export_seller_products",
+            "export_store_orders",
+            "export_store_order_items",
+        ]
+        for name in cases:
+            with self.subTest(name=name):
+                self.assertNoFullScans("get", name, self.store.owner)
@@ -0,0 +1,28 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .metrics import registry
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics(request):
+    """
+    Endpoint de métricas no formato do Prometheus.
+
+    Exige o header "Authorization: Bearer <METRICS_TOKEN>" (o coletor do
+    Prometheus); não usa a autenticação JWT da API. Sem METRICS_TOKEN
+    configurado o endpoint fica fechado. O IP de origem não é usado: atrás
+    do nginx todas as requisições chegam de 127.0.0.1.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    scheme, _, credentials = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+    if (
+        not token
+        or scheme.lower() != "bearer"
+        or not hmac.compare_digest(credentials.encode(), token.encode())
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
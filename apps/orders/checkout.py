@@ -0,0 +1,198 @@
+"""
+Criação de pedidos a partir do carrinho (checkout).
+
+O checkout executa um número constante de queries, independente do
+tamanho do carrinho:
+
+1. lê os itens do carrinho
+2. bloqueia os produtos (select_for_update, em ordem de id) e valida o estoque
+3. cria o pedido
+4. cria os itens do pedido com bulk_create
+5. baixa o estoque com um único UPDATE condicional
+6. quando algum produto esgota, atualiza as contagens das categorias
+   (apps/products/counts.py) com um único UPDATE
+7. remove do carrinho os itens pedidos (apenas os lidos no passo 1)
+
+Como o carrinho é esvaziado na mesma transação, um segundo checkout com o
+mesmo carrinho encontra-o vazio em vez de criar outro pedido, e os itens
+adicionados depois do checkout continuam no carrinho.
+
+Os bloqueios em ordem de id evitam deadlocks entre checkouts concorrentes
+com os mesmos produtos, e a condição stock_quantity >= quantidade no
+UPDATE garante que o estoque nunca fica negativo, mesmo em bancos sem
+select_for_update (ex: SQLite).
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import (
+    BooleanField,
+    Case,
+    F,
+    PositiveIntegerField,
+    Q,
+    Value,
+    When,
+)
+from django.db.models.functions import Now
+
+from apps.cart.models import CartItem
+from apps.core.response_cache import bump_generations
+from apps.products.cache import invalidate_product_details
+from apps.products.counts import apply_count_deltas
+from apps.products.models import Product
+from .models import Order, OrderItem
+
+
+class CheckoutError(Exception):
+    """
+    Erro de negócio do checkout; a mensagem é exibida ao cliente.
+    """
+
+
+class EmptyCartError(CheckoutError):
+    def __init__(self):
+        super().__init__("O carrinho está vazio.")
+
+
+class OutOfStockError(CheckoutError):
+    def __init__(self, product_name):
+        super().__init__(
+            f"O produto {product_name} não tem quantidade suficiente em estoque."
+        )
+        self.product_name = product_name
+
+
+def _decrement_stock(quantities):
+    """
+    Baixa o estoque de todos os produtos num único UPDATE.
+
+    Args:
+        quantities: dict {product_id: quantidade}
+
+    Returns:
+        int: número de produtos atualizados
+    """
+    enough_stock = Q()
+    new_stock = []
+    out_of_stock = []
+    for product_id, quantity in quantities.items():
+        enough_stock |= Q(id=product_id, stock_quantity__gte=quantity)
+        new_stock.append(When(id=product_id, then=F("stock_quantity") - quantity))
+        # As expressões do SET usam os valores anteriores da linha
+        out_of_stock.append(
+            When(id=product_id, stock_quantity=quantity, then=Value(False))
+        )
+
+    return Product.objects.filter(enough_stock).update(
+        stock_quantity=Case(
+            *new_stock,
+            default=F("stock_quantity"),
+            output_field=PositiveIntegerField(),
+        ),
+        in_stock=Case(
+            *out_of_stock, default=F("in_stock"), output_field=BooleanField()
+        ),
+        # update() não aplica o auto_now; usado pelos validadores HTTP
+        updated_at=Now(),
+    )
+
+
+def place_order(cart, user, shipping_address, idempotency_key=None):
+    """
+    Cria o pedido com os itens do carrinho e baixa o estoque.
+
+    Deve ser chamada dentro de transaction.atomic() quando o chamador
+    precisar desfazer o pedido (ex: falha no pagamento); caso contrário
+    abre a sua própria transação.
+
+    Args:
+        cart: Carrinho do cliente
+        user: Usuário que faz o pedido
+        shipping_address: Endereço de entrega
+        idempotency_key: chave de idempotência do cliente, única por usuário
+
+    Returns:
+        Order: pedido criado
+
+    Raises:
+        EmptyCartError: se o carrinho não tem itens
+        OutOfStockError: se algum produto não tem estoque suficiente
+        IntegrityError: se o usuário já tem um pedido com a mesma chave
+    """
+    with transaction.atomic():
+        quantities = {}
+        item_ids = []
+        for item_id, product_id, quantity in cart.cartitems.values_list(
+            "id", "product_id", "quantity"
+        ):
+            quantities[product_id] = quantity
+            item_ids.append(item_id)
+        if not quantities:
+            raise EmptyCartError()
+
+        products = list(
+            Product.objects.select_for_update()
+            .filter(id__in=quantities)
+            .order_by("id")
+            .only(
+                "id",
+                "name",
+                "slug",
+                "price",
+                "stock_quantity",
+                "in_stock",
+                "is_listed",
+                "category",
+            )
+        )
+        for product in products:
+            if not product.in_stock or product.stock_quantity < quantities[product.id]:
+                raise OutOfStockError(product.name)
+
+        order = Order.objects.create(
+            user=user,
+            total_amount=sum(
+                product.price * quantities[product.id] for product in products
+            ),
+            shipping_address=shipping_address,
+            idempotency_key=idempotency_key,
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(
+                order=order,
+                product=product,
+                quantity=quantities[product.id],
+                price=product.price,
+            )
+            for product in products
+        )
+
+        # Outro checkout pode ter baixado o estoque depois da validação
+        # quando o banco não suporta select_for_update
+        if _decrement_stock(quantities) != len(products):
+            raise OutOfStockError(", ".join(product.name for product in products))
+
+        # Produtos esgotados saem da contagem da categoria
+        sold_out = Counter(
+            product.category_id
+            for product in products
+            if product.is_listed and product.stock_quantity == quantities[product.id]
+        )
+        apply_count_deltas(
+            {category_id: -total for category_id, total in sold_out.items()}
+        )
+
+        # Só os itens pedidos: os adicionados depois da leitura ficam
+        CartItem.objects.filter(id__in=item_ids).delete()
+
+        # O UPDATE não dispara os signals de Product. O estoque só aparece
+        # nos detalhes; as listagens mudam apenas quando um produto esgota
+        # (in_stock), e só então as respostas do catálogo são invalidadas
+        slugs = [product.slug for product in products]
+        transaction.on_commit(lambda: invalidate_product_details(slugs))
+        if sold_out:
+            transaction.on_commit(lambda: bump_generations("product"))
+
+    return order
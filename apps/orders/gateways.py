@@ -0,0 +1,165 @@
+"""
+Gateways de pagamento usados pelo AOAPaymentProcessor.
+
+O gateway é escolhido pela configuração PAYMENT_GATEWAY:
+- "simulator": simulador local (padrão)
+- ou o caminho de uma classe (ex: "meu_app.gateways.MeuGateway")
+
+charge() recebe uma chave de idempotência estável por pagamento: se a
+tarefa de pagamento for repetida (worker reiniciado, falha depois da
+cobrança), o gateway devolve o resultado da primeira cobrança em vez de
+cobrar de novo. Um resultado "processing" indica que a confirmação chega
+depois, pelo webhook (ver payment_webhook em apps/orders/views.py).
+"""
+
+import hashlib
+import hmac
+import random
+import string
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# status: "completed", "processing" ou "failed" (cobrança); "refunded" ou
+# "failed" (reembolso)
+GatewayResult = namedtuple("GatewayResult", ["status", "transaction_id", "message"])
+
+
+def random_code(prefix, length=16):
+    code = "".join(random.choices(string.ascii_uppercase + string.digits, k=length))
+    return f"{prefix}-{code}"
+
+
+class BasePaymentGateway:
+    """
+    Interface dos gateways de pagamento.
+    """
+
+    def charge(self, payment, idempotency_key):
+        """
+        Cobra o pagamento.
+
+        Args:
+            payment: Payment em "processing"
+            idempotency_key: chave estável do pagamento; cobranças repetidas
+                com a mesma chave devolvem o mesmo resultado
+
+        Returns:
+            GatewayResult
+        """
+        raise NotImplementedError
+
+    def refund(self, payment):
+        """
+        Reembolsa um pagamento concluído.
+
+        Returns:
+            GatewayResult com status "refunded" ou "failed"
+        """
+        raise NotImplementedError
+
+    def verify_webhook(self, body, signature):
+        """
+        Verifica a assinatura de uma notificação do gateway: HMAC-SHA256 do
+        corpo com PAYMENT_WEBHOOK_SECRET, em hexadecimal.
+        """
+        secret = settings.PAYMENT_WEBHOOK_SECRET
+        if not secret or not signature:
+            return False
+        expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature)
+
+
+class SimulatedGateway(BasePaymentGateway):
+    """
+    Simulador local para AOA-Kwanza.
+
+    - Nos testes (TESTING) toda cobrança é aprovada na hora
+    - Pagamentos por referência ficam em "processing" até o cliente pagar
+      no banco/ATM e o webhook confirmar
+    - Os demais métodos são aprovados em 75% das vezes
+    """
+
+    def __init__(self):
+        # Resultados por chave de idempotência, como o gateway real guardaria
+        self._charges = {}
+        self._lock = threading.Lock()
+
+    def charge(self, payment, idempotency_key):
+        with self._lock:
+            if idempotency_key not in self._charges:
+                self._charges[idempotency_key] = self._charge(payment)
+            return self._charges[idempotency_key]
+
+    def _charge(self, payment):
+        if getattr(settings, "TESTING", False):
+            success = True
+        elif payment.payment_method == "reference":
+            return GatewayResult(
+                "processing",
+                random_code("TXN"),
+                "Aguardando o pagamento da referência.",
+            )
+        else:
+            success = random.choice([True, True, True, False])
+
+        if success:
+            return GatewayResult(
+                "completed", random_code("TXN"), "Pagamento processado com sucesso"
+            )
+        return GatewayResult(
+            "failed",
+            None,
+            "Pagamento falhou. Por favor, tente novamente ou use outro método.",
+        )
+
+    def refund(self, payment):
+        if getattr(settings, "TESTING", False):
+            success = True
+        else:
+            # 66% de chance de sucesso
+            success = random.choice([True, True, False])
+
+        if success:
+            refund_id = random_code("REF")
+            return GatewayResult(
+                "refunded",
+                refund_id,
+                f"Reembolso feito com sucesso. ID do reembolso: {refund_id}",
+            )
+        return GatewayResult(
+            "failed", None, "Falha no reembolso. Por favor, contacte nosso suporte."
+        )
+
+
+GATEWAYS = {
+    "simulator": SimulatedGateway,
+}
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_payment_gateway():
+    """
+    Retorna a instância do gateway de pagamento do processo.
+    """
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                name = getattr(settings, "PAYMENT_GATEWAY", "simulator")
+                gateway = GATEWAYS.get(name) or import_string(name)
+                _gateway = gateway()
+    return _gateway
+
+
+def reset_payment_gateway():
+    """
+    Descarta o gateway atual (ex: após trocar a configuração nos testes).
+    """
+    global _gateway
+    with _gateway_lock:
+        _gateway = None
@@ -25,8 +25,12 @@ class Order(models.Model):
     ]
 
     order_number = models.CharField(max_length=20, unique=True, editable=False)
+    # O índice da FK é o composto (user, created_at) do Meta
     user = models.ForeignKey(
-        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="orders"
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="orders",
+        db_index=False,
     )
     status = models.CharField(
         max_length=20, choices=ORDER_STATUS_CHOICES, default="pending"
@@ -36,9 +40,28 @@ class Order(models.Model):
     )
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     shipping_address = models.TextField()
+    # Header Idempotency-Key do create_order: repetições da requisição
+    # devolvem este pedido em vez de criar outro
+    idempotency_key = models.CharField(
+        max_length=255, blank=True, null=True, editable=False
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Suporta a paginação por cursor (keyset) dos pedidos
+            models.Index(fields=["created_at", "id"]),
+            # Pedidos do usuário, mais recentes primeiro
+            models.Index(fields=["user", "created_at"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "idempotency_key"],
+                name="orders_order_user_idempotency_key",
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.order_number:
             # Gerar um número único para cada pedido
@@ -54,11 +77,24 @@ class OrderItem(models.Model):
     Modelo para representar itens de um pedido.
     """
 
-    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
-    product = models.ForeignKey("products.Product", on_delete=models.CASCADE)
+    # Os índices das FKs são os compostos do Meta
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, related_name="items", db_index=False
+    )
+    product = models.ForeignKey(
+        "products.Product", on_delete=models.CASCADE, db_index=False
+    )
     quantity = models.IntegerField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
 
+    class Meta:
+        indexes = [
+            # Itens de um pedido e o EXISTS dos pedidos de uma loja
+            models.Index(fields=["order", "product"]),
+            # Pedidos a partir dos produtos de uma loja
+            models.Index(fields=["product", "order"]),
+        ]
+
     def __str__(self):
         return (
             f"{self.quantity} x {self.product.name} pedido: {self.order.order_number}."
@@ -84,6 +120,15 @@ class Payment(models.Model):
         ("refunded", "Reembolsado"),
     ]
 
+    # Transições permitidas do status do pagamento
+    PAYMENT_STATUS_TRANSITIONS = {
+        "pending": {"processing", "failed"},
+        "processing": {"completed", "failed"},
+        "completed": {"refunded"},
+        "failed": set(),
+        "refunded": set(),
+    }
+
     order = models.OneToOneField(
         Order, on_delete=models.CASCADE, related_name="payment"
     )
@@ -91,11 +136,17 @@ class Payment(models.Model):
     payment_status = models.CharField(
         max_length=20, choices=PAYMENT_STATUS_CHOICES, default="pending"
     )
-    transaction_id = models.CharField(max_length=100, blank=True, null=True)
+    # Id do gateway; localiza o pagamento nas notificações do webhook
+    transaction_id = models.CharField(
+        max_length=100, blank=True, null=True, db_index=True
+    )
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     reference_number = models.CharField(max_length=50, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    def can_transition_to(self, new_status):
+        return new_status in self.PAYMENT_STATUS_TRANSITIONS[self.payment_status]
+
     def __str__(self):
         return f"Pagamento para o pedido: {self.order.order_number}"
@@ -0,0 +1,10 @@
+from apps.core.pagination import KeysetPagination
+
+
+class OrderCursorPagination(KeysetPagination):
+    """
+    Paginação por cursor dos pedidos, do mais recente para o mais antigo.
+    """
+
+    ordering_fields = ("created_at",)
+    default_ordering = "-created_at"
@@ -1,13 +1,39 @@
-from django.conf import settings
 import random
 import string
+
+from .gateways import get_payment_gateway
 from .models import Order, Payment
 
+# Status do pedido correspondente a cada status final do pagamento
+ORDER_STATUS_BY_PAYMENT_STATUS = {
+    "completed": {"payment_status": "paid", "status": "confirmed"},
+    "failed": {"payment_status": "failed"},
+    "refunded": {"payment_status": "refunded", "status": "cancelled"},
+}
+
+
+class PaymentTransitionError(Exception):
+    """
+    Transição de status não permitida pela máquina de estados do pagamento.
+    """
+
+    def __init__(self, payment, new_status):
+        super().__init__(
+            f"O pagamento não pode passar de {payment.payment_status} para "
+            f"{new_status}."
+        )
+
 
-# Simulação de sistema de pagamento para AOA-Kwanza
 class AOAPaymentProcessor:
     """
-    Simula um processador de pagamentos para Kwanza (AOA)
+    Processa os pagamentos em Kwanza (AOA) pelo gateway configurado
+    (apps/orders/gateways.py).
+
+    O pagamento segue a máquina de estados de Payment: pending ->
+    processing -> completed/failed, e completed -> refunded. O registro é
+    criado com o pedido (create_payment) e cobrado pela fila de tarefas
+    (process_payment); cobranças assíncronas são concluídas pelo webhook
+    (confirm_payment).
     """
 
     @staticmethod
@@ -16,62 +42,87 @@ class AOAPaymentProcessor:
         return f"REF-{"".join(random.choices(string.digits, k=12))}"
 
     @staticmethod
-    def process_payment(order: Order, payment_method, reference_number=None):
+    def transition(payment: Payment, new_status, transaction_id=None):
         """
-        Processa o pagamento de um pedido
+        Muda o status do pagamento e atualiza o pedido.
 
-        Args:
-            order: Objeto Order
-            payment_method: Método de pagamento ("reference", "mobile", "card")
-            reference_number: Número de referência (para pagamentos por referência)
-
-        Returns:
-            tuple: (success: bool, transaction_id: str, message: str)
+        Raises:
+            PaymentTransitionError: se a transição não é permitida
         """
+        if not payment.can_transition_to(new_status):
+            raise PaymentTransitionError(payment, new_status)
+
+        payment.payment_status = new_status
+        if transaction_id:
+            payment.transaction_id = transaction_id
+        payment.save(update_fields=["payment_status", "transaction_id", "updated_at"])
+
+        order_fields = ORDER_STATUS_BY_PAYMENT_STATUS.get(new_status)
+        if order_fields:
+            order = payment.order
+            for field, value in order_fields.items():
+                setattr(order, field, value)
+            order.save(update_fields=[*order_fields, "updated_at"])
 
-        # Criar registro de pagamento
-        payment = Payment.objects.create(
+    @staticmethod
+    def create_payment(order: Order, payment_method, reference_number=None):
+        """
+        Cria o pagamento pendente do pedido (na transação do checkout).
+        """
+        return Payment.objects.create(
             order=order,
             payment_method=payment_method,
             amount=order.total_amount,
             reference_number=reference_number,
         )
 
-        # Simulação de processamento de pagamento
-        # Em um ambiente real, aqui seria feita a integração com o gateway de pagamento
-        if getattr(settings, "TESTING", False):
-            # Modo de teste: sempre sucesso
-            success = True
-        else:
-            # Modo normal: 75% de chance de sucesso
-            success = random.choice([True, True, True, False])
+    @staticmethod
+    def process_payment(payment: Payment):
+        """
+        Cobra um pagamento pendente no gateway.
 
-        if success:
-            # Gerar ID de transação
-            transaction_id = f"TXN-{"".join(random.choices(string.ascii_uppercase + string.digits, k=16))}"
-            payment.transaction_id = transaction_id
-            payment.payment_status = "completed"
-            payment.save()
+        A chave de idempotência é derivada do pagamento: se a transação for
+        desfeita depois da cobrança e a tarefa repetida, o gateway devolve
+        o mesmo resultado em vez de cobrar outra vez.
 
-            # Atualizar status do pedido
-            order.payment_status = "paid"
-            order.status = "confirmed"
-            order.save()
+        Args:
+            payment: Payment em "pending", bloqueado pelo chamador
 
-            return True, transaction_id, "Pagamento processado com sucesso"
+        Returns:
+            GatewayResult: status "completed", "failed" ou "processing"
+                (aguardando o webhook)
+        """
+        AOAPaymentProcessor.transition(payment, "processing")
+        result = get_payment_gateway().charge(
+            payment, idempotency_key=f"payment-{payment.pk}"
+        )
+        if result.status == "processing":
+            if result.transaction_id:
+                payment.transaction_id = result.transaction_id
+                payment.save(update_fields=["transaction_id", "updated_at"])
         else:
-            payment.payment_status = "failed"
-            payment.save()
+            AOAPaymentProcessor.transition(
+                payment, result.status, result.transaction_id
+            )
+        return result
 
-            # Atualizar status do pedido
-            order.payment_status = "failed"
-            order.save()
+    @staticmethod
+    def confirm_payment(payment: Payment, new_status):
+        """
+        Aplica o resultado notificado pelo gateway (webhook).
 
-            return (
-                False,
-                None,
-                "Pagamento falhou. Por favor, tente novamente ou use outro método.",
-            )
+        Notificações repetidas com o status atual são ignoradas.
+
+        Returns:
+            bool: True se o status mudou
+
+        Raises:
+            PaymentTransitionError: se a transição não é permitida
+        """
+        if payment.payment_status == new_status:
+            return False
+        AOAPaymentProcessor.transition(payment, new_status)
+        return True
 
     @staticmethod
     def refund_payment(order: Order):
@@ -87,36 +138,14 @@ class AOAPaymentProcessor:
 
         try:
             payment = order.payment
-
-            # Simulação de processamento de reembolso
-            if getattr(settings, "TESTING", False):
-                # Modo de teste: sempre sucesso
-                success = True
-            else:
-                # Modo normal: 66% de chance de sucesso
-                success = random.choice([True, True, False])
-
-            if success:
-                # Gerar ID de transação de reembolso
-                refund_id = f"REF-{"".join(random.choices(string.ascii_uppercase + string.digits, k=16))}"
-                payment.payment_status = "refunded"
-                payment.save()
-
-                # Atualizar status do pedido
-                order.payment_status = "refunded"
-                order.status = "cancelled"
-                order.save()
-
-                return (
-                    True,
-                    f"Reembolso feito com sucesso. ID do reembolso: {refund_id}",
-                )
-
-            else:
-                return (
-                    False,
-                    "Falha no reembolso. Por favor, contacte nosso suporte.",
-                )
-
         except Payment.DoesNotExist:
             return False, "Nenhum pagamento encontrado para este pedido."
+
+        if not payment.can_transition_to("refunded"):
+            return False, "Este pagamento não pode ser reembolsado."
+
+        result = get_payment_gateway().refund(payment)
+        if result.status == "refunded":
+            AOAPaymentProcessor.transition(payment, "refunded")
+            return True, result.message
+        return False, result.message
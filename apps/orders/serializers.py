@@ -1,14 +1,18 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
+from apps.core.serializers import EagerLoadingMixin, nested_select_related
 from .models import Order, OrderItem, Payment
 from apps.products.serializers import ProductListSerializer
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer para itens de pedido.
     Inclui informações do produto.
     """
 
+    select_related_fields = nested_select_related("product", ProductListSerializer)
+
     product = ProductListSerializer(read_only=True, help_text="Produto do pedido")
 
     class Meta:
@@ -16,12 +20,17 @@ class OrderItemSerializer(serializers.ModelSerializer):
         fields = ["id", "product", "quantity", "price"]
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer para pedidos.
     Inclui todos os itens do pedido.
     """
 
+    @classmethod
+    def get_prefetch_related(cls):
+        items = OrderItemSerializer.setup_eager_loading(OrderItem.objects.all())
+        return [Prefetch("items", queryset=items)]
+
     items = OrderItemSerializer(read_only=True, many=True, help_text="Itens do pedido")
 
     class Meta:
@@ -39,7 +48,7 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer para pagamentos.
     """
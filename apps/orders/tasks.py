@@ -0,0 +1,22 @@
+from apps.core.tasks import task
+
+from .models import Payment
+from .payments import AOAPaymentProcessor
+
+
+@task
+def process_order_payment(payment_id):
+    """
+    Cobra o pagamento de um pedido criado no checkout. O carrinho já foi
+    esvaziado pelo checkout (place_order).
+
+    Pagamentos que já saíram de "pending" são ignorados, para que uma
+    tarefa enfileirada duas vezes não cobre o cliente duas vezes.
+    """
+    payment = (
+        Payment.objects.select_for_update().select_related("order").get(pk=payment_id)
+    )
+    if payment.payment_status != "pending":
+        return
+
+    AOAPaymentProcessor.process_payment(payment)
@@ -1,13 +1,35 @@
-from django.test import TestCase
+import csv
+import hashlib
+import hmac
+import io
+import json
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import (
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+    skipUnlessDBFeature,
+)
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
+from .checkout import EmptyCartError, OutOfStockError, place_order
+from .gateways import SimulatedGateway
 from .models import Order, OrderItem, Payment
+from .payments import AOAPaymentProcessor, PaymentTransitionError
+from .serializers import OrderSerializer
+from .tasks import process_order_payment
 from apps.products.models import Category, Product
 from apps.accounts.models import Store
 from apps.cart.models import Cart, CartItem
+from apps.core.response_cache import get_generations
+from apps.core.tasks import run_worker
 
 User = get_user_model()
 
@@ -94,6 +116,25 @@ class PaymentModelTest(TestCase):
         expected_str = f"Pagamento para o pedido: {self.order.order_number}"
         self.assertEqual(str(self.payment), expected_str)
 
+    def test_payment_transitions(self):
+        """Testa a máquina de estados do pagamento"""
+        with self.assertRaises(PaymentTransitionError):
+            AOAPaymentProcessor.transition(self.payment, "completed")
+
+        AOAPaymentProcessor.transition(self.payment, "processing")
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.payment_status, "pending")
+
+        AOAPaymentProcessor.transition(self.payment, "completed", "TXN-1")
+        self.payment.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual(self.payment.transaction_id, "TXN-1")
+        self.assertEqual(
+            (self.order.payment_status, self.order.status), ("paid", "confirmed")
+        )
+        self.assertFalse(self.payment.can_transition_to("failed"))
+        self.assertTrue(self.payment.can_transition_to("refunded"))
+
 
 class OrderAPITest(APITestCase):
     """Testes para os endpoints de pedidos"""
@@ -166,6 +207,150 @@ class OrderAPITest(APITestCase):
         self.product.refresh_from_db()
         self.assertEqual(self.product.stock_quantity, 8)  # 10 - 2
 
+    @override_settings(TASK_QUEUE_EAGER=False)
+    def test_create_order_payment_in_background(self):
+        """Testa o pagamento e a limpeza do carrinho pela fila de tarefas"""
+        self.client.force_authenticate(self.user)
+        data = {
+            "cart_code": "TEST12345678",
+            "shipping_address": "Test Address",
+            "payment_method": "reference",
+        }
+        response = self.client.post(reverse("create_order"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["order"]["payment_status"], "pending")
+
+        # A requisição cria o pagamento pendente e esvazia o carrinho
+        order = Order.objects.get(user=self.user)
+        self.assertEqual(order.payment.payment_status, "pending")
+        self.assertEqual(self.cart.cartitems.count(), 0)
+
+        # Um segundo checkout com o mesmo carrinho não cria outro pedido
+        response = self.client.post(reverse("create_order"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Order.objects.count(), 1)
+
+        # Itens adicionados depois do checkout não são afetados pela cobrança
+        CartItem.objects.create(cart=self.cart, product=self.product, quantity=1)
+        self.assertEqual(run_worker(burst=True), 1)
+        order.refresh_from_db()
+        self.assertEqual((order.payment_status, order.status), ("paid", "confirmed"))
+        self.assertEqual(order.payment.payment_status, "completed")
+        self.assertEqual(self.cart.cartitems.count(), 1)
+
+        # Um pagamento enfileirado de novo não cobra o pedido outra vez
+        process_order_payment.delay(order.payment.id)
+        self.assertEqual(run_worker(burst=True), 1)
+        self.assertEqual(Payment.objects.filter(order=order).count(), 1)
+
+    @override_settings(TASK_QUEUE_EAGER=False)
+    def test_create_order_idempotency_key(self):
+        """Testa que repetições com a mesma Idempotency-Key não duplicam o pedido"""
+        self.client.force_authenticate(self.user)
+        data = {
+            "cart_code": "TEST12345678",
+            "shipping_address": "Test Address",
+            "payment_method": "card",
+        }
+        url = reverse("create_order")
+        first = self.client.post(
+            url, data, format="json", HTTP_IDEMPOTENCY_KEY="checkout-1"
+        )
+        retry = self.client.post(
+            url, data, format="json", HTTP_IDEMPOTENCY_KEY="checkout-1"
+        )
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", first)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.data["order"]["id"], first.data["order"]["id"])
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Payment.objects.count(), 1)
+        self.assertEqual(run_worker(burst=True), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 8)
+
+        # Uma chave nova é outro pedido
+        CartItem.objects.create(cart=self.cart, product=self.product, quantity=1)
+        response = self.client.post(
+            url, data, format="json", HTTP_IDEMPOTENCY_KEY="checkout-2"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 2)
+
+    @override_settings(CORS_ALLOWED_ORIGINS=["http://localhost:3000"])
+    def test_idempotency_headers_allowed_cross_origin(self):
+        """Testa o preflight CORS com a Idempotency-Key e a exposição da resposta"""
+        url = reverse("create_order")
+        preflight = self.client.options(
+            url,
+            HTTP_ORIGIN="http://localhost:3000",
+            HTTP_ACCESS_CONTROL_REQUEST_METHOD="POST",
+            HTTP_ACCESS_CONTROL_REQUEST_HEADERS="authorization,content-type,idempotency-key",
+        )
+        self.assertEqual(preflight.status_code, status.HTTP_200_OK)
+        self.assertIn(
+            "idempotency-key", preflight["Access-Control-Allow-Headers"].split(", ")
+        )
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            url,
+            {
+                "cart_code": "TEST12345678",
+                "shipping_address": "Test Address",
+                "payment_method": "card",
+            },
+            format="json",
+            HTTP_ORIGIN="http://localhost:3000",
+            HTTP_IDEMPOTENCY_KEY="checkout-1",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn(
+            "Idempotent-Replayed",
+            response["Access-Control-Expose-Headers"].split(", "),
+        )
+
+    def test_create_order_idempotency_key_too_long(self):
+        """Testa a rejeição de uma Idempotency-Key longa demais"""
+        self.client.force_authenticate(self.user)
+        data = {
+            "cart_code": "TEST12345678",
+            "shipping_address": "Test Address",
+            "payment_method": "card",
+        }
+        response = self.client.post(
+            reverse("create_order"),
+            data,
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="x" * 256,
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_get_order_payment(self):
+        """Testa o acompanhamento do status do pagamento"""
+        self.client.force_authenticate(self.user)
+        data = {
+            "cart_code": "TEST12345678",
+            "shipping_address": "Test Address",
+            "payment_method": "mobile",
+        }
+        response = self.client.post(reverse("create_order"), data, format="json")
+        order_number = response.data["order"]["order_number"]
+
+        url = reverse("order_payment", kwargs={"order_number": order_number})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["payment_status"], "completed")
+        self.assertEqual(response.data["payment_method"], "mobile")
+        self.assertTrue(response.data["transaction_id"])
+
+        # Pedidos de outros usuários não são visíveis
+        self.client.force_authenticate(self.seller)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_create_order_empty_cart(self):
         """Testa a criação de um pedido com carrinho vazio"""
         # Cria um carrinho vazio
@@ -322,8 +507,59 @@ class OrderAPITest(APITestCase):
         url = reverse("store_orders")
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["id"], order.id)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["id"], order.id)
+
+    def test_get_store_orders_only_store_items(self):
+        """Testa que cada pedido traz apenas os itens da loja do vendedor"""
+        other_seller = User.objects.create_user(
+            username="other",
+            email="other@example.com",
+            password="otherpass123",
+            user_type="seller",
+        )
+        other_store = Store.objects.create(name="Other Store", owner=other_seller)
+        other_product = Product.objects.create(
+            name="Other Product", price=99, store=other_store
+        )
+        mixed = Order.objects.create(
+            user=self.user, total_amount=100.00, shipping_address="Test Address"
+        )
+        store_item = mixed.items.create(product=self.product, quantity=1, price=10.99)
+        mixed.items.create(product=other_product, quantity=1, price=99)
+        Order.objects.create(
+            user=self.user, total_amount=99, shipping_address="Test Address"
+        ).items.create(product=other_product, quantity=1, price=99)
+
+        self.client.force_authenticate(self.seller)
+        response = self.client.get(reverse("store_orders"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual([order["id"] for order in results], [mixed.id])
+        self.assertEqual([item["id"] for item in results[0]["items"]], [store_item.id])
+
+    def test_get_store_orders_pagination(self):
+        """Testa a paginação por cursor com número constante de queries"""
+        orders = [
+            Order.objects.create(
+                user=self.user, total_amount=100.00, shipping_address="Test Address"
+            )
+            for _ in range(5)
+        ]
+        for order in orders:
+            order.items.create(product=self.product, quantity=1, price=10.99)
+
+        self.client.force_authenticate(self.seller)
+        url = reverse("store_orders") + "?page_size=2"
+        seen = []
+        while url:
+            # Pedidos da página e itens da loja com produtos e lojas
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [order["id"] for order in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(seen, [order.id for order in reversed(orders)])
 
     def test_get_store_orders_not_seller(self):
         """Testa a obtenção de pedidos por um usuário que não é vendedor"""
@@ -406,3 +642,501 @@ class OrderAPITest(APITestCase):
         response = self.client.put(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("error", response.data)
+
+
+@override_settings(PAYMENT_WEBHOOK_SECRET="segredo")
+class PaymentWebhookTest(APITestCase):
+    """Testes para o webhook do gateway de pagamento"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.order = Order.objects.create(
+            user=user, total_amount=100.00, shipping_address="Test Address"
+        )
+        self.payment = Payment.objects.create(
+            order=self.order,
+            payment_method="reference",
+            payment_status="processing",
+            transaction_id="TXN-123",
+            amount=100.00,
+        )
+
+    def notify(self, payload, secret="segredo"):
+        body = json.dumps(payload).encode()
+        signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return self.client.post(
+            reverse("payment_webhook"),
+            body,
+            content_type="application/json",
+            HTTP_X_PAYMENT_SIGNATURE=signature,
+        )
+
+    def test_completes_payment(self):
+        """Testa a confirmação de um pagamento por referência"""
+        response = self.notify({"transaction_id": "TXN-123", "status": "completed"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["payment_status"], "completed")
+        self.order.refresh_from_db()
+        self.assertEqual(
+            (self.order.payment_status, self.order.status), ("paid", "confirmed")
+        )
+
+        # Notificações repetidas não têm efeito
+        response = self.notify({"transaction_id": "TXN-123", "status": "completed"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalid_transition(self):
+        """Testa um resultado incompatível com o status atual"""
+        self.notify({"transaction_id": "TXN-123", "status": "completed"})
+        response = self.notify({"transaction_id": "TXN-123", "status": "failed"})
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.payment_status, "completed")
+
+    def test_invalid_signature(self):
+        """Testa a rejeição de notificações sem a assinatura correta"""
+        response = self.notify(
+            {"transaction_id": "TXN-123", "status": "completed"}, secret="outro"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.payment_status, "processing")
+
+    def test_unknown_transaction(self):
+        """Testa uma notificação de transação inexistente"""
+        response = self.notify({"transaction_id": "TXN-999", "status": "failed"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_status(self):
+        """Testa uma notificação com status inválido"""
+        response = self.notify({"transaction_id": "TXN-123", "status": "refunded"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SimulatedGatewayTest(TestCase):
+    """Testes para o simulador do gateway de pagamento"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        order = Order.objects.create(
+            user=user, total_amount=100.00, shipping_address="Test Address"
+        )
+        self.payment = Payment.objects.create(
+            order=order, payment_method="reference", amount=100.00
+        )
+        self.gateway = SimulatedGateway()
+
+    def test_same_key_same_result(self):
+        """Testa que cobranças repetidas com a mesma chave não cobram de novo"""
+        first = self.gateway.charge(self.payment, "payment-1")
+        self.assertEqual(first.status, "completed")
+        self.assertEqual(self.gateway.charge(self.payment, "payment-1"), first)
+        self.assertNotEqual(
+            self.gateway.charge(self.payment, "payment-2").transaction_id,
+            first.transaction_id,
+        )
+
+    @override_settings(TESTING=False)
+    def test_reference_waits_for_webhook(self):
+        """Testa que pagamentos por referência aguardam a confirmação"""
+        with mock.patch(
+            "apps.orders.payments.get_payment_gateway", return_value=self.gateway
+        ):
+            result = AOAPaymentProcessor.process_payment(self.payment)
+        self.assertEqual(result.status, "processing")
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.payment_status, "processing")
+        self.assertEqual(self.payment.transaction_id, result.transaction_id)
+        self.assertEqual(self.payment.order.payment_status, "pending")
+
+
+class OrderSerializerQueryCountTest(TestCase):
+    """Testa que a serialização de pedidos usa um número constante de queries"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.seller = User.objects.create_user(
+            username="seller",
+            email="seller@example.com",
+            password="sellerpass123",
+            user_type="seller",
+        )
+        self.store = Store.objects.create(name="Test Store", owner=self.seller)
+        self.products = Product.objects.bulk_create(
+            Product(
+                name=f"Product {i}", slug=f"product-{i}", price=10, store=self.store
+            )
+            for i in range(20)
+        )
+
+    def test_orders_with_items_constant_queries(self):
+        """Testa a serialização de 1 e 20 pedidos com vários itens"""
+        for total in (1, 20):
+            with self.subTest(total=total):
+                Order.objects.all().delete()
+                for _ in range(total):
+                    order = Order.objects.create(
+                        user=self.user, total_amount=100, shipping_address="Rua 1"
+                    )
+                    OrderItem.objects.bulk_create(
+                        OrderItem(order=order, product=product, quantity=1, price=10)
+                        for product in self.products
+                    )
+
+                # Uma query para os pedidos e outra para itens, produtos e lojas
+                with self.assertNumQueries(2):
+                    orders = OrderSerializer.setup_eager_loading(
+                        Order.objects.filter(user=self.user)
+                    )
+                    data = OrderSerializer(orders, many=True).data
+                self.assertEqual(len(data), total)
+                self.assertEqual(len(data[0]["items"]), 20)
+
+
+class StoreExportTest(APITestCase):
+    """Testes para a exportação em streaming dos pedidos da loja"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.buyer = User.objects.create_user(
+            username="buyer", email="buyer@example.com", password="buyerpass123"
+        )
+        self.seller = User.objects.create_user(
+            username="seller",
+            email="seller@example.com",
+            password="sellerpass123",
+            user_type="seller",
+        )
+        other_seller = User.objects.create_user(
+            username="other",
+            email="other@example.com",
+            password="otherpass123",
+            user_type="seller",
+        )
+        self.store = Store.objects.create(name="Test Store", owner=self.seller)
+        other_store = Store.objects.create(name="Other Store", owner=other_seller)
+        self.product = Product.objects.create(
+            name="Café", price="10.50", store=self.store
+        )
+        other_product = Product.objects.create(
+            name="Other", price=99, store=other_store
+        )
+
+        # Pedidos com 2 itens da loja e 1 de outra loja
+        for _ in range(3):
+            order = Order.objects.create(
+                user=self.buyer, total_amount="120.00", shipping_address="Rua 1"
+            )
+            OrderItem.objects.bulk_create(
+                [
+                    OrderItem(
+                        order=order, product=self.product, quantity=1, price=10.50
+                    ),
+                    OrderItem(
+                        order=order, product=self.product, quantity=2, price=10.50
+                    ),
+                    OrderItem(order=order, product=other_product, quantity=1, price=99),
+                ]
+            )
+        Order.objects.create(
+            user=self.buyer, total_amount=99, shipping_address="Rua 2"
+        ).items.create(product=other_product, quantity=1, price=99)
+
+        self.client.force_authenticate(self.seller)
+
+    def export(self, name, **params):
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    # Lotes menores que o resultado, para exercitar o iterator
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_orders_csv(self):
+        """Testa uma linha por pedido com os totais dos itens da loja"""
+        content = self.export("export_store_orders")
+        self.assertTrue(content.startswith("\ufeff"))
+        rows = list(csv.DictReader(io.StringIO(content.lstrip("\ufeff"))))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["store_items"], "2")
+        self.assertEqual(rows[0]["store_quantity"], "3")
+        # O SQLite não arredonda as casas decimais de expressões
+        self.assertEqual(Decimal(rows[0]["store_total"]), Decimal("31.50"))
+        self.assertEqual(rows[0]["order_total"], "120.00")
+        self.assertEqual(rows[0]["customer"], "buyer")
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_order_items_ndjson(self):
+        """Testa uma linha JSON por item de pedido da loja"""
+        content = self.export("export_store_order_items", output="ndjson")
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(
+            {row["product"] for row in rows},
+            {"Café"},
+        )
+        self.assertEqual(
+            {Decimal(row["subtotal"]) for row in rows},
+            {Decimal("10.50"), Decimal("21.00")},
+        )
+
+    def test_filename(self):
+        """Testa o nome do arquivo e o tipo de conteúdo"""
+        response = self.client.get(reverse("export_store_orders"), {"output": "ndjson"})
+        self.assertEqual(
+            response["Content-Type"], "application/x-ndjson; charset=utf-8"
+        )
+        self.assertRegex(
+            response["Content-Disposition"],
+            r'attachment; filename="test-store-pedidos-\d{8}\.ndjson"',
+        )
+
+    def test_invalid_output(self):
+        """Testa o erro para formato desconhecido"""
+        response = self.client.get(reverse("export_store_orders"), {"output": "xls"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_seller(self):
+        """Testa que apenas vendedores exportam os pedidos"""
+        self.client.force_authenticate(self.buyer)
+        for name in ("export_store_orders", "export_store_order_items"):
+            with self.subTest(endpoint=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CheckoutTest(TestCase):
+    """Testes para o checkout (apps/orders/checkout.py)"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.seller = User.objects.create_user(
+            username="seller",
+            email="seller@example.com",
+            password="sellerpass123",
+            user_type="seller",
+        )
+        self.store = Store.objects.create(name="Test Store", owner=self.seller)
+        self.products = Product.objects.bulk_create(
+            Product(
+                name=f"Product {i}",
+                slug=f"product-{i}",
+                price=10,
+                store=self.store,
+                stock_quantity=5,
+            )
+            for i in range(10)
+        )
+
+    def create_cart(self, code, products, quantity=1):
+        cart = Cart.objects.create(cart_code=code)
+        CartItem.objects.bulk_create(
+            CartItem(cart=cart, product=product, quantity=quantity)
+            for product in products
+        )
+        return cart
+
+    def test_constant_queries(self):
+        """Testa que o checkout usa o mesmo número de queries para 1 e 10 itens"""
+        for total in (1, 10):
+            with self.subTest(total=total):
+                cart = self.create_cart(f"CART{total}", self.products[:total])
+                # Itens, bloqueio dos produtos, pedido, itens do pedido,
+                # estoque e limpeza do carrinho (mais o savepoint da transação)
+                with self.assertNumQueries(8):
+                    order = place_order(cart, self.user, "Rua 1")
+                self.assertEqual(order.items.count(), total)
+                self.assertFalse(cart.cartitems.exists())
+                self.assertEqual(order.total_amount, 10 * total)
+
+    def test_stock_decremented(self):
+        """Testa a baixa de estoque e a marcação de produto esgotado"""
+        cart = self.create_cart("CART1", self.products[:2], quantity=5)
+        place_order(cart, self.user, "Rua 1")
+
+        for product in self.products[:2]:
+            product.refresh_from_db()
+            self.assertEqual(product.stock_quantity, 0)
+            self.assertFalse(product.in_stock)
+        self.products[2].refresh_from_db()
+        self.assertEqual(self.products[2].stock_quantity, 5)
+
+    def test_catalog_invalidated_only_when_sold_out(self):
+        """Testa que só o esgotamento invalida as respostas do catálogo"""
+        generation = get_generations(("product",))
+        cart = self.create_cart("CART1", self.products[:1], quantity=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            place_order(cart, self.user, "Rua 1")
+        self.assertEqual(get_generations(("product",)), generation)
+
+        cart = self.create_cart("CART2", self.products[:1], quantity=3)
+        with self.captureOnCommitCallbacks(execute=True):
+            place_order(cart, self.user, "Rua 1")
+        self.assertNotEqual(get_generations(("product",)), generation)
+
+    def test_out_of_stock_rolls_back(self):
+        """Testa que nenhum pedido ou baixa é feito sem estoque suficiente"""
+        Product.objects.filter(id=self.products[1].id).update(stock_quantity=1)
+        cart = self.create_cart("CART1", self.products[:2], quantity=2)
+
+        with self.assertRaises(OutOfStockError):
+            place_order(cart, self.user, "Rua 1")
+
+        self.assertFalse(Order.objects.exists())
+        self.products[0].refresh_from_db()
+        self.assertEqual(self.products[0].stock_quantity, 5)
+
+    def test_last_units_sold_once(self):
+        """Testa que as últimas unidades não são vendidas duas vezes"""
+        first = self.create_cart("CART1", self.products[:1], quantity=5)
+        second = self.create_cart("CART2", self.products[:1], quantity=5)
+
+        place_order(first, self.user, "Rua 1")
+        with self.assertRaises(OutOfStockError):
+            place_order(second, self.user, "Rua 1")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_empty_cart(self):
+        """Testa o checkout de um carrinho vazio"""
+        cart = Cart.objects.create(cart_code="EMPTY")
+        with self.assertRaises(EmptyCartError):
+            place_order(cart, self.user, "Rua 1")
+
+
+@skipUnlessDBFeature("has_select_for_update")
+class CheckoutConcurrencyTest(TransactionTestCase):
+    """Testa checkouts simultâneos disputando o mesmo estoque"""
+
+    BUYERS = 20
+    STOCK = 7
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        seller = User.objects.create_user(
+            username="seller",
+            email="seller@example.com",
+            password="sellerpass123",
+            user_type="seller",
+        )
+        store = Store.objects.create(name="Test Store", owner=seller)
+        # Todos os compradores levam os dois produtos, em ordens diferentes
+        self.products = [
+            Product.objects.create(
+                name=f"Product {i}", price=10, store=store, stock_quantity=self.STOCK
+            )
+            for i in range(2)
+        ]
+        self.carts = []
+        for i in range(self.BUYERS):
+            user = User.objects.create_user(
+                username=f"buyer{i}", email=f"buyer{i}@example.com", password="pass"
+            )
+            cart = Cart.objects.create(cart_code=f"CART{i}", user=user)
+            for product in self.products[:: 1 if i % 2 else -1]:
+                CartItem.objects.create(cart=cart, product=product, quantity=1)
+            self.carts.append(cart)
+
+    def test_parallel_buyers_do_not_oversell(self):
+        """Testa que o estoque nunca fica negativo com compradores em paralelo"""
+        results = []
+        barrier = threading.Barrier(self.BUYERS)
+
+        def buy(cart):
+            try:
+                barrier.wait()
+                place_order(cart, cart.user, "Rua 1")
+                results.append(True)
+            except OutOfStockError:
+                results.append(False)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buy, args=(cart,)) for cart in self.carts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(True), self.STOCK)
+        self.assertEqual(Order.objects.count(), self.STOCK)
+        for product in self.products:
+            product.refresh_from_db()
+            self.assertEqual(product.stock_quantity, 0)
+            self.assertFalse(product.in_stock)
+
+
+@skipUnlessDBFeature("has_select_for_update")
+class IdempotentCheckoutConcurrencyTest(TransactionTestCase):
+    """Testa repetições simultâneas do mesmo checkout"""
+
+    RETRIES = 8
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        seller = User.objects.create_user(
+            username="seller",
+            email="seller@example.com",
+            password="sellerpass123",
+            user_type="seller",
+        )
+        store = Store.objects.create(name="Test Store", owner=seller)
+        self.product = Product.objects.create(
+            name="Product", price=10, store=store, stock_quantity=1
+        )
+        self.user = User.objects.create_user(
+            username="buyer", email="buyer@example.com", password="pass"
+        )
+        cart = Cart.objects.create(cart_code="CART1", user=self.user)
+        CartItem.objects.create(cart=cart, product=self.product, quantity=1)
+
+    @override_settings(TASK_QUEUE_EAGER=False)
+    def test_parallel_retries_create_one_order(self):
+        """Testa que só uma das repetições cria o pedido e a cobrança"""
+        responses = []
+        barrier = threading.Barrier(self.RETRIES)
+        data = {
+            "cart_code": "CART1",
+            "shipping_address": "Rua 1",
+            "payment_method": "card",
+        }
+
+        def retry():
+            try:
+                client = APIClient()
+                client.force_authenticate(self.user)
+                barrier.wait()
+                responses.append(
+                    client.post(
+                        reverse("create_order"),
+                        data,
+                        format="json",
+                        HTTP_IDEMPOTENCY_KEY="checkout-1",
+                    )
+                )
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=retry) for _ in range(self.RETRIES)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        order = Order.objects.get()
+        self.assertEqual(Payment.objects.count(), 1)
+        for response in responses:
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(response.data["order"]["id"], order.id)
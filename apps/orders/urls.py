@@ -5,10 +5,22 @@ urlpatterns = [
     # Order management
     path("create/", views.create_order, name="create_order"),
     path("", views.get_user_orders, name="user_orders"),
+    path("payments/webhook/", views.payment_webhook, name="payment_webhook"),
     path("<str:order_number>/", views.get_order_detail, name="order_detail"),
     path("<str:order_number>/refund/", views.request_refund, name="request_refund"),
+    path("<str:order_number>/payment/", views.get_order_payment, name="order_payment"),
     # Seller order management
     path("seller/orders/", views.get_store_orders, name="store_orders"),
+    path(
+        "seller/orders/export/",
+        views.export_store_orders,
+        name="export_store_orders",
+    ),
+    path(
+        "seller/order-items/export/",
+        views.export_store_order_items,
+        name="export_store_order_items",
+    ),
     path(
         "seller/<str:order_number>/status/",
         views.update_order_status,
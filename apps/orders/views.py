@@ -1,12 +1,62 @@
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Count,
+    DecimalField,
+    Exists,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Prefetch,
+    Sum,
+)
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from apps.cart.models import Cart
-from .payments import AOAPaymentProcessor
-from .models import Order, OrderItem
-from .serializers import CreateOrderSerializer, OrderSerializer
+from apps.cart.storage import promote_to_database
+from apps.core.exports import export_response
+from .checkout import CheckoutError, place_order
+from .gateways import get_payment_gateway
+from .payments import AOAPaymentProcessor, PaymentTransitionError
+from .models import Order, OrderItem, Payment
+from .pagination import OrderCursorPagination
+from .tasks import process_order_payment
+from .serializers import (
+    CreateOrderSerializer,
+    OrderItemSerializer,
+    OrderSerializer,
+    PaymentSerializer,
+)
+
+IDEMPOTENCY_KEY_MAX_LENGTH = Order._meta.get_field("idempotency_key").max_length
+
+
+def _created_order_response(order, replayed=False):
+    OrderSerializer.setup_eager_loading_for([order])
+    order_serializer = OrderSerializer(order)
+    response = Response(
+        {
+            "order": order_serializer.data,
+            "message": "Pedido criado. O pagamento está em processamento.",
+        },
+        status=status.HTTP_201_CREATED,
+    )
+    if replayed:
+        response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _replay_order(user, idempotency_key):
+    # Pedido já criado com a mesma chave (repetição da requisição)
+    if not idempotency_key:
+        return None
+    order = Order.objects.filter(user=user, idempotency_key=idempotency_key).first()
+    return order and _created_order_response(order, replayed=True)
 
 
 @api_view(["POST"])
@@ -14,94 +64,63 @@ from .serializers import CreateOrderSerializer, OrderSerializer
 def create_order(request):
     """
     Criar um novo pedido a partir do carrinho de compras
+
+    Com o header Idempotency-Key, repetições da requisição (ex: após um
+    timeout) devolvem o pedido já criado com a mesma chave, sem criar outro
+    pedido nem outra cobrança.
     """
     serializer = CreateOrderSerializer(data=request.data)
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    idempotency_key = request.headers.get("Idempotency-Key") or None
+    if idempotency_key and len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        return Response(
+            {
+                "error": "O header Idempotency-Key deve ter no máximo "
+                f"{IDEMPOTENCY_KEY_MAX_LENGTH} caracteres."
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    replay = _replay_order(request.user, idempotency_key)
+    if replay:
+        return replay
+
     cart_code = serializer.validated_data["cart_code"]
     shipping_address = serializer.validated_data["shipping_address"]
     payment_method = serializer.validated_data["payment_method"]
     reference_number = serializer.validated_data.get("reference_number")
 
     try:
-        # Obter carrinho
-        cart = Cart.objects.get(cart_code=cart_code)
+        # Obter carrinho (carrinhos anônimos fora do banco são gravados aqui)
+        cart = promote_to_database(cart_code)
 
-        # Verificar se o carrinho tem itens
-        if not cart.cartitems.exists():
-            return Response(
-                {"error": "O carrinho está vazio."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Usar o Transaction Atomic para evitar Race Condicion
         with transaction.atomic():
-            # Calcular total
-            total_amount = sum(
-                item.quantity * item.product.price for item in cart.cartitems.all()
-            )
-
-            # Criar pedido
-            order = Order.objects.create(
-                user=request.user,
-                total_amount=total_amount,
-                shipping_address=shipping_address,
+            # Bloqueia os produtos, valida o estoque, cria o pedido e baixa o
+            # estoque numa única transação (ver apps/orders/checkout.py)
+            order = place_order(cart, request.user, shipping_address, idempotency_key)
+            payment = AOAPaymentProcessor.create_payment(
+                order, payment_method, reference_number
             )
 
-            # Criar itens do pedido
-            for cart_item in cart.cartitems.all():
-                # Verificar se o produto ainda está em estoque
-                product = cart_item.product
-                if not product.in_stock or product.stock_quantity < cart_item.quantity:
-                    order.delete()
-                    return Response(
-                        {
-                            "error": f"O produto {product.name} não tem quantidade suficiente em estoque."
-                        },
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-                # Criar item do pedido
-                OrderItem.objects.create(
-                    order=order,
-                    product=product,
-                    quantity=cart_item.quantity,
-                    price=product.price,
-                )
-
-                # Atualizar estoque
-                product.stock_quantity -= cart_item.quantity
-                if product.stock_quantity == 0:
-                    product.in_stock = False
-                product.save()
-
-        # Processar pagamento
-        success, transaction_id, message = AOAPaymentProcessor.process_payment(
-            order, payment_method, reference_number
-        )
+            # A cobrança fica para a fila de tarefas (apps/core/tasks.py),
+            # gravada junto com o pedido; o carrinho já foi esvaziado
+            process_order_payment.delay(payment.id)
 
-        if success:
-            # Limpar carrinho após pedido bem-sucedido
-            cart.cartitems.all().delete()
-
-            # Retornar dados do pedido
-            order_serializer = OrderSerializer(order)
-            return Response(
-                {
-                    "order": order_serializer.data,
-                    "message": message,
-                    "transaction_id": transaction_id,
-                },
-                status=status.HTTP_201_CREATED,
-            )
-        else:
-            # Transaction.atomic vai fazer roolback automático
-            raise Exception(message)
+        # Retornar dados do pedido; o cliente acompanha o pagamento em
+        # GET <order_number>/payment/
+        return _created_order_response(order)
     except Cart.DoesNotExist:
         return Response(
             {"error": "Carrinho não encontrado"}, status=status.HTTP_404_NOT_FOUND
         )
+    except (IntegrityError, CheckoutError) as e:
+        # Requisição concorrente com a mesma chave: o pedido dela foi
+        # confirmado primeiro (e pode ter levado o estoque)
+        replay = _replay_order(request.user, idempotency_key)
+        if replay:
+            return replay
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response(
             {"error": str(e)},
@@ -116,7 +135,9 @@ def get_user_orders(request):
     Obtém todos os pedidos do usuário
     """
 
-    orders = Order.objects.filter(user=request.user).order_by("-created_at")
+    orders = OrderSerializer.setup_eager_loading(
+        Order.objects.filter(user=request.user).order_by("-created_at")
+    )
     serializer = OrderSerializer(orders, many=True)
     return Response(serializer.data)
 
@@ -129,7 +150,9 @@ def get_order_detail(request, order_number):
     """
 
     try:
-        order = Order.objects.get(order_number=order_number, user=request.user)
+        order = OrderSerializer.setup_eager_loading(Order.objects.all()).get(
+            order_number=order_number, user=request.user
+        )
         serializer = OrderSerializer(order)
         return Response(serializer.data)
     except Order.DoesNotExist:
@@ -169,12 +192,80 @@ def request_refund(request, order_number):
         )
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def get_order_payment(request, order_number):
+    """
+    Obtém o pagamento de um pedido do usuário, para acompanhar o status
+    (pending, processing, completed, failed ou refunded)
+    """
+
+    try:
+        payment = Payment.objects.get(
+            order__order_number=order_number, order__user=request.user
+        )
+    except Payment.DoesNotExist:
+        return Response(
+            {"error": "Pagamento não encontrado."}, status=status.HTTP_404_NOT_FOUND
+        )
+    return Response(PaymentSerializer(payment).data)
+
+
+@api_view(["POST"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def payment_webhook(request):
+    """
+    Recebe do gateway o resultado de uma cobrança assíncrona.
+
+    Corpo: {"transaction_id": ..., "status": "completed" | "failed"},
+    assinado no header X-Payment-Signature (HMAC-SHA256 do corpo com
+    PAYMENT_WEBHOOK_SECRET). Notificações repetidas são aceitas sem efeito.
+    """
+
+    # A assinatura é do corpo bruto, lido antes de request.data
+    signature = request.headers.get("X-Payment-Signature", "")
+    if not get_payment_gateway().verify_webhook(request.body, signature):
+        return Response(
+            {"error": "Assinatura inválida."}, status=status.HTTP_403_FORBIDDEN
+        )
+
+    transaction_id = request.data.get("transaction_id")
+    new_status = request.data.get("status")
+    if not transaction_id or new_status not in ("completed", "failed"):
+        return Response(
+            {"error": "Informe transaction_id e status (completed ou failed)."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    with transaction.atomic():
+        payment = (
+            Payment.objects.select_for_update()
+            .select_related("order")
+            .filter(transaction_id=transaction_id)
+            .first()
+        )
+        if payment is None:
+            return Response(
+                {"error": "Pagamento não encontrado."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        try:
+            AOAPaymentProcessor.confirm_payment(payment, new_status)
+        except PaymentTransitionError as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+
+    return Response(PaymentSerializer(payment).data)
+
+
 # Views para vendedores
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_store_orders(request):
     """
-    Obtém todos os pedidos para a loja do vendedor
+    Obtém os pedidos da loja do vendedor, do mais recente para o mais
+    antigo, paginados por cursor (cursor, page_size). Cada pedido traz
+    apenas os itens da loja.
     """
 
     # Verificar se o usuário é um vendedor
@@ -190,16 +281,114 @@ def get_store_orders(request):
             {"error": "Você não tem uma loja."}, status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Obter itens de pedido para produtos da loja
-    store_products = request.user.store.products.values_list("id", flat=True)
-    order_items = OrderItem.objects.filter(product_id__in=store_products)
+    # EXISTS correlacionado em vez de listas IN com os ids dos produtos e
+    # dos pedidos; a página percorre o índice (created_at, id)
+    store = request.user.store
+    store_items = OrderItem.objects.filter(product__store=store)
+    orders = Order.objects.filter(
+        Exists(store_items.filter(order=OuterRef("pk")))
+    ).prefetch_related(
+        Prefetch(
+            "items",
+            queryset=OrderItemSerializer.setup_eager_loading(
+                store_items.order_by("id")
+            ),
+        )
+    )
 
-    # Obter pedidos únicos
-    order_ids = order_items.values_list("order_id", flat=True).distinct()
-    orders = Order.objects.filter(id__in=order_ids).order_by("-created_at")
+    paginator = OrderCursorPagination()
+    page = paginator.paginate_queryset(orders, request)
+    serializer = OrderSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
 
-    serializer = OrderSerializer(orders, many=True)
-    return Response(serializer.data)
+
+def _seller_store_error(request):
+    # Mesmas verificações de get_store_orders
+    if request.user.user_type != "seller":
+        return Response(
+            {"error": "Apenas vendedores podem acessar os pedidos das lojas."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    if not hasattr(request.user, "store"):
+        return Response(
+            {"error": "Você não tem uma loja."}, status=status.HTTP_400_BAD_REQUEST
+        )
+    return None
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_store_orders(request):
+    """
+    Exporta os pedidos da loja do vendedor em streaming (?output=csv ou
+    ndjson), uma linha por pedido com os totais dos itens da loja.
+    """
+    error = _seller_store_error(request)
+    if error:
+        return error
+
+    store = request.user.store
+    orders = (
+        Order.objects.filter(items__product__store=store)
+        .annotate(
+            store_items=Count("items"),
+            store_quantity=Sum("items__quantity"),
+            store_total=Sum(
+                F("items__quantity") * F("items__price"),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+        .order_by("-created_at", "-id")
+    )
+    columns = [
+        ("order_number", "order_number"),
+        ("created_at", "created_at"),
+        ("status", "status"),
+        ("payment_status", "payment_status"),
+        ("customer", "user__username"),
+        ("shipping_address", "shipping_address"),
+        ("store_items", "store_items"),
+        ("store_quantity", "store_quantity"),
+        ("store_total", "store_total"),
+        ("order_total", "total_amount"),
+    ]
+    return export_response(request, f"{store.slug}-pedidos", columns, orders)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_store_order_items(request):
+    """
+    Exporta os itens de pedido da loja do vendedor em streaming
+    (?output=csv ou ndjson), uma linha por item.
+    """
+    error = _seller_store_error(request)
+    if error:
+        return error
+
+    store = request.user.store
+    items = (
+        OrderItem.objects.filter(product__store=store)
+        .annotate(
+            subtotal=ExpressionWrapper(
+                F("quantity") * F("price"),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            )
+        )
+        .order_by("-order__created_at", "-order_id", "id")
+    )
+    columns = [
+        ("order_number", "order__order_number"),
+        ("created_at", "order__created_at"),
+        ("status", "order__status"),
+        ("payment_status", "order__payment_status"),
+        ("product_id", "product_id"),
+        ("product", "product__name"),
+        ("quantity", "quantity"),
+        ("price", "price"),
+        ("subtotal", "subtotal"),
+    ]
+    return export_response(request, f"{store.slug}-itens-pedidos", columns, items)
 
 
 @api_view(["PUT"])
@@ -257,6 +446,7 @@ def update_order_status(request, order_number):
         order.status = new_status
         order.save()
 
+        OrderSerializer.setup_eager_loading_for([order])
         serializer = OrderSerializer(order)
         return Response(serializer.data)
 
@@ -0,0 +1,115 @@
+"""
+Cache read-through dos detalhes de produtos.
+
+Cada slug possui uma versão guardada no cache; a chave do payload inclui
+essa versão. Invalidar um produto apenas troca a versão, de modo que uma
+requisição concorrente que leu dados antigos do banco grava sob a versão
+anterior e esse payload nunca mais é lido.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Product
+from .serializers import ProductDetailSerializer
+
+# Incrementar quando o formato do payload mudar
+PRODUCT_DETAIL_CACHE_VERSION = 1
+
+HITS_KEY = "product_detail:hits"
+MISSES_KEY = "product_detail:misses"
+
+
+def _version_key(slug):
+    return f"product_detail:version:{slug}"
+
+
+def _payload_key(slug, version):
+    return f"product_detail:v{PRODUCT_DETAIL_CACHE_VERSION}:{slug}:{version}"
+
+
+def _new_version():
+    # Baseada no relógio para que uma versão despejada do cache não volte
+    # a apontar para um payload antigo
+    return time.time_ns()
+
+
+def _increment(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def get_product_detail(slug):
+    """
+    Obtém os detalhes serializados de um produto, usando o cache.
+
+    Args:
+        slug: slug do produto
+
+    Returns:
+        tuple: (dados do produto ou None se não encontrado, hit: bool)
+    """
+    version = cache.get(_version_key(slug))
+    if version is not None:
+        data = cache.get(_payload_key(slug, version))
+        if data is not None:
+            _increment(HITS_KEY)
+            return data, True
+
+    _increment(MISSES_KEY)
+
+    try:
+        product = ProductDetailSerializer.setup_eager_loading(
+            Product.objects.all()
+        ).get(slug=slug, is_listed=True)
+    except Product.DoesNotExist:
+        # Slugs inexistentes não criam versões no cache
+        return None, False
+
+    data = dict(ProductDetailSerializer(product).data)
+    if version is None:
+        # A versão só é criada para produtos encontrados. Se outra
+        # requisição ou uma invalidação a criou durante a leitura do banco,
+        # os dados lidos podem ser anteriores a ela e não são guardados.
+        version = _new_version()
+        if not cache.add(_version_key(slug), version, None):
+            return data, False
+    cache.set(_payload_key(slug, version), data, settings.PRODUCT_DETAIL_CACHE_TIMEOUT)
+    return data, False
+
+
+def get_product_detail_version(slug):
+    """
+    Versão atual dos detalhes de um produto no cache (None se ainda não
+    existe). Muda a cada invalidação e é usada como validador HTTP.
+    """
+    return cache.get(_version_key(slug))
+
+
+def invalidate_product_details(slugs):
+    """
+    Invalida os detalhes em cache dos produtos informados.
+
+    Deve ser chamada por qualquer escrita que não passe pelos signals de
+    Product (ex: update() em massa do estoque).
+    """
+    version = _new_version()
+    cache.set_many({_version_key(slug): version for slug in slugs}, None)
+
+
+def get_product_detail_cache_stats():
+    """
+    Retorna os contadores de acertos e falhas do cache de detalhes.
+    """
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else 0.0,
+    }
@@ -0,0 +1,96 @@
+"""
+Contagem materializada dos produtos disponíveis de cada categoria
+(Category.product_count): produtos listados (loja ativa) e em estoque.
+
+Cada escrita aplica apenas a diferença com um UPDATE atômico usando F(),
+em tempo constante independente do tamanho da categoria, como a
+classificação dos produtos (apps/reviews/ratings.py):
+- signals de Product: criação, exclusão e mudança de categoria, estoque
+  ou visibilidade
+- sync_store_listing, ao ativar ou desativar uma loja
+- checkout, quando a baixa de estoque esgota um produto
+
+O UPDATE também troca o updated_at e a geração "category" do cache de
+respostas, invalidando a listagem de categorias. recompute_category_counts()
+reconstrói os valores a partir dos produtos, para reparo.
+"""
+
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    OuterRef,
+    PositiveIntegerField,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest, Now
+
+from apps.core.response_cache import bump_generations
+from .models import Category, Product
+
+
+def apply_count_deltas(deltas):
+    """
+    Aplica variações às contagens de várias categorias num único UPDATE.
+
+    Args:
+        deltas: dict {category_id: variação}; produtos sem categoria (None)
+            e variações nulas são ignorados
+
+    Returns:
+        int: número de categorias atualizadas
+    """
+    deltas = {
+        category_id: delta
+        for category_id, delta in deltas.items()
+        if category_id is not None and delta
+    }
+    if not deltas:
+        return 0
+    updated = Category.objects.filter(id__in=deltas).update(
+        product_count=Case(
+            *(
+                # Nunca negativa, mesmo com uma contagem já divergente
+                When(id=category_id, then=Greatest(F("product_count") + delta, 0))
+                for category_id, delta in deltas.items()
+            ),
+            default=F("product_count"),
+            output_field=PositiveIntegerField(),
+        ),
+        # update() não aplica o auto_now; usado pelos validadores HTTP
+        updated_at=Now(),
+    )
+    bump_generations("category")
+    return updated
+
+
+def recompute_category_counts(category_ids=None):
+    """
+    Reconstrói as contagens a partir dos produtos com um único UPDATE.
+
+    Args:
+        category_ids: categorias a recalcular (todas quando None)
+
+    Returns:
+        int: número de categorias atualizadas
+    """
+    counts = (
+        Product.objects.filter(category=OuterRef("pk"), is_listed=True, in_stock=True)
+        .order_by()
+        .values("category")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    categories = Category.objects.all()
+    if category_ids is not None:
+        categories = categories.filter(id__in=category_ids)
+    updated = categories.update(
+        product_count=Coalesce(
+            Subquery(counts), Value(0), output_field=PositiveIntegerField()
+        ),
+        updated_at=Now(),
+    )
+    bump_generations("category")
+    return updated
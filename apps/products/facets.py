@@ -0,0 +1,193 @@
+"""
+Contagens por faceta do catálogo (barra de filtros de products_list).
+
+Todas as facetas saem de uma única query agrupada sobre os produtos
+listados: GROUP BY loja, categoria, em estoque, destaque, faixa de preço e
+faixa de classificação, com uma coluna booleana por filtro ativo do
+ProductFilter (o produto atende ao filtro). O número de grupos depende das
+combinações existentes, não do número de produtos nem de opções.
+
+Cada faceta soma, em Python, os grupos que atendem aos filtros das demais
+facetas: com um filtro ativo a sua faceta continua mostrando as outras
+opções (ex: com ?store=a, quantos produtos as outras lojas teriam com os
+demais filtros), como numa barra de filtros.
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import (
+    BooleanField,
+    Case,
+    Count,
+    IntegerField,
+    Min,
+    Q,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Floor
+from django_filters.constants import EMPTY_VALUES
+
+# Classificações mínimas da faceta de classificação (4 ou mais, 3 ou mais...)
+RATING_THRESHOLDS = (4, 3, 2, 1)
+
+# Filtros do ProductFilter que pertencem a cada faceta
+FACET_FILTERS = {
+    "price": ("min_price", "max_price"),
+    "in_stock": ("in_stock",),
+    "featured": ("featured",),
+    "store": ("store",),
+    "category": ("category",),
+    "rating": ("min_rating",),
+}
+
+
+def price_ranges():
+    """
+    Faixas da faceta de preço (PRODUCT_PRICE_FACET_RANGES), em Kz: pares
+    (mínimo, máximo exclusivo), sem máximo (None) na última.
+    """
+    limits = sorted(settings.PRODUCT_PRICE_FACET_RANGES)
+    return list(zip(limits, (*limits[1:], None)))
+
+
+def _price_range(ranges):
+    # Índice da faixa de preço do produto
+    return Case(
+        *(
+            When(price__lt=upper, then=Value(index))
+            for index, (_, upper) in enumerate(ranges[:-1])
+        ),
+        default=Value(len(ranges) - 1),
+        output_field=IntegerField(),
+    )
+
+
+def _condition(filterset, name, value):
+    # A mesma condição que o filtro aplica ao queryset
+    field = filterset.filters[name]
+    return Q(**{f"{field.field_name}__{field.lookup_expr}": value})
+
+
+def _options(counts, labels):
+    # Opções com produtos, da mais frequente para a menos frequente
+    return sorted(
+        (
+            {"value": value, "name": labels[value], "count": count}
+            for value, count in counts.items()
+            if value is not None and count
+        ),
+        key=lambda option: (-option["count"], option["name"]),
+    )
+
+
+def facet_counts(filterset, queryset):
+    """
+    Calcula as contagens de todas as facetas numa única query.
+
+    Args:
+        filterset: ProductFilter já validado (is_valid)
+        queryset: produtos antes dos filtros (ex: os listados no catálogo)
+
+    Returns:
+        dict: price, in_stock, featured, store, category e rating, cada um
+            com uma lista de opções e as suas contagens
+    """
+    active = {
+        name: value
+        for name, value in filterset.form.cleaned_data.items()
+        if value not in EMPTY_VALUES
+    }
+    faceted = {name for names in FACET_FILTERS.values() for name in names}
+    matches = {}
+    for name, value in active.items():
+        condition = _condition(filterset, name, value)
+        if name in faceted:
+            matches[f"match_{name}"] = Case(
+                When(condition, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+        else:
+            # Filtros sem faceta valem para todas
+            queryset = queryset.filter(condition)
+
+    ranges = price_ranges()
+    rows = (
+        queryset.order_by()
+        .annotate(
+            price_range=_price_range(ranges),
+            rating_floor=Floor(Coalesce("rating__average_rating", Value(0.0))),
+            **matches,
+        )
+        .values(
+            "store_id",
+            "category_id",
+            "in_stock",
+            "featured",
+            "price_range",
+            "rating_floor",
+            *matches,
+        )
+        # Agrupa pelos IDs; os nomes vêm como agregados (um por grupo)
+        .annotate(
+            total=Count("id"),
+            store_slug=Min("store__slug"),
+            store_name=Min("store__name"),
+            category_name=Min("category__name"),
+        )
+    )
+
+    counts = {facet: Counter() for facet in FACET_FILTERS}
+    # Colunas de filtro de cada faceta, que ela ignora
+    own = {
+        facet: {f"match_{name}" for name in names}
+        for facet, names in FACET_FILTERS.items()
+    }
+    stores, categories = {}, {}
+    for row in rows:
+        stores[row["store_slug"]] = row["store_name"]
+        categories[row["category_id"]] = row["category_name"]
+        total = row["total"]
+        failed = {name for name in matches if not row[name]}
+        keys = {
+            "price": row["price_range"],
+            "in_stock": row["in_stock"],
+            "featured": row["featured"],
+            "store": row["store_slug"],
+            "category": row["category_id"],
+            "rating": int(row["rating_floor"]),
+        }
+        for facet, key in keys.items():
+            # O grupo atende a todos os filtros das outras facetas
+            if not failed or failed <= own[facet]:
+                counts[facet][key] += total
+
+    return {
+        "price": [
+            {"min": lower, "max": upper, "count": counts["price"][index]}
+            for index, (lower, upper) in enumerate(ranges)
+        ],
+        "in_stock": [
+            {"value": value, "count": counts["in_stock"][value]}
+            for value in (True, False)
+        ],
+        "featured": [
+            {"value": value, "count": counts["featured"][value]}
+            for value in (True, False)
+        ],
+        "store": _options(counts["store"], stores),
+        "category": _options(counts["category"], categories),
+        "rating": [
+            {
+                "min": threshold,
+                "count": sum(
+                    count
+                    for floor, count in counts["rating"].items()
+                    if floor >= threshold
+                ),
+            }
+            for threshold in RATING_THRESHOLDS
+        ],
+    }
@@ -0,0 +1,38 @@
+"""
+Filtros do catálogo de produtos (django-filter).
+
+As views são funções (@api_view) e não usam os DEFAULT_FILTER_BACKENDS:
+products_list aplica o ProductFilter diretamente aos produtos listados, e
+as contagens por faceta (apps/products/facets.py) usam os mesmos filtros.
+"""
+
+from django_filters import rest_framework as filters
+
+from .models import Product
+
+
+class ProductFilter(filters.FilterSet):
+    """
+    Filtros de products_list.
+
+    Parâmetros:
+    - min_price, max_price: faixa de preço (inclusiva)
+    - in_stock, featured: true ou false
+    - store: slug da loja
+    - category: ID da categoria
+    - min_rating: classificação média mínima (ProductRating)
+    """
+
+    min_price = filters.NumberFilter(field_name="price", lookup_expr="gte")
+    max_price = filters.NumberFilter(field_name="price", lookup_expr="lte")
+    in_stock = filters.BooleanFilter(field_name="in_stock")
+    featured = filters.BooleanFilter(field_name="featured")
+    store = filters.CharFilter(field_name="store__slug")
+    category = filters.NumberFilter(field_name="category_id")
+    min_rating = filters.NumberFilter(
+        field_name="rating__average_rating", lookup_expr="gte"
+    )
+
+    class Meta:
+        model = Product
+        fields = []
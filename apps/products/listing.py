@@ -0,0 +1,80 @@
+"""
+Visibilidade dos produtos no catálogo público (Product.is_listed).
+
+is_listed repete o Store.is_active da loja em cada produto, para que o
+catálogo (listagem, detalhes e busca) filtre só a tabela de produtos, sem o
+JOIN com a loja, pelos índices parciais products_listed_created_idx e
+products_listed_price_idx: (created_at, id) e (price, id) com
+condition=Q(is_listed=True). São parciais porque o SQLite não usa um índice
+(is_listed, ...) para o WHERE "is_listed" gerado pelo Django.
+
+O valor é copiado da loja na criação do produto (Product.save) e
+atualizado com um único UPDATE quando a loja é salva (signal em
+apps/products/signals.py), inclusive em approve_seller e manage_store.
+
+check_listing() encontra e corrige as divergências deixadas por escritas
+que não passam pelos signals (ex: update() em massa nas lojas, troca de
+loja de um produto, SQL manual).
+"""
+
+from django.db.models import Count, F
+
+from apps.core.response_cache import bump_generations
+from .cache import invalidate_product_details
+from .counts import apply_count_deltas, recompute_category_counts
+from .models import Product
+from .search import get_search_backend
+
+
+def sync_store_listing(store):
+    """
+    Copia o is_active da loja para os produtos que divergem e atualiza as
+    contagens por categoria (apps/products/counts.py).
+
+    Returns:
+        int: número de produtos atualizados
+    """
+    changed = Product.objects.filter(store=store).exclude(is_listed=store.is_active)
+    # Produtos em estoque que entram ou saem do catálogo, por categoria
+    in_stock = dict(
+        changed.filter(in_stock=True)
+        .order_by()
+        .values("category")
+        .annotate(total=Count("id"))
+        .values_list("category", "total")
+    )
+    updated = changed.update(is_listed=store.is_active)
+    sign = 1 if store.is_active else -1
+    apply_count_deltas(
+        {category_id: sign * total for category_id, total in in_stock.items()}
+    )
+    return updated
+
+
+def check_listing(fix=False):
+    """
+    Procura produtos cujo is_listed difere do is_active da loja.
+
+    Args:
+        fix: corrige os produtos encontrados, invalida o cache de detalhes,
+            as respostas do catálogo e o índice de busca e recalcula as
+            contagens por categoria
+
+    Returns:
+        list: (id, slug, is_active da loja) de cada produto divergente
+    """
+    mismatched = list(
+        Product.objects.exclude(is_listed=F("store__is_active")).values_list(
+            "id", "slug", "store__is_active"
+        )
+    )
+    if fix and mismatched:
+        for is_active in (True, False):
+            Product.objects.filter(
+                id__in=[row[0] for row in mismatched if row[2] == is_active]
+            ).update(is_listed=is_active)
+        invalidate_product_details([row[1] for row in mismatched])
+        bump_generations("product")
+        get_search_backend().index_products([row[0] for row in mismatched])
+        recompute_category_counts()
+    return mismatched
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.products.listing import check_listing
+
+
+class Command(BaseCommand):
+    """
+    Verifica se o is_listed de cada produto corresponde ao is_active da sua
+    loja (ver apps/products/listing.py) e, com --fix, corrige as
+    divergências.
+
+    Exemplos:
+        python manage.py check_listing
+        python manage.py check_listing --fix
+    """
+
+    help = "Verifica (e corrige com --fix) a visibilidade dos produtos no catálogo."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Corrige os produtos divergentes.",
+        )
+
+    def handle(self, *args, **options):
+        mismatched = check_listing(fix=options["fix"])
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS("Nenhuma divergência encontrada."))
+            return
+        for product_id, slug, is_active in mismatched:
+            self.stdout.write(f"Produto {product_id} ({slug}): loja ativa={is_active}")
+        if options["fix"]:
+            self.stdout.write(
+                self.style.SUCCESS(f"{len(mismatched)} produtos corrigidos.")
+            )
+        else:
+            raise CommandError(
+                f"{len(mismatched)} produtos divergentes; use --fix para corrigir."
+            )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from apps.products.counts import recompute_category_counts
+
+
+class Command(BaseCommand):
+    """
+    Reconstrói a contagem de produtos das categorias a partir dos produtos.
+
+    Use para reparar os valores após escritas que não passam pelos signals
+    (ex: update() em massa, importações, SQL manual).
+
+    Exemplos:
+        python manage.py recompute_category_counts
+        python manage.py recompute_category_counts --category 3 --category 7
+    """
+
+    help = "Reconstrói a contagem de produtos listados e em estoque das categorias."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--category",
+            type=int,
+            action="append",
+            dest="category_ids",
+            help="ID de uma categoria a recalcular (pode ser repetido).",
+        )
+
+    def handle(self, *args, **options):
+        total = recompute_category_counts(options["category_ids"])
+        self.stdout.write(self.style.SUCCESS(f"{total} contagens recalculadas."))
@@ -0,0 +1,43 @@
+"""
+Índice GIN da busca full-text de produtos (apenas PostgreSQL).
+
+A expressão deve ser a mesma de PostgresSearchBackend.document() para que
+o planejador use o índice. Nos demais bancos a migração não faz nada.
+"""
+
+from django.db import migrations
+
+INDEX_NAME = "products_product_search_gin"
+
+
+def _index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    document = SearchVector("name", weight="A", config="portuguese") + SearchVector(
+        "description", weight="C", config="portuguese"
+    )
+    return GinIndex(document, name=INDEX_NAME)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.add_index(apps.get_model("products", "Product"), _index())
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.remove_index(apps.get_model("products", "Product"), _index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0003_product_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_alter_customuser_is_approved_seller"),
+        ("products", "0005_category_updated_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="product",
+            name="category",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="products",
+                to="products.category",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="product",
+            name="store",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="products",
+                to="accounts.store",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["store", "created_at", "id"],
+                name="products_pr_store_i_4db8d6_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["store", "price", "id"], name="products_pr_store_i_6823e1_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "created_at", "id"],
+                name="products_pr_categor_67fdd1_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:40
+
+from django.db import migrations, models
+
+
+def backfill_is_listed(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    Product.objects.filter(store__is_active=False).update(is_listed=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0006_query_pattern_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="product",
+            name="products_pr_created_3be21c_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="product",
+            name="products_pr_price_dbec84_idx",
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="is_listed",
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.RunPython(backfill_is_listed, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("is_listed", True)),
+                fields=["created_at", "id"],
+                name="products_listed_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("is_listed", True)),
+                fields=["price", "id"],
+                name="products_listed_price_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:48
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_product_count(apps, schema_editor):
+    Category = apps.get_model("products", "Category")
+    Product = apps.get_model("products", "Product")
+    counts = (
+        Product.objects.filter(category=OuterRef("pk"), is_listed=True, in_stock=True)
+        .order_by()
+        .values("category")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    Category.objects.update(
+        product_count=Coalesce(Subquery(counts), 0, output_field=models.IntegerField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0007_product_is_listed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="product_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_product_count, migrations.RunPython.noop),
+    ]
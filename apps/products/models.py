@@ -6,6 +6,9 @@ class Category(models.Model):
     name = models.CharField(max_length=100)
     slug = models.SlugField(unique=True)
     image = models.ImageField(upload_to="category_img", blank=True, null=True)
+    # Produtos listados e em estoque, mantido por apps/products/counts.py
+    product_count = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -31,25 +34,73 @@ class Product(models.Model):
     featured = models.BooleanField(default=False)
     in_stock = models.BooleanField(default=True)
     stock_quantity = models.PositiveIntegerField(default=1)
+    # Cópia de store.is_active, mantida por apps/products/listing.py: o
+    # catálogo público filtra os produtos sem o JOIN com a loja
+    is_listed = models.BooleanField(default=True, editable=False)
+    # Os índices das FKs são os compostos do Meta
     category = models.ForeignKey(
         Category,
         related_name="products",
         on_delete=models.CASCADE,
         blank=True,
         null=True,
+        db_index=False,
     )
     store = models.ForeignKey(
         "accounts.Store",
         on_delete=models.CASCADE,
         related_name="products",
+        db_index=False,
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Suportam a paginação por cursor (keyset) do catálogo; parciais,
+            # só com os produtos listados (o filtro is_listed usa o índice
+            # também no SQLite)
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(is_listed=True),
+                name="products_listed_created_idx",
+            ),
+            models.Index(
+                fields=["price", "id"],
+                condition=models.Q(is_listed=True),
+                name="products_listed_price_idx",
+            ),
+            # Produtos de uma loja (?store=, loja pública, vendedor)
+            models.Index(fields=["store", "created_at", "id"]),
+            models.Index(fields=["store", "price", "id"]),
+            # Produtos de uma categoria (?category=, detalhes da categoria)
+            models.Index(fields=["category", "created_at", "id"]),
+        ]
+
     def __str__(self):
         return self.name
 
+    def remember_availability(self):
+        """
+        Guarda a categoria e a disponibilidade (listado e em estoque)
+        carregadas, para calcular a diferença nas contagens por categoria ao
+        salvar (apps/products/counts.py). None quando não foram carregadas.
+        """
+        # Lê do __dict__ para não disparar queries em campos adiados (only/defer)
+        values = self.__dict__
+        if {"category_id", "is_listed", "in_stock"} <= values.keys():
+            self._loaded_category_id = values["category_id"]
+            self._loaded_available = values["is_listed"] and values["in_stock"]
+        else:
+            self._loaded_category_id = self._loaded_available = None
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.remember_availability()
+
     def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.is_listed = self.store.is_active
         if not self.slug:
             self.slug = slugify(self.name)
             unique_slug = self.slug
@@ -0,0 +1,83 @@
+import binascii
+import math
+
+from rest_framework.exceptions import NotFound
+
+from apps.core.pagination import KeysetPagination
+
+
+class ProductCursorPagination(KeysetPagination):
+    """
+    Paginação por cursor do catálogo de produtos.
+    Permite ordenar por data de criação ou preço (ex: ?ordering=price).
+    """
+
+    ordering_fields = ("created_at", "price")
+    default_ordering = "-created_at"
+
+
+class SearchCursorPagination(KeysetPagination):
+    """
+    Paginação por cursor dos resultados da busca, na ordem de relevância.
+
+    O cursor guarda a posição (score, id) do último resultado e o backend
+    de busca continua a partir dela, assim como o KeysetPagination faz com
+    (campo, id) no banco.
+    """
+
+    ordering_fields = ()
+    default_ordering = "relevance"
+
+    def paginate_search(self, backend, query, request):
+        """
+        Executa a busca e retorna os SearchHit da página atual.
+        """
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.default_ordering
+        position, reverse = self.decode_search_cursor(request, backend)
+
+        if reverse:
+            hits = backend.search(query, self.page_size + 1, before=position)
+            has_more = len(hits) > self.page_size
+            hits = hits[-self.page_size :] if has_more else hits
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            hits = backend.search(query, self.page_size + 1, after=position)
+            has_more = len(hits) > self.page_size
+            hits = hits[: self.page_size]
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = hits
+        return hits
+
+    def get_schema_operation_parameters(self, view):
+        # A ordem é sempre por relevância
+        return super().get_schema_operation_parameters(view)[:2]
+
+    def encode_cursor(self, hit, reverse):
+        payload = {"o": self.ordering, "v": str(hit.score), "p": hit.product_id}
+        if reverse:
+            payload["r"] = 1
+        return self.build_cursor_link(payload)
+
+    def decode_search_cursor(self, request, backend):
+        """
+        Retorna a posição ((score, id) ou None) e a direção do cursor.
+        """
+        try:
+            payload = self.load_cursor_payload(request)
+            if payload is None:
+                return None, False
+            if payload["o"] != self.ordering:
+                raise ValueError(payload["o"])
+            score = backend.parse_score(payload["v"])
+            if not math.isfinite(score):
+                raise ValueError(score)
+            position = (score, int(payload["p"]))
+            reverse = bool(payload.get("r"))
+        except (binascii.Error, ArithmeticError, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
@@ -0,0 +1,73 @@
+"""
+Busca de produtos com resultados ordenados por relevância.
+
+O backend é escolhido pela configuração PRODUCT_SEARCH_BACKEND:
+- "auto": PostgreSQL full-text quando o banco é PostgreSQL, senão o
+  índice invertido em memória
+- "inverted_index", "postgres" ou "icontains"
+- ou o caminho de uma classe (ex: "meu_app.search.MeuBackend")
+"""
+
+import threading
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from .backends import (
+    BaseSearchBackend,
+    IContainsSearchBackend,
+    InvertedIndexBackend,
+    PostgresSearchBackend,
+    SearchHit,
+)
+
+BACKENDS = {
+    "inverted_index": InvertedIndexBackend,
+    "postgres": PostgresSearchBackend,
+    "icontains": IContainsSearchBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _backend_class():
+    name = getattr(settings, "PRODUCT_SEARCH_BACKEND", "auto")
+    if name == "auto":
+        name = "postgres" if connection.vendor == "postgresql" else "inverted_index"
+    if name in BACKENDS:
+        return BACKENDS[name]
+    return import_string(name)
+
+
+def get_search_backend():
+    """
+    Retorna a instância do backend de busca do processo.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _backend_class()()
+    return _backend
+
+
+def reset_search_backend():
+    """
+    Descarta o backend atual (ex: após trocar a configuração nos testes).
+    """
+    global _backend
+    with _backend_lock:
+        _backend = None
+
+
+__all__ = [
+    "BaseSearchBackend",
+    "IContainsSearchBackend",
+    "InvertedIndexBackend",
+    "PostgresSearchBackend",
+    "SearchHit",
+    "get_search_backend",
+    "reset_search_backend",
+]
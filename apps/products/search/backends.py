@@ -0,0 +1,297 @@
+import heapq
+import math
+import threading
+from collections import Counter, defaultdict, namedtuple
+from decimal import Decimal
+
+from django.db.models import DecimalField, F, Q
+from django.db.models.functions import Cast
+
+from apps.products.models import Category, Product
+from .text import analyze
+
+SearchHit = namedtuple("SearchHit", ["product_id", "score"])
+
+
+def ranking_key(hit):
+    """
+    Ordem dos resultados: maior relevância primeiro, desempate pelo id.
+    """
+    return (-hit.score, hit.product_id)
+
+
+class BaseSearchBackend:
+    """
+    Interface dos backends de busca de produtos.
+
+    search() retorna SearchHit ordenados por relevância. Os parâmetros
+    after/before recebem uma posição (score, product_id) e retornam os
+    resultados estritamente depois/antes dela, o que permite paginação
+    por cursor sobre a ordem de relevância.
+    """
+
+    # Tipo do score, usado para reconstruir a posição a partir do cursor
+    score_type = float
+
+    def search(self, query, limit, after=None, before=None):
+        raise NotImplementedError
+
+    def index_products(self, product_ids):
+        """
+        Atualiza o índice para os produtos informados (criados ou alterados).
+        """
+
+    def remove_products(self, product_ids):
+        """
+        Remove os produtos informados do índice.
+        """
+
+    def parse_score(self, raw):
+        return self.score_type(raw)
+
+
+class InvertedIndexBackend(BaseSearchBackend):
+    """
+    Índice invertido em memória do processo, com ranking BM25.
+
+    O índice é construído a partir do banco na primeira busca e mantido
+    incrementalmente pelos signals de Product, Store e Category. Cada
+    processo possui o seu índice; use em desenvolvimento, testes ou
+    implantações com um único processo. Em produção com PostgreSQL
+    prefira o PostgresSearchBackend.
+    """
+
+    # Peso de cada campo na frequência dos termos
+    FIELD_WEIGHTS = (("name", 3.0), ("category", 2.0), ("description", 1.0))
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._postings = defaultdict(dict)  # termo -> {product_id: tf}
+        self._lengths = {}  # product_id -> tamanho ponderado do documento
+        self._terms = {}  # product_id -> termos do documento (para remoção)
+        self._total_length = 0.0
+        self._norms = None  # product_id -> K1 * normalização do tamanho
+
+    def _visible_products(self):
+        return Product.objects.filter(is_listed=True).values_list(
+            "id", "name", "description", "category__name"
+        )
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            for row in self._visible_products().iterator(chunk_size=2000):
+                self._add(*row)
+            self._built = True
+
+    def _add(self, product_id, name, description, category_name):
+        fields = {"name": name, "category": category_name, "description": description}
+        frequencies = Counter()
+        for field, weight in self.FIELD_WEIGHTS:
+            for term in analyze(fields[field]):
+                frequencies[term] += weight
+        for term, frequency in frequencies.items():
+            self._postings[term][product_id] = frequency
+        length = sum(frequencies.values())
+        self._lengths[product_id] = length
+        self._terms[product_id] = tuple(frequencies)
+        self._total_length += length
+        self._norms = None
+
+    def _remove(self, product_id):
+        length = self._lengths.pop(product_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        self._norms = None
+        for term in self._terms.pop(product_id):
+            postings = self._postings[term]
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def index_products(self, product_ids):
+        if not self._built:
+            # Será construído com os dados atuais na primeira busca
+            return
+        product_ids = list(product_ids)
+        rows = list(self._visible_products().filter(id__in=product_ids))
+        with self._lock:
+            for product_id in product_ids:
+                self._remove(product_id)
+            for row in rows:
+                self._add(*row)
+
+    def remove_products(self, product_ids):
+        if not self._built:
+            return
+        with self._lock:
+            for product_id in product_ids:
+                self._remove(product_id)
+
+    def _get_norms(self):
+        # Recalculadas apenas quando o índice muda (o tamanho médio muda)
+        if self._norms is None:
+            total = len(self._lengths)
+            average_length = self._total_length / total if total else 1.0
+            self._norms = {
+                product_id: self.K1 * (1 - self.B + self.B * length / average_length)
+                for product_id, length in self._lengths.items()
+            }
+        return self._norms
+
+    def _score(self, query):
+        """
+        Calcula o score BM25 dos produtos que contêm todos os termos.
+        """
+        self._ensure_built()
+        terms = set(analyze(query))
+        if not terms:
+            return {}
+
+        with self._lock:
+            postings = [self._postings.get(term) for term in terms]
+            if not all(postings):
+                return {}
+
+            total = len(self._lengths)
+            norms = self._get_norms()
+            # Intersecção começando pela lista mais curta
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+
+            scores = dict.fromkeys(candidates, 0.0)
+            for posting in postings:
+                idf = math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+                weight = idf * (self.K1 + 1)
+                for product_id in candidates:
+                    tf = posting[product_id]
+                    scores[product_id] += weight * tf / (tf + norms[product_id])
+        return scores
+
+    def rank(self, query):
+        """
+        Retorna todos os resultados da consulta, já ordenados.
+        Todos os termos da consulta devem estar presentes no produto.
+        """
+        hits = [SearchHit(*item) for item in self._score(query).items()]
+        hits.sort(key=ranking_key)
+        return hits
+
+    def search(self, query, limit, after=None, before=None):
+        hits = (SearchHit(*item) for item in self._score(query).items())
+        if after is not None:
+            position = ranking_key(SearchHit(after[1], after[0]))
+            hits = (hit for hit in hits if ranking_key(hit) > position)
+        if before is not None:
+            position = ranking_key(SearchHit(before[1], before[0]))
+            hits = (hit for hit in hits if ranking_key(hit) < position)
+            # Os mais próximos da posição, mantendo a ordem de relevância
+            return heapq.nlargest(limit, hits, key=ranking_key)[::-1]
+        # Seleção parcial: evita ordenar todos os resultados
+        return heapq.nsmallest(limit, hits, key=ranking_key)
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Busca full-text do PostgreSQL (SearchVector / SearchRank).
+
+    O documento (nome com peso A e descrição com peso C) usa a mesma
+    expressão do índice GIN criado na migração
+    products.0004_product_search_gin, portanto a consulta usa o índice.
+    Produtos cuja categoria corresponde à busca também são retornados.
+    """
+
+    score_type = Decimal
+    config = "portuguese"
+
+    @classmethod
+    def document(cls):
+        from django.contrib.postgres.search import SearchVector
+
+        return SearchVector("name", weight="A", config=cls.config) + SearchVector(
+            "description", weight="C", config=cls.config
+        )
+
+    def search(self, query, limit, after=None, before=None):
+        from django.contrib.postgres.search import (
+            SearchQuery,
+            SearchRank,
+            SearchVector,
+        )
+
+        search_query = SearchQuery(query, search_type="websearch", config=self.config)
+        matching_categories = Category.objects.annotate(
+            document=SearchVector("name", config=self.config)
+        ).filter(document=search_query)
+
+        products = (
+            Product.objects.filter(is_listed=True)
+            .annotate(document=self.document())
+            .filter(Q(document=search_query) | Q(category__in=matching_categories))
+            # Arredondado para que a comparação do cursor seja exata
+            .annotate(
+                score=Cast(
+                    SearchRank(F("document"), search_query),
+                    DecimalField(max_digits=12, decimal_places=8),
+                )
+            )
+        )
+
+        if after is not None:
+            products = products.filter(
+                Q(score__lt=after[0]) | Q(score=after[0], id__gt=after[1])
+            ).order_by("-score", "id")
+        elif before is not None:
+            products = products.filter(
+                Q(score__gt=before[0]) | Q(score=before[0], id__lt=before[1])
+            ).order_by("score", "-id")
+        else:
+            products = products.order_by("-score", "id")
+
+        hits = [
+            SearchHit(product_id, score)
+            for product_id, score in products.values_list("id", "score")[:limit]
+        ]
+        if before is not None:
+            hits.reverse()
+        return hits
+
+
+class IContainsSearchBackend(BaseSearchBackend):
+    """
+    Busca original por icontains em nome, descrição e categoria.
+    Sem ranking (ordenada por id); mantida para comparação nos benchmarks.
+    """
+
+    score_type = int
+
+    def search(self, query, limit, after=None, before=None):
+        products = Product.objects.filter(
+            Q(name__icontains=query)
+            | Q(description__icontains=query)
+            | Q(category__name__icontains=query),
+            is_listed=True,
+        )
+        if after is not None:
+            products = products.filter(id__gt=after[1]).order_by("id")
+        elif before is not None:
+            products = products.filter(id__lt=before[1]).order_by("-id")
+        else:
+            products = products.order_by("id")
+
+        hits = [
+            SearchHit(product_id, 0)
+            for product_id in products.values_list("id", flat=True)[:limit]
+        ]
+        if before is not None:
+            hits.reverse()
+        return hits
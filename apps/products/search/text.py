@@ -0,0 +1,128 @@
+"""
+Análise de texto para a busca: normalização, tokenização e stemming.
+
+O stemmer é uma versão reduzida do RSLP (Removedor de Sufixos da Língua
+Portuguesa): remove plural, feminino, advérbios, grau e sufixos nominais,
+aplicado depois da remoção de acentos.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    """
+    a ao aos as com da das de do dos e em entre na nas no nos o os ou para
+    pela pelas pelo pelos por que se sem sob sobre um uma umas uns
+    """.split()
+)
+
+# (sufixo, substituição, tamanho mínimo do radical)
+PLURAL_RULES = (
+    ("ns", "m", 1),
+    ("oes", "ao", 3),
+    ("aes", "ao", 1),
+    ("ais", "al", 1),
+    ("eis", "el", 2),
+    ("ois", "ol", 1),
+    ("is", "il", 2),
+    ("les", "l", 3),
+    ("res", "r", 3),
+    ("s", "", 2),
+)
+
+FEMININE_RULES = (
+    ("ona", "ao", 3),
+    ("ora", "or", 3),
+    ("ica", "ico", 3),
+    ("ada", "ado", 2),
+    ("ida", "ido", 3),
+    ("iva", "ivo", 3),
+    ("eira", "eiro", 3),
+    ("osa", "oso", 3),
+)
+
+DEGREE_RULES = (
+    ("issimo", "", 3),
+    ("issima", "", 3),
+    ("zinho", "", 2),
+    ("zinha", "", 2),
+    ("inho", "", 3),
+    ("inha", "", 3),
+    ("ao", "", 3),
+)
+
+NOUN_RULES = (
+    ("amentos", "", 3),
+    ("imentos", "", 3),
+    ("amento", "", 3),
+    ("imento", "", 3),
+    ("acoes", "", 3),
+    ("acao", "", 3),
+    ("idades", "", 4),
+    ("idade", "", 4),
+    ("ismo", "", 3),
+    ("ista", "", 4),
+    ("avel", "", 2),
+    ("ivel", "", 5),
+    ("ente", "", 4),
+    ("ante", "", 2),
+    ("mente", "", 4),
+)
+
+
+def fold_accents(text):
+    """
+    Converte para minúsculas e remove acentos (ex: "Eletrônicos" -> "eletronicos").
+    """
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in normalized if not unicodedata.combining(char))
+
+
+def _apply_first(word, rules):
+    for suffix, replacement, min_stem in rules:
+        if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+            return word[: -len(suffix)] + replacement
+    return word
+
+
+@lru_cache(maxsize=65536)
+def stem(word):
+    """
+    Reduz uma palavra (já sem acentos) ao seu radical.
+    O vocabulário é pequeno, por isso os radicais ficam em cache.
+    """
+    if len(word) < 4 or word.isdigit():
+        return word
+    word = _apply_first(word, PLURAL_RULES)
+    word = _apply_first(word, FEMININE_RULES)
+    word = _apply_first(word, DEGREE_RULES)
+    word = _apply_first(word, NOUN_RULES)
+    # Remove a vogal temática final
+    if len(word) > 3 and word[-1] in "aeo":
+        word = word[:-1]
+    # Sem acentos "portáteis" vira "portatel" e "portátil" vira "portatil"
+    if len(word) > 4 and word[-2:] in ("el", "il"):
+        word = word[:-2] + "l"
+    return word
+
+
+def analyze(text):
+    """
+    Converte um texto na lista de termos indexáveis.
+
+    Args:
+        text: Texto livre (nome, descrição, consulta)
+
+    Returns:
+        list: Radicais dos termos, sem stopwords, na ordem do texto
+    """
+    if not text:
+        return []
+    return [
+        stem(token)
+        for token in TOKEN_RE.findall(fold_accents(text))
+        if token not in STOPWORDS
+    ]
@@ -1,13 +1,27 @@
 from rest_framework import serializers
+from apps.core.serializers import EagerLoadingMixin
 from .models import Category, Product
 
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductListSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer para listagem de produtos.
     Inclui informações básicas e o nome da loja.
     """
 
+    select_related_fields = ("store",)
+    # created_at e price são usados pelos cursores de paginação
+    only_fields = (
+        "id",
+        "name",
+        "slug",
+        "image",
+        "price",
+        "in_stock",
+        "created_at",
+        "store__name",
+    )
+
     store_name = serializers.CharField(
         source="store.name", read_only=True, help_text="Nome da loja"
     )
@@ -17,12 +31,14 @@ class ProductListSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "slug", "image", "price", "store_name", "in_stock"]
 
 
-class ProductDetailSerializer(serializers.ModelSerializer):
+class ProductDetailSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer para detalhes de produtos.
     Inclui todas as informações do produto.
     """
 
+    select_related_fields = ("store", "category")
+
     store = serializers.StringRelatedField(read_only=True, help_text="Nome da loja")
     category = serializers.StringRelatedField(
         read_only=True, help_text="Nome da categoria"
@@ -45,7 +61,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         ]
 
 
-class CategoryListSerializer(serializers.ModelSerializer):
+class CategoryListSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer para listagem de categorias.
     Inclui informações básicas da categoria.
@@ -53,22 +69,18 @@ class CategoryListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Category
-        fields = ["id", "name", "image", "slug"]
+        fields = ["id", "name", "image", "slug", "product_count"]
 
 
-class CategoryDetailSerializer(serializers.ModelSerializer):
+class CategoryDetailSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer para detalhes de categorias.
-    Inclui a lista de produtos da categoria.
+    Os produtos da categoria são paginados pela view (category_detail).
     """
 
-    products = ProductListSerializer(
-        many=True, read_only=True, help_text="Produtos da categoria"
-    )
-
     class Meta:
         model = Category
-        fields = ["id", "name", "image", "products"]
+        fields = ["id", "name", "image", "product_count"]
 
 
 class ProductCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,235 @@
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from apps.accounts.models import Store
+from apps.core.response_cache import bump_generations
+from .cache import invalidate_product_details
+from .counts import apply_count_deltas
+from .listing import sync_store_listing
+from .models import Category, Product
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Store)
+def sync_product_listing(sender, instance, **kwargs):
+    """
+    Copia o is_active da loja para o is_listed dos seus produtos (um
+    UPDATE), antes das invalidações abaixo.
+
+    Args:
+        sender: Modelo que enviou o sinal (Store)
+        instance: Instância da loja alterada
+    """
+    sync_store_listing(instance)
+
+
+@receiver(post_init, sender=Product)
+def remember_product_availability(sender, instance, **kwargs):
+    """
+    Guarda a categoria e a disponibilidade carregadas, para atualizar as
+    contagens por categoria ao salvar.
+
+    Args:
+        sender: Modelo que enviou o sinal (Product)
+        instance: Instância do modelo inicializada
+    """
+    instance.remember_availability()
+
+
+@receiver(post_save, sender=Product)
+def update_category_counts_on_save(sender, instance, created, **kwargs):
+    """
+    Atualiza as contagens das categorias quando um produto é criado ou muda
+    de categoria, estoque ou visibilidade.
+
+    Args:
+        sender: Modelo que enviou o sinal (Product)
+        instance: Instância do produto salvo
+        created: Indica se o produto acabou de ser criado
+    """
+    if not created and instance._loaded_available is None:
+        # Campos não carregados (ex: save após only()); diferença desconhecida
+        return
+    deltas = Counter()
+    if not created and instance._loaded_available:
+        deltas[instance._loaded_category_id] -= 1
+    if instance.is_listed and instance.in_stock:
+        deltas[instance.category_id] += 1
+    apply_count_deltas(deltas)
+    instance.remember_availability()
+
+
+@receiver(post_delete, sender=Product)
+def update_category_counts_on_delete(sender, instance, **kwargs):
+    """
+    Atualiza a contagem da categoria quando um produto é excluído.
+
+    Args:
+        sender: Modelo que enviou o sinal (Product)
+        instance: Instância do produto excluído
+    """
+    # Usa os valores gravados no banco, não alterações feitas em memória
+    if instance._loaded_available:
+        apply_count_deltas({instance._loaded_category_id: -1})
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_on_change(sender, instance, **kwargs):
+    """
+    Invalida o cache de detalhes quando um produto é salvo ou excluído.
+
+    Args:
+        sender: Modelo que enviou o sinal (Product)
+        instance: Instância do produto alterado
+    """
+    invalidate_product_details([instance.slug])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+def invalidate_catalog_responses(sender, instance, **kwargs):
+    """
+    Troca a geração do modelo alterado no cache de respostas do catálogo.
+
+    Args:
+        sender: Modelo que enviou o sinal (Product, Category ou Store)
+        instance: Instância alterada
+    """
+    bump_generations(sender._meta.model_name)
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, **kwargs):
+    """
+    Atualiza o produto no índice de busca.
+
+    Args:
+        sender: Modelo que enviou o sinal (Product)
+        instance: Instância do produto salvo
+    """
+    get_search_backend().index_products([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    """
+    Remove o produto excluído do índice de busca.
+
+    Args:
+        sender: Modelo que enviou o sinal (Product)
+        instance: Instância do produto excluído
+    """
+    get_search_backend().remove_products([instance.pk])
+
+
+# Campos de Store e Category copiados para os detalhes e o índice de busca
+# dos seus produtos
+STORE_PRODUCT_FIELDS = ("name", "is_active")
+CATEGORY_PRODUCT_FIELDS = ("name",)
+
+
+def _remember_fields(instance, fields):
+    # Lê do __dict__ para não disparar queries em campos adiados (only/defer)
+    loaded = instance.__dict__.setdefault("_loaded_fields", {})
+    loaded.update(
+        (field, instance.__dict__[field])
+        for field in fields
+        if field in instance.__dict__
+    )
+
+
+def _saved_changes(instance, fields, update_fields):
+    """
+    Campos gravados pelo save que mudaram desde o carregamento (ou o último
+    save) da instância; campos não carregados contam como alterados.
+    """
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields]
+    loaded = instance.__dict__.get("_loaded_fields", {})
+    changed = {
+        field
+        for field in fields
+        if field not in loaded or loaded[field] != getattr(instance, field)
+    }
+    _remember_fields(instance, fields)
+    return changed
+
+
+def _invalidate_products(products, reindex):
+    products = list(products.values_list("id", "slug"))
+    invalidate_product_details([slug for _, slug in products])
+    if reindex:
+        get_search_backend().index_products([product_id for product_id, _ in products])
+
+
+@receiver(post_init, sender=Store)
+def remember_store_fields(sender, instance, **kwargs):
+    """
+    Guarda o nome e o is_active carregados, para invalidar os produtos da
+    loja apenas quando mudam.
+
+    Args:
+        sender: Modelo que enviou o sinal (Store)
+        instance: Instância do modelo inicializada
+    """
+    _remember_fields(instance, STORE_PRODUCT_FIELDS)
+
+
+@receiver(post_init, sender=Category)
+def remember_category_fields(sender, instance, **kwargs):
+    """
+    Guarda o nome carregado, para invalidar os produtos da categoria apenas
+    quando ele muda.
+
+    Args:
+        sender: Modelo que enviou o sinal (Category)
+        instance: Instância do modelo inicializada
+    """
+    _remember_fields(instance, CATEGORY_PRODUCT_FIELDS)
+
+
+@receiver(post_save, sender=Store)
+def invalidate_store_products(sender, instance, created, update_fields, **kwargs):
+    """
+    Invalida o cache e reindexa os produtos de uma loja renomeada, ativada
+    ou desativada. Os detalhes incluem o nome da loja e só são exibidos com
+    a loja ativa; outras alterações não afetam os produtos.
+
+    Args:
+        sender: Modelo que enviou o sinal (Store)
+        instance: Instância da loja alterada
+        created: Indica se a loja acabou de ser criada (ainda sem produtos)
+        update_fields: Campos passados para save(), ou None
+    """
+    changed = _saved_changes(instance, STORE_PRODUCT_FIELDS, update_fields)
+    if created or not changed:
+        return
+    # A busca só retorna produtos de lojas ativas; o nome da loja não é
+    # indexado
+    _invalidate_products(
+        Product.objects.filter(store=instance), reindex="is_active" in changed
+    )
+
+
+@receiver(post_save, sender=Category)
+def invalidate_category_products(sender, instance, created, update_fields, **kwargs):
+    """
+    Invalida o cache e reindexa os produtos de uma categoria renomeada.
+
+    Args:
+        sender: Modelo que enviou o sinal (Category)
+        instance: Instância da categoria alterada
+        created: Indica se a categoria acabou de ser criada
+        update_fields: Campos passados para save(), ou None
+    """
+    changed = _saved_changes(instance, CATEGORY_PRODUCT_FIELDS, update_fields)
+    if created or not changed:
+        return
+    # O nome da categoria faz parte do documento indexado
+    _invalidate_products(Product.objects.filter(category=instance), reindex=True)
@@ -1,11 +1,34 @@
-from django.test import TestCase
+import json
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils.text import slugify
 from rest_framework.test import APITestCase
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
+from .cache import (
+    _payload_key,
+    get_product_detail,
+    get_product_detail_version,
+    invalidate_product_details,
+)
+from .facets import facet_counts
+from .filters import ProductFilter
+from .listing import sync_store_listing
 from .models import Category, Product
+from .search import InvertedIndexBackend, get_search_backend, reset_search_backend
+from .search.text import analyze
+from .serializers import ProductDetailSerializer, ProductListSerializer
 from apps.accounts.models import Store
+from apps.cart.models import Cart, CartItem
+from apps.orders.checkout import place_order
+from apps.reviews.models import Review
 
 User = get_user_model()
 
@@ -75,6 +98,7 @@ class ProductAPITest(APITestCase):
 
     def setUp(self):
         """Configuração inicial para os testes"""
+        reset_search_backend()
         self.seller = User.objects.create_user(
             username="seller",
             email="seller@example.com",
@@ -108,16 +132,16 @@ class ProductAPITest(APITestCase):
         url = reverse("product_list")
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["name"], "Test Product")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["name"], "Test Product")
 
     def test_products_list_by_store(self):
         """Testa a listagem de produtos de uma loja específica"""
         url = reverse("product_list")
         response = self.client.get(url, {"store": self.store.slug})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["name"], "Test Product")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["name"], "Test Product")
 
     def test_product_detail(self):
         """Testa a obtenção de detalhes de um produto"""
@@ -140,6 +164,7 @@ class ProductAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]["name"], "Test Category")
+        self.assertEqual(response.data[0]["product_count"], 1)
 
     def test_category_detail(self):
         """Testa a obtenção de detalhes de uma categoria"""
@@ -147,7 +172,8 @@ class ProductAPITest(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["name"], "Test Category")
-        self.assertEqual(len(response.data["products"]), 1)
+        self.assertEqual(response.data["product_count"], 1)
+        self.assertEqual(len(response.data["products"]["results"]), 1)
 
     def test_create_product_as_seller(self):
         """Testa a criação de um produto por um vendedor"""
@@ -293,19 +319,21 @@ class ProductAPITest(APITestCase):
         url = reverse("search")
         response = self.client.get(url, {"query": "Product"})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)  # "Test Product" e "Another Product"
+        self.assertEqual(
+            len(response.data["results"]), 2
+        )  # "Test Product" e "Another Product"
 
         # Busca por descrição
         url = reverse("search")
         response = self.client.get(url, {"query": "different"})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)  # Apenas "Different Item"
+        self.assertEqual(len(response.data["results"]), 1)  # Apenas "Different Item"
 
         # Busca por categoria
         url = reverse("search")
         response = self.client.get(url, {"query": "Test Category"})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 3)  # Todos os produtos
+        self.assertEqual(len(response.data["results"]), 3)  # Todos os produtos
 
     def test_store_products(self):
         """Testa a listagem de produtos de uma loja"""
@@ -322,10 +350,985 @@ class ProductAPITest(APITestCase):
         url = reverse("store_products", kwargs={"slug": self.store.slug})
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)  # "Test Product" e "Another Product"
+        self.assertEqual(
+            len(response.data["results"]), 2
+        )  # "Test Product" e "Another Product"
 
     def test_store_products_not_found(self):
         """Testa a tentativa de obter produtos de uma loja inexistente"""
         url = reverse("store_products", kwargs={"slug": "nonexistent-store"})
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ProductPaginationTest(APITestCase):
+    """Testes para a paginação por cursor do catálogo"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.seller = User.objects.create_user(
+            username="seller",
+            email="seller@example.com",
+            password="sellerpass123",
+            user_type="seller",
+            is_approved_seller=True,
+        )
+        self.store = Store.objects.create(name="Test Store", owner=self.seller)
+        self.category = Category.objects.create(name="Test Category")
+        # Preços repetidos para testar o desempate pelo id
+        self.products = [
+            Product.objects.create(
+                name=f"Product {i}",
+                description="A test product",
+                price=10 + (i % 5),
+                category=self.category,
+                store=self.store,
+            )
+            for i in range(25)
+        ]
+
+    def collect_pages(self, url, params):
+        """Percorre todas as páginas seguindo o link 'next'"""
+        ids = []
+        pages = 0
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item["id"] for item in response.data["results"])
+            pages += 1
+            if not response.data["next"]:
+                return ids, pages, response
+            response = self.client.get(response.data["next"])
+
+    def test_pages_cover_all_products_once(self):
+        """Testa que as páginas cobrem todos os produtos sem repetições"""
+        ids, pages, _ = self.collect_pages(reverse("product_list"), {"page_size": 10})
+        self.assertEqual(pages, 3)
+        expected = [
+            p.id
+            for p in sorted(
+                self.products, key=lambda p: (p.created_at, p.id), reverse=True
+            )
+        ]
+        self.assertEqual(ids, expected)
+
+    def test_ordering_by_price(self):
+        """Testa a ordenação estável por (preço, id)"""
+        ids, _, _ = self.collect_pages(
+            reverse("product_list"), {"page_size": 7, "ordering": "price"}
+        )
+        expected = [p.id for p in sorted(self.products, key=lambda p: (p.price, p.id))]
+        self.assertEqual(ids, expected)
+
+    def test_previous_link(self):
+        """Testa a navegação para a página anterior"""
+        url = reverse("product_list")
+        first = self.client.get(url, {"page_size": 10, "ordering": "-price"})
+        self.assertIsNone(first.data["previous"])
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in back.data["results"]],
+            [item["id"] for item in first.data["results"]],
+        )
+        self.assertIsNone(back.data["previous"])
+
+    def test_invalid_cursor(self):
+        """Testa que um cursor inválido retorna 404"""
+        response = self.client.get(reverse("product_list"), {"cursor": "invalido"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_from_other_ordering(self):
+        """Testa que um cursor de outra ordenação é rejeitado"""
+        url = reverse("product_list")
+        first = self.client.get(url, {"page_size": 10, "ordering": "price"})
+        cursor = first.data["next"].split("cursor=")[1].split("&")[0]
+        response = self.client.get(url, {"cursor": cursor, "ordering": "-created_at"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_store_products_paginated(self):
+        """Testa a paginação dos produtos de uma loja"""
+        ids, pages, _ = self.collect_pages(
+            reverse("store_products", kwargs={"slug": self.store.slug}),
+            {"page_size": 20},
+        )
+        self.assertEqual(pages, 2)
+        self.assertEqual(len(ids), 25)
+
+    def test_seller_products_paginated(self):
+        """Testa a paginação dos produtos do vendedor"""
+        refresh = RefreshToken.for_user(self.seller)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        ids, pages, _ = self.collect_pages(
+            reverse("seller_products"), {"page_size": 10}
+        )
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(set(ids)), 25)
+
+    @override_settings(EXPORT_CHUNK_SIZE=10)
+    def test_seller_products_export(self):
+        """Testa a exportação em streaming de todos os produtos do vendedor"""
+        self.client.force_authenticate(self.seller)
+        response = self.client.get(
+            reverse("export_seller_products"), {"output": "ndjson"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(
+            [row["id"] for row in rows], [product.id for product in self.products]
+        )
+        self.assertEqual(rows[0]["category"], "Test Category")
+
+
+class EagerLoadingQueryCountTest(TestCase):
+    """Testa que a serialização de listas usa um número constante de queries"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.category = Category.objects.create(name="Test Category")
+        self.stores = []
+        for i in range(5):
+            seller = User.objects.create_user(
+                username=f"seller{i}",
+                email=f"seller{i}@example.com",
+                password="sellerpass123",
+                user_type="seller",
+            )
+            self.stores.append(Store.objects.create(name=f"Store {i}", owner=seller))
+
+    def create_products(self, total):
+        Product.objects.all().delete()
+        Product.objects.bulk_create(
+            Product(
+                name=f"Product {i}",
+                slug=f"product-{i}",
+                description="A test product",
+                price=10,
+                category=self.category,
+                store=self.stores[i % len(self.stores)],
+            )
+            for i in range(total)
+        )
+
+    def test_product_list_serializer_constant_queries(self):
+        """Testa o ProductListSerializer com 1, 100 e 1000 produtos"""
+        for total in (1, 100, 1000):
+            with self.subTest(total=total):
+                self.create_products(total)
+                with self.assertNumQueries(1):
+                    products = ProductListSerializer.setup_eager_loading(
+                        Product.objects.all()
+                    )
+                    data = ProductListSerializer(products, many=True).data
+                self.assertEqual(len(data), total)
+                self.assertTrue(data[0]["store_name"].startswith("Store"))
+
+    def test_category_detail_constant_queries(self):
+        """Testa a página de produtos da categoria com 1, 100 e 1000 produtos"""
+        url = reverse("category_detail", kwargs={"slug": self.category.slug})
+        for total in (1, 100, 1000):
+            with self.subTest(total=total):
+                self.create_products(total)
+                cache.clear()
+                # Categoria e página de produtos; a contagem vem da coluna
+                with self.assertNumQueries(2):
+                    response = self.client.get(url)
+                self.assertEqual(
+                    len(response.data["products"]["results"]), min(total, 20)
+                )
+
+
+class ProductDetailCacheTest(APITestCase):
+    """Testes para o cache read-through dos detalhes de produtos"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        cache.clear()
+        self.seller = User.objects.create_user(
+            username="seller",
+            email="seller@example.com",
+            password="sellerpass123",
+            user_type="seller",
+            is_approved_seller=True,
+        )
+        self.store = Store.objects.create(name="Test Store", owner=self.seller)
+        self.category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            name="Test Product",
+            description="A test product",
+            price=10.99,
+            category=self.category,
+            store=self.store,
+        )
+        self.url = reverse("product_detail", kwargs={"slug": self.product.slug})
+
+    def test_second_request_served_from_cache(self):
+        """Testa que a segunda requisição não acessa o banco"""
+        first = self.client.get(self.url)
+        self.assertEqual(first["X-Cache"], "MISS")
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.data, first.data)
+
+    def test_invalidated_on_product_save(self):
+        """Testa a invalidação ao salvar o produto"""
+        self.client.get(self.url)
+        self.product.price = 15.50
+        self.product.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["price"], "15.50")
+
+    def test_invalidated_on_product_delete(self):
+        """Testa a invalidação ao excluir o produto"""
+        self.client.get(self.url)
+        self.product.delete()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalidated_on_store_deactivation(self):
+        """Testa a invalidação ao desativar a loja"""
+        self.client.get(self.url)
+        self.store.is_active = False
+        self.store.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalidated_on_category_rename(self):
+        """Testa a invalidação ao renomear a categoria"""
+        self.client.get(self.url)
+        self.category.name = "Renamed Category"
+        self.category.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["category"], "Renamed Category")
+
+    def test_store_save_without_changes_keeps_products(self):
+        """Testa que salvar a loja sem mudar nome nem is_active não invalida"""
+        self.client.get(self.url)
+        version = get_product_detail_version(self.product.slug)
+        self.store.description = "Nova descrição"
+        with patch("apps.products.signals.get_search_backend") as backend:
+            self.store.save()
+            Store.objects.get(pk=self.store.pk).save()
+        backend.assert_not_called()
+        self.assertEqual(get_product_detail_version(self.product.slug), version)
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "HIT")
+
+    def test_store_rename_invalidates_without_reindex(self):
+        """Testa que renomear a loja invalida os detalhes sem reindexar"""
+        self.client.get(self.url)
+        self.store.name = "Renamed Store"
+        with patch("apps.products.signals.get_search_backend") as backend:
+            self.store.save()
+        backend.return_value.index_products.assert_not_called()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["store"], "Renamed Store")
+
+    def test_category_save_without_rename_keeps_products(self):
+        """Testa que salvar a categoria sem renomear não invalida"""
+        self.client.get(self.url)
+        version = get_product_detail_version(self.product.slug)
+        self.category.name = "Renamed Category"
+        with patch("apps.products.signals.get_search_backend") as backend:
+            # O nome alterado não é gravado
+            self.category.save(update_fields=["image"])
+            Category.objects.create(name="New Category")
+        backend.assert_not_called()
+        self.assertEqual(get_product_detail_version(self.product.slug), version)
+
+        # O nome gravado depois ainda conta como alteração
+        self.category.save()
+        self.assertNotEqual(get_product_detail_version(self.product.slug), version)
+
+    def test_unknown_slug_creates_no_version(self):
+        """Testa que slugs inexistentes não criam versões no cache"""
+        response = self.client.get(
+            reverse("product_detail", kwargs={"slug": "nao-existe"})
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIsNone(get_product_detail_version("nao-existe"))
+
+    def test_not_cached_when_invalidated_during_read(self):
+        """Testa que a leitura concorrente a uma invalidação não é guardada"""
+        slug = self.product.slug
+        query = Product.objects.all()
+
+        def invalidated(*args, **kwargs):
+            invalidate_product_details([slug])
+            return query
+
+        with patch.object(
+            ProductDetailSerializer, "setup_eager_loading", side_effect=invalidated
+        ):
+            data, hit = get_product_detail(slug)
+        self.assertFalse(hit)
+        self.assertEqual(data["name"], "Test Product")
+        self.assertIsNone(
+            cache.get(_payload_key(slug, get_product_detail_version(slug)))
+        )
+
+    def test_cache_stats(self):
+        """Testa os contadores de acertos e falhas"""
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.client.get(self.url)
+
+        admin = User.objects.create_user(
+            username="admin",
+            email="admin@example.com",
+            password="adminpass123",
+            user_type="admin",
+        )
+        refresh = RefreshToken.for_user(admin)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        response = self.client.get(reverse("product_cache_stats"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["hits"], 2)
+        self.assertEqual(response.data["misses"], 1)
+
+    def test_cache_stats_requires_admin(self):
+        """Testa que apenas administradores acessam os contadores"""
+        refresh = RefreshToken.for_user(self.seller)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        response = self.client.get(reverse("product_cache_stats"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ProductListingTest(APITestCase):
+    """Testes para a visibilidade dos produtos no catálogo (is_listed)"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username="admin", email="admin@example.com", user_type="admin"
+        )
+        self.seller = User.objects.create_user(
+            username="seller", email="seller@example.com", user_type="seller"
+        )
+        self.store = Store.objects.create(
+            name="Loja Pendente", owner=self.seller, is_active=False
+        )
+        self.product = Product.objects.create(
+            name="Produto", description="Descrição", price=10, store=self.store
+        )
+
+    def listed_names(self):
+        response = self.client.get(reverse("product_list"))
+        return [product["name"] for product in response.data["results"]]
+
+    def test_created_with_store_visibility(self):
+        """Testa que o produto de uma loja inativa é criado fora do catálogo"""
+        self.assertFalse(self.product.is_listed)
+        self.assertEqual(self.listed_names(), [])
+
+    def test_listed_on_seller_approval(self):
+        """Testa que a aprovação do vendedor lista os produtos da loja"""
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(
+            reverse("approve_seller", kwargs={"user_id": self.seller.id})
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.product.refresh_from_db()
+        self.assertTrue(self.product.is_listed)
+        self.assertEqual(self.listed_names(), ["Produto"])
+
+    def test_unlisted_on_store_deactivation(self):
+        """Testa que a loja desativada em manage_store sai do catálogo"""
+        self.store.is_active = True
+        self.store.save()
+        self.client.force_authenticate(self.seller)
+        response = self.client.put(
+            reverse("manage_store"), {"is_active": False}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.listed_names(), [])
+
+    def test_sync_single_update(self):
+        """Testa a sincronização dos produtos da loja num único UPDATE"""
+        Product.objects.create(
+            name="Outro", description="Descrição", price=5, store=self.store
+        )
+        Store.objects.filter(pk=self.store.pk).update(is_active=True)
+        self.store.refresh_from_db()
+        # Contagem por categoria e UPDATE dos produtos (sem categoria, as
+        # categorias não são atualizadas)
+        with self.assertNumQueries(2):
+            self.assertEqual(sync_store_listing(self.store), 2)
+        self.assertEqual(sync_store_listing(self.store), 0)
+
+    def test_check_listing_command(self):
+        """Testa a verificação e a correção das divergências"""
+        call_command("check_listing", stdout=StringIO())
+
+        # update() em massa não dispara os signals
+        Store.objects.filter(pk=self.store.pk).update(is_active=True)
+        with self.assertRaises(CommandError):
+            call_command("check_listing", stdout=StringIO())
+
+        out = StringIO()
+        call_command("check_listing", "--fix", stdout=out)
+        self.assertIn("1 produtos corrigidos", out.getvalue())
+        self.assertEqual(self.listed_names(), ["Produto"])
+        call_command("check_listing", stdout=StringIO())
+
+
+class CategoryCountTest(APITestCase):
+    """Testes para a contagem de produtos das categorias (product_count)"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        cache.clear()
+        self.seller = User.objects.create_user(
+            username="seller", email="seller@example.com", user_type="seller"
+        )
+        self.store = Store.objects.create(name="Loja", owner=self.seller)
+        self.category = Category.objects.create(name="Categoria")
+        self.other = Category.objects.create(name="Outra")
+        self.product = Product.objects.create(
+            name="Produto",
+            description="Descrição",
+            price=10,
+            category=self.category,
+            store=self.store,
+            stock_quantity=2,
+        )
+
+    def counts(self):
+        return dict(Category.objects.values_list("name", "product_count"))
+
+    def test_created_and_deleted(self):
+        """Testa a contagem na criação e na exclusão de produtos"""
+        self.assertEqual(self.counts(), {"Categoria": 1, "Outra": 0})
+        Product.objects.create(
+            name="Sem estoque",
+            description="Descrição",
+            price=5,
+            category=self.category,
+            store=self.store,
+            in_stock=False,
+        )
+        self.assertEqual(self.counts(), {"Categoria": 1, "Outra": 0})
+        self.product.delete()
+        self.assertEqual(self.counts(), {"Categoria": 0, "Outra": 0})
+
+    def test_stock_and_category_changes(self):
+        """Testa a contagem ao zerar o estoque e ao trocar a categoria"""
+        self.product.in_stock = False
+        self.product.save()
+        self.assertEqual(self.counts(), {"Categoria": 0, "Outra": 0})
+
+        self.product.in_stock = True
+        self.product.category = self.other
+        self.product.save()
+        self.assertEqual(self.counts(), {"Categoria": 0, "Outra": 1})
+
+        # Um carregamento parcial não altera a contagem
+        product = Product.objects.only("name").get(pk=self.product.pk)
+        product.name = "Renomeado"
+        product.save()
+        self.assertEqual(self.counts(), {"Categoria": 0, "Outra": 1})
+
+    def test_store_deactivation(self):
+        """Testa a contagem ao desativar e reativar a loja"""
+        self.store.is_active = False
+        self.store.save()
+        self.assertEqual(self.counts()["Categoria"], 0)
+        self.store.is_active = True
+        self.store.save()
+        self.assertEqual(self.counts()["Categoria"], 1)
+
+    def test_checkout_sell_out(self):
+        """Testa a contagem quando o checkout esgota o produto"""
+        cart = Cart.objects.create(cart_code="COUNTS000001")
+        CartItem.objects.create(cart=cart, product=self.product, quantity=1)
+        place_order(cart, self.seller, "Rua 1")
+        self.assertEqual(self.counts()["Categoria"], 1)
+
+        cart = Cart.objects.create(cart_code="COUNTS000002")
+        CartItem.objects.create(cart=cart, product=self.product, quantity=1)
+        place_order(cart, self.seller, "Rua 1")
+        self.assertEqual(self.counts()["Categoria"], 0)
+        response = self.client.get(reverse("category_list"))
+        self.assertEqual(
+            {item["name"]: item["product_count"] for item in response.data},
+            {"Categoria": 0, "Outra": 0},
+        )
+
+    def test_recompute_command(self):
+        """Testa a reconstrução das contagens após um update() em massa"""
+        # update() em massa não dispara os signals
+        Product.objects.filter(pk=self.product.pk).update(category=self.other)
+        self.assertEqual(self.counts(), {"Categoria": 1, "Outra": 0})
+
+        out = StringIO()
+        call_command(
+            "recompute_category_counts", "--category", self.other.pk, stdout=out
+        )
+        self.assertIn("1 contagens recalculadas", out.getvalue())
+        self.assertEqual(self.counts(), {"Categoria": 1, "Outra": 1})
+        call_command("recompute_category_counts", stdout=StringIO())
+        self.assertEqual(self.counts(), {"Categoria": 0, "Outra": 1})
+
+
+class ConditionalGetTest(APITestCase):
+    """Testes para o GET condicional (ETag / Last-Modified) do catálogo"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        cache.clear()
+        self.seller = User.objects.create_user(
+            username="seller",
+            email="seller@example.com",
+            password="sellerpass123",
+            user_type="seller",
+            is_approved_seller=True,
+        )
+        self.store = Store.objects.create(name="Test Store", owner=self.seller)
+        self.category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            name="Test Product",
+            description="A test product",
+            price=10.99,
+            category=self.category,
+            store=self.store,
+        )
+        self.urls = {
+            "product_list": reverse("product_list"),
+            "product_detail": reverse(
+                "product_detail", kwargs={"slug": self.product.slug}
+            ),
+            "category_list": reverse("category_list"),
+            "category_detail": reverse(
+                "category_detail", kwargs={"slug": self.category.slug}
+            ),
+            "store_products": reverse(
+                "store_products", kwargs={"slug": self.store.slug}
+            ),
+        }
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response["ETag"]
+
+    def test_not_modified_without_serialization(self):
+        """Testa o 304 sem corpo, apenas com a query dos validadores"""
+        for name, url in self.urls.items():
+            with self.subTest(endpoint=name):
+                etag = self.etag(url)
+                # Listagens e detalhes usam versões do cache, sem acessar o banco
+                queries = 1 if name in ("category_list", "store_products") else 0
+                with self.assertNumQueries(queries):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+                self.assertEqual(response.content, b"")
+                self.assertEqual(response["ETag"], etag)
+                self.assertIn("no-cache", response["Cache-Control"])
+
+    @override_settings(CONDITIONAL_GET_CACHE_VALIDATORS=False)
+    def test_cache_validators_require_shared_cache(self):
+        """Testa os endpoints sem validadores do cache sem um cache compartilhado"""
+        for name, url in self.urls.items():
+            with self.subTest(endpoint=name):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                if name in ("category_list", "store_products"):
+                    # Validadores calculados a partir do banco
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+                    self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+                else:
+                    self.assertNotIn("ETag", response)
+                    self.assertNotIn("Last-Modified", response)
+
+    @override_settings(CORS_ALLOWED_ORIGINS=["http://localhost:3000"])
+    def test_validators_exposed_cross_origin(self):
+        """Testa que o frontend de outra origem pode ler ETag e Last-Modified"""
+        response = self.client.get(
+            self.urls["product_list"], HTTP_ORIGIN="http://localhost:3000"
+        )
+        exposed = response["Access-Control-Expose-Headers"].split(", ")
+        self.assertIn("ETag", exposed)
+        self.assertIn("Last-Modified", exposed)
+
+    def test_if_modified_since(self):
+        """Testa o 304 a partir do Last-Modified"""
+        url = self.urls["product_list"]
+        last_modified = self.client.get(url)["Last-Modified"]
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes_on_product_update(self):
+        """Testa a troca dos validadores ao alterar o produto"""
+        etags = {name: self.etag(url) for name, url in self.urls.items()}
+        self.product.price = 15.50
+        self.product.save()
+
+        for name in ("product_list", "product_detail", "category_detail"):
+            with self.subTest(endpoint=name):
+                response = self.client.get(
+                    self.urls[name], HTTP_IF_NONE_MATCH=etags[name]
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertNotEqual(response["ETag"], etags[name])
+
+    def test_etag_changes_on_store_rename(self):
+        """Testa a troca dos validadores ao renomear a loja"""
+        url = self.urls["store_products"]
+        etag = self.etag(url)
+        self.store.name = "Renamed Store"
+        self.store.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["store_name"], "Renamed Store")
+
+    def test_etag_changes_on_category_rename_and_delete(self):
+        """Testa a troca dos validadores da listagem de categorias"""
+        url = self.urls["category_list"]
+        etag = self.etag(url)
+        self.category.name = "Renamed Category"
+        self.category.save()
+        renamed = self.etag(url)
+        self.assertNotEqual(renamed, etag)
+
+        Category.objects.create(name="Other").delete()
+        self.assertEqual(self.etag(url), renamed)
+        self.product.delete()
+        self.category.delete()
+        self.assertNotEqual(self.etag(url), renamed)
+
+    def test_etag_changes_on_stock_decrement(self):
+        """Testa a troca dos validadores na baixa de estoque do checkout"""
+        url = self.urls["product_list"]
+        etag = self.etag(url)
+        cart = Cart.objects.create(cart_code="CHECKOUT0001")
+        CartItem.objects.create(cart=cart, product=self.product, quantity=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            place_order(cart, self.seller, "Rua 1")
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data["results"][0]["in_stock"])
+
+    def test_errors_without_validators(self):
+        """Testa que respostas de erro não recebem ETag"""
+        response = self.client.get(
+            reverse("category_detail", kwargs={"slug": "nonexistent"})
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(response.has_header("ETag"))
+
+
+class ProductFilterTest(APITestCase):
+    """Testes para os filtros e as facetas de products_list"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        cache.clear()
+        self.stores = []
+        for name in ("Loja A", "Loja B"):
+            seller = User.objects.create_user(
+                username=name, email=f"{slugify(name)}@example.com", user_type="seller"
+            )
+            self.stores.append(Store.objects.create(name=name, owner=seller))
+        self.buyer = User.objects.create_user(
+            username="buyer", email="buyer@example.com", user_type="buyer"
+        )
+        self.books = Category.objects.create(name="Livros")
+        self.games = Category.objects.create(name="Jogos")
+        specs = [
+            # nome, preço, loja, categoria, em estoque, destaque, nota
+            ("Barato", 8500, 0, self.books, True, False, 5),
+            ("Médio", 45000, 0, self.games, True, True, 3),
+            ("Caro", 300000, 1, self.games, False, False, None),
+            ("Premium", 850000, 1, self.books, True, True, 4),
+        ]
+        self.products = {}
+        for name, price, store, category, in_stock, featured, rating in specs:
+            product = Product.objects.create(
+                name=name,
+                description="Descrição",
+                price=price,
+                store=self.stores[store],
+                category=category,
+                in_stock=in_stock,
+                featured=featured,
+            )
+            if rating:
+                Review.objects.create(product=product, user=self.buyer, rating=rating)
+            self.products[name] = product
+
+    def names(self, **params):
+        response = self.client.get(reverse("product_list"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(product["name"] for product in response.data["results"])
+
+    def facets(self, **params):
+        response = self.client.get(
+            reverse("product_list"), {"facets": "true", **params}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["facets"]
+
+    def test_filters(self):
+        """Testa cada filtro e a combinação deles"""
+        self.assertEqual(
+            self.names(min_price=40000, max_price=300000), ["Caro", "Médio"]
+        )
+        self.assertEqual(self.names(in_stock="false"), ["Caro"])
+        self.assertEqual(self.names(featured="true"), ["Médio", "Premium"])
+        self.assertEqual(self.names(store=self.stores[1].slug), ["Caro", "Premium"])
+        self.assertEqual(self.names(category=self.books.id), ["Barato", "Premium"])
+        self.assertEqual(self.names(min_rating=4), ["Barato", "Premium"])
+        self.assertEqual(
+            self.names(category=self.games.id, in_stock="true", max_price=100000),
+            ["Médio"],
+        )
+        self.assertEqual(self.names(store="inexistente"), [])
+
+    def test_invalid_filter(self):
+        """Testa a resposta 400 para valores inválidos"""
+        response = self.client.get(reverse("product_list"), {"min_price": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("min_price", response.data)
+
+    def test_facets_without_filters(self):
+        """Testa as contagens de todas as facetas sem filtros"""
+        self.assertNotIn("facets", self.client.get(reverse("product_list")).data)
+        facets = self.facets()
+        self.assertEqual(
+            [(item["min"], item["count"]) for item in facets["price"]],
+            [
+                (0, 1),
+                (10000, 0),
+                (25000, 1),
+                (50000, 0),
+                (100000, 0),
+                (250000, 1),
+                (500000, 1),
+            ],
+        )
+        self.assertEqual(
+            facets["in_stock"],
+            [{"value": True, "count": 3}, {"value": False, "count": 1}],
+        )
+        self.assertEqual(
+            facets["featured"],
+            [{"value": True, "count": 2}, {"value": False, "count": 2}],
+        )
+        self.assertEqual(
+            facets["store"],
+            [
+                {"value": self.stores[0].slug, "name": "Loja A", "count": 2},
+                {"value": self.stores[1].slug, "name": "Loja B", "count": 2},
+            ],
+        )
+        self.assertEqual(
+            [(item["name"], item["count"]) for item in facets["category"]],
+            [("Jogos", 2), ("Livros", 2)],
+        )
+        self.assertEqual(
+            [(item["min"], item["count"]) for item in facets["rating"]],
+            [(4, 2), (3, 3), (2, 3), (1, 3)],
+        )
+
+    def test_facets_exclude_own_filter(self):
+        """Testa que cada faceta ignora o próprio filtro e aplica os demais"""
+        facets = self.facets(store=self.stores[1].slug, in_stock="true")
+        # Lojas: apenas o filtro in_stock
+        self.assertEqual(
+            [(item["name"], item["count"]) for item in facets["store"]],
+            [("Loja A", 2), ("Loja B", 1)],
+        )
+        # Em estoque: apenas o filtro da loja
+        self.assertEqual(
+            facets["in_stock"],
+            [{"value": True, "count": 1}, {"value": False, "count": 1}],
+        )
+        # Demais facetas: os dois filtros
+        self.assertEqual(
+            [(item["name"], item["count"]) for item in facets["category"]],
+            [("Livros", 1)],
+        )
+        self.assertEqual(facets["rating"][0], {"min": 4, "count": 1})
+        self.assertEqual(sum(item["count"] for item in facets["price"]), 1)
+
+    @override_settings(PRODUCT_PRICE_FACET_RANGES=[0, 50000, 500000])
+    def test_price_ranges_setting(self):
+        """Testa as faixas de preço definidas na configuração"""
+        self.assertEqual(
+            self.facets()["price"],
+            [
+                {"min": 0, "max": 50000, "count": 2},
+                {"min": 50000, "max": 500000, "count": 1},
+                {"min": 500000, "max": None, "count": 1},
+            ],
+        )
+
+    def test_facets_single_query(self):
+        """Testa que todas as facetas usam uma única query"""
+        filterset = ProductFilter(
+            {"min_price": 5000, "min_rating": 3, "store": self.stores[0].slug},
+            queryset=Product.objects.filter(is_listed=True),
+        )
+        self.assertTrue(filterset.is_valid())
+        with self.assertNumQueries(1):
+            facets = facet_counts(filterset, Product.objects.filter(is_listed=True))
+        self.assertEqual(facets["rating"][1], {"min": 3, "count": 2})
+
+    def test_rating_change_invalidates_responses(self):
+        """Testa a troca dos validadores e do cache numa nova avaliação"""
+        url = reverse("product_list")
+        params = {"min_rating": 4}
+        response = self.client.get(url, params)
+        etag = response["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(
+                product=self.products["Médio"], user=self.stores[0].owner, rating=5
+            )
+        # Média do Médio: (3 + 5) / 2
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(product["name"] for product in response.data["results"]),
+            ["Barato", "Médio", "Premium"],
+        )
+
+
+class ProductSearchTest(APITestCase):
+    """Testes para a busca de produtos ordenada por relevância"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        reset_search_backend()
+        self.seller = User.objects.create_user(
+            username="seller",
+            email="seller@example.com",
+            password="sellerpass123",
+            user_type="seller",
+            is_approved_seller=True,
+        )
+        self.store = Store.objects.create(name="Test Store", owner=self.seller)
+        self.category = Category.objects.create(name="Informática")
+        self.url = reverse("search")
+
+    def create_product(self, name, description="", store=None):
+        return Product.objects.create(
+            name=name,
+            description=description,
+            price=10,
+            category=self.category,
+            store=store or self.store,
+        )
+
+    def search(self, query, **params):
+        response = self.client.get(self.url, {"query": query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def names(self, response):
+        return [product["name"] for product in response.data["results"]]
+
+    def test_analyze_folds_accents_and_stems(self):
+        """Testa a normalização de acentos, stopwords e plurais"""
+        self.assertEqual(
+            analyze("Computadores Portáteis"), analyze("computador portatil")
+        )
+        self.assertEqual(analyze("papéis de parede"), analyze("papel parede"))
+
+    def test_name_match_ranks_first(self):
+        """Testa que correspondências no nome têm maior relevância"""
+        self.create_product("Mochila escolar", "Cabe um portátil de 15 polegadas")
+        self.create_product("Portátil Lenovo", "Computador leve")
+
+        response = self.search("portateis")
+        self.assertEqual(self.names(response), ["Portátil Lenovo", "Mochila escolar"])
+
+    def test_all_terms_required(self):
+        """Testa que todos os termos da busca precisam estar presentes"""
+        self.create_product("Rato sem fio", "Rato óptico")
+        self.create_product("Teclado sem fio", "Teclado compacto")
+
+        self.assertEqual(self.names(self.search("teclado fio")), ["Teclado sem fio"])
+        self.assertEqual(self.names(self.search("teclado óptico")), [])
+
+    def test_matches_category_name(self):
+        """Testa a busca pelo nome da categoria"""
+        self.create_product("Monitor 24")
+        self.assertEqual(self.names(self.search("informatica")), ["Monitor 24"])
+
+    def test_index_updated_on_save_and_delete(self):
+        """Testa a atualização incremental do índice"""
+        product = self.create_product("Impressora")
+        self.assertEqual(len(self.search("impressora").data["results"]), 1)
+
+        product.name = "Scanner"
+        product.save()
+        self.assertEqual(len(self.search("impressora").data["results"]), 0)
+        self.assertEqual(len(self.search("scanner").data["results"]), 1)
+
+        product.delete()
+        self.assertEqual(len(self.search("scanner").data["results"]), 0)
+
+    def test_index_updated_on_category_rename(self):
+        """Testa a reindexação ao renomear a categoria"""
+        self.create_product("Monitor 24")
+        self.search("monitor")  # Constrói o índice
+
+        self.category.name = "Periféricos"
+        self.category.save()
+        self.assertEqual(self.names(self.search("perifericos")), ["Monitor 24"])
+        self.assertEqual(self.names(self.search("informatica")), [])
+
+    def test_inactive_store_excluded(self):
+        """Testa que produtos de lojas inativas não aparecem"""
+        self.create_product("Impressora")
+        self.search("impressora")  # Constrói o índice
+
+        self.store.is_active = False
+        self.store.save()
+        self.assertEqual(len(self.search("impressora").data["results"]), 0)
+
+    def test_cursor_walks_ranked_results(self):
+        """Testa a paginação por cursor nos dois sentidos"""
+        for i in range(5):
+            self.create_product(f"Cabo USB {i}", "cabo " * i)
+        expected = self.names(self.search("cabo", page_size=100))
+
+        seen = []
+        response = self.search("cabo", page_size=2)
+        pages = [response]
+        seen.extend(self.names(response))
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            pages.append(response)
+            seen.extend(self.names(response))
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+
+        previous = self.client.get(pages[-1].data["previous"])
+        self.assertEqual(self.names(previous), self.names(pages[-2]))
+
+    def test_invalid_cursor(self):
+        """Testa um cursor inválido"""
+        response = self.client.get(self.url, {"query": "cabo", "cursor": "invalido"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_inverted_index_backend_is_default_on_sqlite(self):
+        """Testa a escolha automática do backend fora do PostgreSQL"""
+        self.assertIsInstance(get_search_backend(), InvertedIndexBackend)
@@ -1,53 +1,133 @@
 from rest_framework import status
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from django.db.models import Q
+from datetime import datetime, timezone
+
+from django.conf import settings
+
 from .models import Category, Product
 from apps.accounts.models import Store
+from apps.core.conditional import conditional_get, latest, queryset_state
+from apps.core.exports import export_response
+from apps.core.response_cache import cached_response, get_generations
+from .cache import (
+    PRODUCT_DETAIL_CACHE_VERSION,
+    get_product_detail,
+    get_product_detail_cache_stats,
+    get_product_detail_version,
+)
+from .facets import facet_counts
+from .filters import ProductFilter
+from .pagination import ProductCursorPagination, SearchCursorPagination
+from .search import get_search_backend
 from .serializers import (
     CategoryDetailSerializer,
     CategoryListSerializer,
     ProductCreateSerializer,
-    ProductDetailSerializer,
     ProductListSerializer,
 )
 
+# Filtros e facetas de products_list dependem também das categorias (nomes
+# na faceta) e das classificações (min_rating)
+PRODUCTS_LIST_DEPENDS_ON = ("product", "store", "category", "rating")
+
+
+# Validadores do GET condicional (apps.core.conditional). Os que leem versões
+# do cache só valem com um cache compartilhado pelos workers
+# (CONDITIONAL_GET_CACHE_VALIDATORS); sem ele a view responde sem validadores
+def products_list_validators(request):
+    # Gerações do cache de respostas, trocadas a cada escrita em produtos,
+    # lojas, categorias e classificações: sem agregar (count/max) o
+    # catálogo inteiro a cada requisição
+    if not settings.CONDITIONAL_GET_CACHE_VALIDATORS:
+        return None
+    generations = get_generations(PRODUCTS_LIST_DEPENDS_ON)
+    modified = datetime.fromtimestamp(max(generations) / 1e9, tz=timezone.utc)
+    return tuple(generations), modified
+
+
+def product_detail_validators(request, slug):
+    # Versão do cache de detalhes, trocada pelos signals a cada alteração
+    if not settings.CONDITIONAL_GET_CACHE_VALIDATORS:
+        return None
+    version = get_product_detail_version(slug)
+    if version is None:
+        return None
+    modified = datetime.fromtimestamp(version / 1e9, tz=timezone.utc)
+    return (slug, version, PRODUCT_DETAIL_CACHE_VERSION), modified
+
+
+def category_list_validators(request):
+    state = queryset_state(Category.objects.all(), "updated_at")
+    return state, state[1]
+
+
+def category_detail_validators(request, slug):
+    # Gerações do cache de respostas, como na listagem de produtos: sem
+    # agregar todos os produtos da categoria a cada requisição
+    if not settings.CONDITIONAL_GET_CACHE_VALIDATORS:
+        return None
+    generations = get_generations(("category", "product", "store"))
+    modified = datetime.fromtimestamp(max(generations) / 1e9, tz=timezone.utc)
+    return (slug, *generations), modified
+
+
+def store_products_validators(request, slug):
+    state = queryset_state(
+        Product.objects.filter(store__slug=slug, is_listed=True),
+        "updated_at",
+        "store__updated_at",
+    )
+    if not state[0]:
+        return None
+    return state, latest(*state[1:])
+
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@conditional_get(products_list_validators)
+@cached_response("products_list", depends_on=PRODUCTS_LIST_DEPENDS_ON)
 def products_list(request):
     """
-    Endpoint para listar produtos.
-    Pode filtrar por loja se o parâmetro 'store' for fornecido.
+    Endpoint para listar produtos do catálogo (lojas ativas), com filtros
+    e contagens por faceta.
 
     Parâmetros:
     - store: slug da loja (opcional)
+    - category: ID da categoria (opcional)
+    - min_price, max_price: faixa de preço (opcional)
+    - in_stock, featured: true ou false (opcional)
+    - min_rating: classificação média mínima (opcional)
+    - facets: true para incluir as contagens por faceta (opcional)
+    - ordering: created_at, -created_at, price ou -price (opcional)
+    - cursor: cursor da página (opcional)
+    - page_size: itens por página (opcional)
 
     Retorna:
-    - Lista de produtos
+    - Página de produtos (next, previous, results) e, com facets=true, as
+      contagens de cada faceta (facets)
     """
-    # Filtra por loja se fornecido
-    store_slug = request.query_params.get("store", None)
-    category_id = request.query_params.get("category", None)
-
-    # QuerySet base - sempre filtra por lojas ativas
-    products = Product.objects.filter(store__is_active=True)
-
-    # Aplica o filtro de loja, se fornecido
-    if store_slug:
-        products = products.filter(store__slug=store_slug)
-    
-    # Aplica o filtro de categoria, se fornecido
-    if category_id:
-        products = products.filter(category__id=category_id)
-
-    serializer = ProductListSerializer(products, many=True)
-    return Response(serializer.data)
+    # Sempre filtra por lojas ativas (is_listed, sem JOIN)
+    catalog = Product.objects.filter(is_listed=True)
+    filterset = ProductFilter(request.query_params, queryset=catalog)
+    if not filterset.is_valid():
+        return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    products = ProductListSerializer.setup_eager_loading(filterset.qs)
+    paginator = ProductCursorPagination()
+    page = paginator.paginate_queryset(products, request)
+    serializer = ProductListSerializer(page, many=True)
+    response = paginator.get_paginated_response(serializer.data)
+    if request.query_params.get("facets", "").lower() in ("1", "true"):
+        response.data["facets"] = facet_counts(filterset, catalog)
+    return response
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@conditional_get(product_detail_validators)
 def product_detail(request, slug):
     """
     Endpoint para obter detalhes de um produto.
@@ -58,18 +138,35 @@ def product_detail(request, slug):
     Retorna:
     - Detalhes do produto ou mensagem de erro
     """
-    try:
-        product = Product.objects.get(slug=slug, store__is_active=True)
-        serializer = ProductDetailSerializer(product)
-        return Response(serializer.data)
-    except Product.DoesNotExist:
+    # Detalhes servidos do cache read-through (invalidado pelos signals)
+    data, hit = get_product_detail(slug)
+    if data is None:
         return Response(
             {"error": "Produto não encontrado"}, status=status.HTTP_404_NOT_FOUND
         )
+    return Response(data, headers={"X-Cache": "HIT" if hit else "MISS"})
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def product_cache_stats(request):
+    """
+    Endpoint para obter os contadores do cache de detalhes de produtos.
+    Apenas administradores podem acessar este endpoint.
+
+    Retorna:
+    - Acertos, falhas e taxa de acerto do cache
+    """
+    if request.user.user_type != "admin":
+        return Response({"error": "Permissão negada"}, status=status.HTTP_403_FORBIDDEN)
+
+    return Response(get_product_detail_cache_stats())
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@conditional_get(category_list_validators)
+@cached_response("category_list", depends_on=("category",))
 def category_list(request):
     """
     Endpoint para listar categorias.
@@ -77,32 +174,45 @@ def category_list(request):
     Retorna:
     - Lista de categorias
     """
-    categories = Category.objects.all()
+    categories = CategoryListSerializer.setup_eager_loading(Category.objects.all())
     serializer = CategoryListSerializer(categories, many=True)
     return Response(serializer.data)
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@conditional_get(category_detail_validators)
+@cached_response("category_detail", depends_on=("category", "product", "store"))
 def category_detail(request, slug):
     """
     Endpoint para obter detalhes de uma categoria.
 
     Parâmetros:
     - slug: slug da categoria
+    - ordering, cursor, page_size: paginação dos produtos (opcionais)
 
     Retorna:
-    - Detalhes da categoria ou mensagem de erro
+    - Detalhes da categoria com uma página dos seus produtos
+      (products: next, previous, results) ou mensagem de erro
     """
     try:
         category = Category.objects.get(slug=slug)
-        serializer = CategoryDetailSerializer(category)
-        return Response(serializer.data)
     except Category.DoesNotExist:
         return Response(
             {"error": "Categoria não encontrada"}, status=status.HTTP_404_NOT_FOUND
         )
 
+    products = ProductListSerializer.setup_eager_loading(
+        Product.objects.filter(category=category, is_listed=True)
+    )
+    paginator = ProductCursorPagination()
+    page = paginator.paginate_queryset(products, request)
+    data = CategoryDetailSerializer(category).data
+    data["products"] = paginator.get_paginated_response(
+        ProductListSerializer(page, many=True).data
+    ).data
+    return Response(data)
+
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -194,13 +304,15 @@ def manage_product(request, slug):
 def product_search(request):
     """
     Endpoint para busca de produtos.
-    Busca por nome, descrição ou categoria.
+    Busca por nome, descrição ou categoria, com os resultados ordenados
+    por relevância (ver apps.products.search).
 
     Parâmetros:
     - query: termo de busca
+    - cursor, page_size: paginação (opcionais)
 
     Retorna:
-    - Lista de produtos correspondentes à busca
+    - Página de produtos correspondentes à busca
     """
     query = request.query_params.get("query")
     if not query:
@@ -209,45 +321,56 @@ def product_search(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    products = Product.objects.filter(
-        Q(name__icontains=query)
-        | Q(description__icontains=query)
-        | Q(category__name__icontains=query),
-        store__is_active=True,
-    )
+    paginator = SearchCursorPagination()
+    hits = paginator.paginate_search(get_search_backend(), query, request)
 
-    serializer = ProductListSerializer(products, many=True)
-    return Response(serializer.data)
+    # Mantém a ordem de relevância retornada pelo backend
+    products = ProductListSerializer.setup_eager_loading(
+        Product.objects.filter(id__in=[hit.product_id for hit in hits])
+    ).in_bulk()
+    page = [products[hit.product_id] for hit in hits if hit.product_id in products]
+
+    serializer = ProductListSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@conditional_get(store_products_validators)
+@cached_response("store_products", depends_on=("product", "store"))
 def store_products(request, slug):
     """
     Endpoint para listar produtos de uma loja específica.
 
     Parâmetros:
     - slug: slug da loja
+    - ordering, cursor, page_size: paginação (opcionais)
 
     Retorna:
-    - Lista de produtos da loja ou mensagem de erro
+    - Página de produtos da loja ou mensagem de erro
     """
     try:
         store = Store.objects.get(slug=slug, is_active=True)
-        products = Product.objects.filter(store=store)
-        serializer = ProductListSerializer(products, many=True)
-        return Response(serializer.data)
     except Store.DoesNotExist:
         return Response(
             {"error": "Loja não encontrada."}, status=status.HTTP_404_NOT_FOUND
         )
 
+    products = ProductListSerializer.setup_eager_loading(
+        Product.objects.filter(store=store)
+    )
+    paginator = ProductCursorPagination()
+    page = paginator.paginate_queryset(products, request)
+    serializer = ProductListSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def seller_products_list(request):
     """
     Endpoint para listar todos os produtos do vendedor autenticado.
+    Resultados paginados por cursor (ordering, cursor, page_size).
     """
     # Verifica se o usuário é um vendedor
     if request.user.user_type != "seller":
@@ -257,11 +380,53 @@ def seller_products_list(request):
         )
 
     try:
-        products = Product.objects.filter(store__owner=request.user)
-        serializer = ProductListSerializer(products, many=True)
-        return Response(serializer.data)
+        products = ProductListSerializer.setup_eager_loading(
+            Product.objects.filter(store__owner=request.user)
+        )
+        paginator = ProductCursorPagination()
+        page = paginator.paginate_queryset(products, request)
+        serializer = ProductListSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    except NotFound:
+        # Cursor inválido deve retornar 404, não erro interno
+        raise
     except Exception as e:
         return Response(
             {"error": "Ocorreu um erro ao buscar seus produtos."},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_seller_products(request):
+    """
+    Exporta todos os produtos do vendedor autenticado em streaming
+    (?output=csv ou ndjson), sem paginação.
+    """
+    if request.user.user_type != "seller":
+        return Response(
+            {"error": "Apenas vendedores podem acessar esta lista."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    if not hasattr(request.user, "store"):
+        return Response(
+            {"error": "Você não tem uma loja."}, status=status.HTTP_400_BAD_REQUEST
         )
+
+    products = Product.objects.filter(store=request.user.store).order_by("id")
+    columns = [
+        ("id", "id"),
+        ("name", "name"),
+        ("slug", "slug"),
+        ("category", "category__name"),
+        ("price", "price"),
+        ("stock_quantity", "stock_quantity"),
+        ("in_stock", "in_stock"),
+        ("featured", "featured"),
+        ("created_at", "created_at"),
+        ("updated_at", "updated_at"),
+    ]
+    return export_response(
+        request, f"{request.user.store.slug}-produtos", columns, products
+    )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from apps.reviews.ratings import recompute_ratings
+
+
+class Command(BaseCommand):
+    """
+    Reconstrói as classificações dos produtos a partir das avaliações.
+
+    Use para reparar os valores após escritas que não passam pelos signals
+    (ex: update() em massa, importações, SQL manual).
+
+    Exemplos:
+        python manage.py recompute_ratings
+        python manage.py recompute_ratings --product 12 --product 15
+    """
+
+    help = "Reconstrói as classificações (média, soma e total) dos produtos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--product",
+            type=int,
+            action="append",
+            dest="product_ids",
+            help="ID de um produto a recalcular (pode ser repetido).",
+        )
+
+    def handle(self, *args, **options):
+        total = recompute_ratings(options["product_ids"])
+        self.stdout.write(self.style.SUCCESS(f"{total} classificações recalculadas."))
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:42
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_sum(apps, schema_editor):
+    ProductRating = apps.get_model("reviews", "ProductRating")
+    Review = apps.get_model("reviews", "Review")
+    sums = (
+        Review.objects.filter(product_id=OuterRef("product_id"))
+        .order_by()
+        .values("product_id")
+        .annotate(total=Sum("rating"))
+        .values("total")
+    )
+    ProductRating.objects.update(
+        rating_sum=Coalesce(Subquery(sums), 0, output_field=models.IntegerField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0003_alter_productrating_options_alter_review_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productrating",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_sum, migrations.RunPython.noop),
+    ]
@@ -56,6 +56,8 @@ class ProductRating(models.Model):
         default=0.0, validators=[MinValueValidator(0.0), MaxValueValidator(5.0)]
     )
     total_reviews = models.PositiveIntegerField(default=0)
+    # Soma das notas; mantida junto com total_reviews (ver apps/reviews/ratings.py)
+    rating_sum = models.PositiveIntegerField(default=0)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
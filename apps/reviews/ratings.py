@@ -0,0 +1,130 @@
+"""
+Manutenção da classificação agregada dos produtos (ProductRating).
+
+Cada escrita de avaliação aplica apenas a diferença (soma e quantidade)
+com um UPDATE atômico usando F(), em tempo constante independente do
+número de avaliações do produto. recompute_ratings() reconstrói os
+valores a partir das avaliações, para reparo.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.lookups import GreaterThan
+
+from apps.core.response_cache import bump_generations
+from .models import ProductRating, Review
+
+
+def _average(rating_sum, total_reviews):
+    """
+    Expressão da média (0.0 quando não há avaliações).
+    """
+    return Case(
+        When(
+            GreaterThan(total_reviews, 0),
+            then=Cast(rating_sum, FloatField()) / total_reviews,
+        ),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def apply_rating_delta(product_id, rating_delta, count_delta):
+    """
+    Aplica uma variação à classificação de um produto num único UPDATE.
+
+    As expressões do UPDATE leem os valores atuais da linha, de modo que
+    escritas concorrentes não se sobrescrevem.
+
+    Args:
+        product_id: ID do produto
+        rating_delta: variação da soma das notas
+        count_delta: variação da quantidade de avaliações (-1, 0 ou 1)
+    """
+    rating_sum = F("rating_sum") + rating_delta
+    total_reviews = F("total_reviews") + count_delta
+    updated = ProductRating.objects.filter(product_id=product_id).update(
+        rating_sum=rating_sum,
+        total_reviews=total_reviews,
+        average_rating=_average(rating_sum, total_reviews),
+    )
+    if updated or count_delta <= 0:
+        return
+
+    # Primeira avaliação do produto
+    try:
+        with transaction.atomic():
+            ProductRating.objects.create(
+                product_id=product_id,
+                rating_sum=rating_delta,
+                total_reviews=count_delta,
+                average_rating=rating_delta / count_delta,
+            )
+    except IntegrityError:
+        # Criada por outra requisição nesse intervalo
+        apply_rating_delta(product_id, rating_delta, count_delta)
+
+
+def recompute_ratings(product_ids=None):
+    """
+    Reconstrói as classificações a partir das avaliações, em lote.
+
+    Cria as classificações em falta e recalcula soma, quantidade e média
+    com dois UPDATEs baseados em subqueries.
+
+    Args:
+        product_ids: IDs dos produtos a recalcular (todos se None)
+
+    Returns:
+        int: número de classificações recalculadas
+    """
+    reviews = Review.objects.all()
+    ratings = ProductRating.objects.all()
+    if product_ids is not None:
+        reviews = reviews.filter(product_id__in=product_ids)
+        ratings = ratings.filter(product_id__in=product_ids)
+
+    with transaction.atomic():
+        missing = (
+            reviews.exclude(product__rating__isnull=False)
+            .values_list("product_id", flat=True)
+            .distinct()
+        )
+        ProductRating.objects.bulk_create(
+            [ProductRating(product_id=product_id) for product_id in missing],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+        stats = (
+            Review.objects.filter(product_id=OuterRef("product_id"))
+            .order_by()
+            .values("product_id")
+        )
+        total = ratings.update(
+            rating_sum=Coalesce(
+                Subquery(stats.annotate(value=Sum("rating")).values("value")),
+                0,
+                output_field=IntegerField(),
+            ),
+            total_reviews=Coalesce(
+                Subquery(stats.annotate(value=Count("id")).values("value")),
+                0,
+                output_field=IntegerField(),
+            ),
+        )
+        ratings.update(average_rating=_average(F("rating_sum"), F("total_reviews")))
+    bump_generations("rating")
+    return total
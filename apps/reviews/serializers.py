@@ -1,15 +1,18 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from apps.core.serializers import EagerLoadingMixin
 from .models import ProductRating, Review
 
 User = get_user_model()
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer para avaliações de produtos.
     """
 
+    select_related_fields = ("user", "product")
+
     user = serializers.SerializerMethodField(read_only=True)
     product_name = serializers.CharField(source="product.name", read_only=True)
     rating_display = serializers.CharField(source="get_rating_display", read_only=True)
@@ -41,7 +44,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         }
 
 
-class ProductRatingSerializer(serializers.ModelSerializer):
+class ProductRatingSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer para classificação média de produtos.
     """
@@ -1,49 +1,66 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
-from django.db.models import Avg, Count
-from .models import ProductRating, Review
+from .models import Review
+from .tasks import update_product_rating
 
 
-def update_product_rating(product):
+@receiver(post_init, sender=Review)
+def remember_review_rating(sender, instance, **kwargs):
     """
-    Função auxiliar para atualizar a classificação de um produto.
-    Evita duplicação de código e melhora a manutenção.
+    Guarda a nota e o produto carregados, para calcular a diferença ao salvar.
 
     Args:
-        product: Instância do produto a ser atualizado
+        sender: Modelo que enviou o sinal (Review)
+        instance: Instância do modelo inicializada
     """
-    # Usar aggregate para obter ambos os valores em uma única query
-    stats = product.reviews.aggregate(avg_rating=Avg("rating"), total=Count("id"))
-
-    avg_rating = stats["avg_rating"] or 0.0
-    total_reviews = stats["total"]
-
-    # Usar update_or_create para evitar race conditions
-    ProductRating.objects.update_or_create(
-        product=product,
-        defaults={"average_rating": avg_rating, "total_reviews": total_reviews},
-    )
+    # Lê do __dict__ para não disparar queries em campos adiados (only/defer)
+    instance._loaded_rating = instance.__dict__.get("rating")
+    instance._loaded_product_id = instance.__dict__.get("product_id")
 
 
 @receiver(post_save, sender=Review)
-def update_product_rating_on_save(sender, instance, **kwargs):
+def update_product_rating_on_save(sender, instance, created, **kwargs):
     """
-    Atualiza a classificação média de um produto quando uma avaliação é salva.
+    Atualiza a classificação do produto quando uma avaliação é salva.
+    Aplica apenas a diferença entre a nota anterior e a nova.
 
     Args:
         sender: Modelo que enviou o sinal (Review)
         instance: Instância do modelo que foi salva
+        created: Indica se a avaliação acabou de ser criada
     """
-    update_product_rating(instance.product)
+    if created:
+        update_product_rating.delay(instance.product_id, instance.rating, 1)
+    elif instance._loaded_rating is None:
+        # Nota não carregada (ex: save após only()); não há diferença conhecida
+        return
+    elif instance._loaded_product_id != instance.product_id:
+        update_product_rating.delay(
+            instance._loaded_product_id, -instance._loaded_rating, -1
+        )
+        update_product_rating.delay(instance.product_id, instance.rating, 1)
+    elif instance._loaded_rating != instance.rating:
+        update_product_rating.delay(
+            instance.product_id, instance.rating - instance._loaded_rating, 0
+        )
+
+    instance._loaded_rating = instance.rating
+    instance._loaded_product_id = instance.product_id
 
 
 @receiver(post_delete, sender=Review)
 def update_product_rating_on_delete(sender, instance, **kwargs):
     """
-    Atualiza a classificação média de um produto quando uma avaliação é excluída.
+    Atualiza a classificação do produto quando uma avaliação é excluída.
 
     Args:
         sender: Modelo que enviou o sinal (Review)
         instance: Instância do modelo que foi excluída
     """
-    update_product_rating(instance.product)
+    # Usa os valores gravados no banco, não alterações feitas em memória
+    rating = instance._loaded_rating
+    if rating is None:
+        rating = instance.rating
+    update_product_rating.delay(
+        instance._loaded_product_id or instance.product_id, -rating, -1
+    )
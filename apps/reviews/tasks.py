@@ -0,0 +1,19 @@
+from django.db import transaction
+
+from apps.core.response_cache import bump_generations
+from apps.core.tasks import task
+
+from .ratings import apply_rating_delta
+
+
+@task
+def update_product_rating(product_id, rating_delta, count_delta):
+    """
+    Aplica à classificação do produto a variação de uma avaliação.
+
+    A tarefa e o UPDATE são confirmados na mesma transação, então cada
+    variação é aplicada uma única vez mesmo com novas tentativas.
+    """
+    apply_rating_delta(product_id, rating_delta, count_delta)
+    # Filtro e faceta de classificação do catálogo (apps/products/facets.py)
+    transaction.on_commit(lambda: bump_generations("rating"))
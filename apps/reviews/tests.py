@@ -1,4 +1,7 @@
-from django.test import TestCase
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APITestCase
@@ -7,6 +10,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from .models import Review, ProductRating
 from apps.products.models import Product, Category
 from apps.accounts.models import Store
+from apps.core.tasks import run_worker
 from apps.orders.models import Order, OrderItem
 
 User = get_user_model()
@@ -326,3 +330,107 @@ class ReviewAPITest(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         self.assertIn("error", response.data)
+
+
+class ProductRatingMaintenanceTest(TestCase):
+    """Testes para a manutenção incremental de ProductRating"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.seller = User.objects.create_user(
+            username="seller",
+            email="seller@example.com",
+            password="sellerpass123",
+            user_type="seller",
+        )
+        self.store = Store.objects.create(name="Test Store", owner=self.seller)
+        self.product = Product.objects.create(
+            name="Test Product", price=10.99, store=self.store
+        )
+        self.users = User.objects.bulk_create(
+            User(username=f"user{i}", email=f"user{i}@example.com") for i in range(50)
+        )
+
+    def assertRating(self, average, total, rating_sum):
+        rating = ProductRating.objects.get(product=self.product)
+        self.assertAlmostEqual(rating.average_rating, average)
+        self.assertEqual(rating.total_reviews, total)
+        self.assertEqual(rating.rating_sum, rating_sum)
+
+    def test_create_update_delete(self):
+        """Testa a aplicação das diferenças ao criar, alterar e excluir"""
+        first = Review.objects.create(
+            product=self.product, user=self.users[0], rating=5
+        )
+        self.assertRating(5.0, 1, 5)
+
+        second = Review.objects.create(
+            product=self.product, user=self.users[1], rating=2
+        )
+        self.assertRating(3.5, 2, 7)
+
+        second.rating = 4
+        second.save()
+        self.assertRating(4.5, 2, 9)
+
+        # Salvar sem alterar a nota não muda a classificação
+        second.comment = "Bom"
+        second.save()
+        self.assertRating(4.5, 2, 9)
+
+        first.delete()
+        self.assertRating(4.0, 1, 4)
+
+        second.delete()
+        self.assertRating(0.0, 0, 0)
+
+    def test_delete_uses_stored_rating(self):
+        """Testa que a exclusão usa a nota gravada, não a alterada em memória"""
+        review = Review.objects.create(
+            product=self.product, user=self.users[0], rating=5
+        )
+        review.rating = 1
+        review.delete()
+        self.assertRating(0.0, 0, 0)
+
+    def test_write_queries_do_not_grow(self):
+        """Testa que uma nova avaliação custa o mesmo com 1 ou 49 avaliações"""
+        Review.objects.create(product=self.product, user=self.users[0], rating=3)
+        with self.assertNumQueries(2):
+            Review.objects.create(product=self.product, user=self.users[1], rating=3)
+
+        for user in self.users[2:-1]:
+            Review.objects.create(product=self.product, user=user, rating=3)
+        with self.assertNumQueries(2):
+            Review.objects.create(product=self.product, user=self.users[-1], rating=3)
+        self.assertRating(3.0, 50, 150)
+
+    @override_settings(TASK_QUEUE_EAGER=False)
+    def test_rating_updated_by_task_queue(self):
+        """Testa a atualização da classificação fora da requisição"""
+        review = Review.objects.create(
+            product=self.product, user=self.users[0], rating=5
+        )
+        review.rating = 3
+        review.save()
+        self.assertFalse(ProductRating.objects.filter(product=self.product).exists())
+
+        self.assertEqual(run_worker(burst=True), 2)
+        self.assertRating(3.0, 1, 3)
+
+    def test_recompute_ratings_command(self):
+        """Testa a reconstrução das classificações pelo comando"""
+        for user, rating in zip(self.users, (5, 4, 3)):
+            Review.objects.create(product=self.product, user=user, rating=rating)
+        # Escritas que não passam pelos signals
+        Review.objects.filter(rating=3).update(rating=1)
+        other = Product.objects.create(name="Other", price=1, store=self.store)
+        Review.objects.bulk_create(
+            [Review(product=other, user=self.users[0], rating=2)]
+        )
+
+        out = StringIO()
+        call_command("recompute_ratings", stdout=out)
+        self.assertIn("2 classificações recalculadas", out.getvalue())
+        self.assertRating(10 / 3, 3, 10)
+        self.assertEqual(ProductRating.objects.get(product=other).average_rating, 2.0)
@@ -199,8 +199,9 @@ def get_product_reviews(request, product_id):
             {"error": "Produto não encontrado."}, status=status.HTTP_404_NOT_FOUND
         )
 
-    # Usar select_related para otimizar queries
-    reviews = Review.objects.filter(product=product).select_related("user")
+    reviews = ReviewSerializer.setup_eager_loading(
+        Review.objects.filter(product=product)
+    )
     serializer = ReviewSerializer(reviews, many=True)
 
     # Obter classificação média
@@ -225,8 +226,9 @@ def get_user_reviews(request):
     Returns:
         Response: Lista de avaliações do usuário
     """
-    # Usar select_related para otimizar queries
-    reviews = Review.objects.filter(user=request.user).select_related("product")
+    reviews = ReviewSerializer.setup_eager_loading(
+        Review.objects.filter(user=request.user)
+    )
     serializer = ReviewSerializer(reviews, many=True)
     return Response(serializer.data)
 
@@ -260,8 +262,8 @@ def get_store_product_reviews(request):
 
     # Obter avaliações dos produtos da loja com otimização
     store_products = request.user.store.products.all()
-    reviews = Review.objects.filter(product__in=store_products).select_related(
-        "product", "user"
+    reviews = ReviewSerializer.setup_eager_loading(
+        Review.objects.filter(product__in=store_products)
     )
 
     serializer = ReviewSerializer(reviews, many=True)
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("wishlist", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="wishlist",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="wishlist",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="wishlist",
+            index=models.Index(
+                fields=["user", "-created_at"], name="wishlist_wi_user_id_e27fed_idx"
+            ),
+        ),
+    ]
@@ -8,8 +8,12 @@ class Wishlist(models.Model):
     Modelo para representar itens na lista de desejos de um usuário.
     """
 
+    # O índice da FK é o composto (user, -created_at) do Meta
     user = models.ForeignKey(
-        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="wishlist"
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="wishlist",
+        db_index=False,
     )
     product = models.ForeignKey(
         Product, on_delete=models.CASCADE, related_name="wishlist_items"
@@ -19,6 +23,9 @@ class Wishlist(models.Model):
     class Meta:
         unique_together = ["user", "product"]
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at"]),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.product.name} na lista de desejos"
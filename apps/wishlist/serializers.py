@@ -1,16 +1,21 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from apps.core.serializers import EagerLoadingMixin, nested_select_related
 from .models import Wishlist
 from apps.products.serializers import ProductListSerializer
 
 User = get_user_model()
 
 
-class WishlistSerializer(serializers.ModelSerializer):
+class WishlistSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializer para itens da lista de desejos.
     """
 
+    select_related_fields = ("user",) + nested_select_related(
+        "product", ProductListSerializer
+    )
+
     user = serializers.StringRelatedField(
         read_only=True, help_text="Usuário dono da lista de desejos"
     )
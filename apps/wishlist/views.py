@@ -65,7 +65,9 @@ def get_user_wishlist(request):
     Returns:
         Response: Lista de itens na lista de desejos do usuário
     """
-    wishlist_items = Wishlist.objects.filter(user=request.user)
+    wishlist_items = WishlistSerializer.setup_eager_loading(
+        Wishlist.objects.filter(user=request.user)
+    )
     serializer = WishlistSerializer(wishlist_items, many=True)
     return Response(serializer.data)
 
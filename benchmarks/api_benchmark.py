@@ -0,0 +1,476 @@
+"""
+Benchmark da API com os cenários de tests/test_api.py.
+
+Cada usuário virtual registra um comprador e repete a jornada navegação ->
+carrinho anônimo -> mescla -> checkout -> avaliação (benchmarks/scenarios.py).
+O relatório mostra, por endpoint, p50/p95/p99 da latência, vazão e número
+de queries, e pode ser salvo em JSON para comparar execuções.
+
+Modos:
+- inprocess: cliente de testes do Django num banco de teste descartável,
+  com a contagem exata de queries de cada requisição
+- http: usuários virtuais concorrentes contra um servidor em execução; as
+  queries são lidas de /metrics quando o servidor tem METRICS_ENABLED
+- compare: compara dois resultados e falha (status 1) em regressões
+
+Execute da RAIZ do projeto:
+    python -m benchmarks.api_benchmark inprocess --iterations 20 --output base.json
+    python -m benchmarks.api_benchmark http --users 16 --duration 60 --output http.json
+    python -m benchmarks.api_benchmark compare base.json novo.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from statistics import mean
+
+from benchmarks.scenarios import ScenarioError, setup_marketplace, virtual_user
+from benchmarks.utils import percentile, setup_django, temporary_database
+
+setup_django()
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.test.utils import setup_test_environment
+from django.urls import Resolver404, resolve
+
+# Variação mínima (ms) do p95 considerada regressão, abaixo disso é ruído
+MIN_LATENCY_DELTA_MS = 1.0
+
+# Aumento tolerado na média de queries (ex: variação de acertos de cache)
+QUERY_TOLERANCE = 0.5
+
+
+def endpoint_name(method, path):
+    """
+    Agrupa as requisições por rota (ex: "GET product_detail"), como as
+    métricas do MetricsMiddleware.
+    """
+    try:
+        match = resolve(path.split("?", 1)[0])
+        view = match.view_name or match.route
+    except Resolver404:
+        view = "<unresolved>"
+    return f"{method} {view}"
+
+
+class Recorder:
+    """
+    Amostras (latência, status, queries) por endpoint, seguro entre threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)  # endpoint -> [(ms, ok, queries)]
+        self.enabled = True
+
+    def record(self, endpoint, elapsed_ms, ok, queries=None):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.samples[endpoint].append((elapsed_ms, ok, queries))
+
+    @contextmanager
+    def paused(self):
+        self.enabled = False
+        try:
+            yield
+        finally:
+            self.enabled = True
+
+
+class BaseBenchmarkClient:
+    """
+    Cliente usado pelos cenários: mede cada requisição e valida o status.
+    """
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def request(self, method, path, data=None, token=None, expected=(200, 201, 204)):
+        status, body, elapsed_ms, queries = self._send(method, path, data, token)
+        ok = status in expected
+        self.recorder.record(endpoint_name(method, path), elapsed_ms, ok, queries)
+        if not ok:
+            raise ScenarioError(method, path, status, body.decode(errors="replace"))
+        return json.loads(body) if body else None
+
+    def _send(self, method, path, data, token):
+        """
+        Returns:
+            tuple: (status, corpo em bytes, latência em ms, queries ou None)
+        """
+        raise NotImplementedError
+
+
+class InProcessClient(BaseBenchmarkClient):
+    """
+    Requisições pelo cliente de testes do Django, contando as queries.
+    """
+
+    def __init__(self, recorder):
+        super().__init__(recorder)
+        self.client = Client()
+
+    def _send(self, method, path, data, token):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+        send = getattr(self.client, method.lower())
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            if method == "GET":
+                response = send(path, **headers)
+            else:
+                response = send(
+                    path,
+                    data=json.dumps(data or {}),
+                    content_type="application/json",
+                    **headers,
+                )
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        return response.status_code, response.content, elapsed_ms, len(queries)
+
+
+class HTTPClient(BaseBenchmarkClient):
+    """
+    Requisições HTTP para um servidor em execução.
+    """
+
+    def __init__(self, recorder, base_url, timeout=30):
+        super().__init__(recorder)
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _send(self, method, path, data, token):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        body = json.dumps(data).encode() if data is not None else None
+        if body is None and method != "GET":
+            body = b"{}"
+        request = urllib.request.Request(
+            self.base_url + path, data=body, headers=headers, method=method
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                status, content = response.status, response.read()
+        except urllib.error.HTTPError as error:
+            status, content = error.code, error.read()
+        except OSError as error:
+            status, content = 0, str(error).encode()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return status, content, elapsed_ms, None
+
+
+QUERY_METRIC_RE = re.compile(
+    r'^db_queries_per_request_(sum|count)\{view="([^"]*)",method="([^"]*)"\} (\S+)$'
+)
+
+
+def scrape_query_totals(base_url, token):
+    """
+    Lê de /metrics o total de queries e de requisições por endpoint.
+
+    Args:
+        token: METRICS_TOKEN do servidor
+
+    Returns:
+        dict: {endpoint: [queries, requisições]} (vazio sem métricas)
+    """
+    request = urllib.request.Request(
+        base_url.rstrip("/") + "/metrics",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            text = response.read().decode()
+    except OSError:
+        return {}
+    totals = defaultdict(lambda: [0.0, 0.0])
+    for line in text.splitlines():
+        match = QUERY_METRIC_RE.match(line)
+        if match:
+            kind, view, method, value = match.groups()
+            totals[f"{method} {view}"][kind == "count"] = float(value)
+    return totals
+
+
+def summarize(recorder, elapsed, journeys, failed, query_totals=None):
+    """
+    Calcula as estatísticas por endpoint e do total.
+
+    Args:
+        query_totals: {endpoint: [queries, requisições]} do modo http, usado
+            quando as amostras não têm a contagem de queries
+    """
+    endpoints = {}
+    all_latencies = []
+    for endpoint, samples in sorted(recorder.samples.items()):
+        latencies = sorted(sample[0] for sample in samples)
+        all_latencies.extend(latencies)
+        queries = [sample[2] for sample in samples if sample[2] is not None]
+        stats = {
+            "count": len(samples),
+            "errors": sum(1 for sample in samples if not sample[1]),
+            "mean_ms": round(mean(latencies), 3),
+            "p50_ms": round(percentile(latencies, 0.50), 3),
+            "p95_ms": round(percentile(latencies, 0.95), 3),
+            "p99_ms": round(percentile(latencies, 0.99), 3),
+            "max_ms": round(latencies[-1], 3),
+            "throughput_rps": round(len(samples) / elapsed, 2),
+            "queries_mean": round(mean(queries), 2) if queries else None,
+            "queries_max": max(queries) if queries else None,
+        }
+        if not queries and query_totals and query_totals.get(endpoint, [0, 0])[1]:
+            total, count = query_totals[endpoint]
+            stats["queries_mean"] = round(total / count, 2)
+        endpoints[endpoint] = stats
+
+    all_latencies.sort()
+    total = {
+        "requests": len(all_latencies),
+        "errors": sum(stats["errors"] for stats in endpoints.values()),
+        "journeys": journeys,
+        "failed_journeys": failed,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(all_latencies) / elapsed, 2),
+        "journeys_per_s": round(journeys / elapsed, 2),
+    }
+    if all_latencies:
+        total["p50_ms"] = round(percentile(all_latencies, 0.50), 3)
+        total["p95_ms"] = round(percentile(all_latencies, 0.95), 3)
+        total["p99_ms"] = round(percentile(all_latencies, 0.99), 3)
+    return {"total": total, "endpoints": endpoints}
+
+
+def print_summary(result):
+    print(
+        f"\n{'endpoint':<36} {'n':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9}"
+        f" {'p99 ms':>9} {'req/s':>8} {'queries':>8}"
+    )
+    for endpoint, stats in result["endpoints"].items():
+        queries = stats["queries_mean"]
+        print(
+            f"{endpoint:<36} {stats['count']:>6} {stats['errors']:>4}"
+            f" {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f}"
+            f" {stats['p99_ms']:>9.2f} {stats['throughput_rps']:>8.1f}"
+            f" {'-' if queries is None else f'{queries:.1f}':>8}"
+        )
+    total = result["total"]
+    print(
+        f"\n{total['requests']} requisições ({total['errors']} erros),"
+        f" {total['journeys']} jornadas ({total['failed_journeys']} com erro)"
+        f" em {total['elapsed_s']:.1f} s: {total['throughput_rps']:.1f} req/s,"
+        f" {total['journeys_per_s']:.2f} jornadas/s"
+    )
+
+
+def run_users(make_client, context, numbers, iterations, duration=0, parallel=True):
+    """
+    Executa os usuários virtuais, em paralelo ou um de cada vez.
+
+    Returns:
+        tuple: (segundos, jornadas concluídas, jornadas com erro)
+    """
+    deadline = time.monotonic() + duration if duration else None
+
+    def should_stop():
+        return deadline is not None and time.monotonic() >= deadline
+
+    def run(number):
+        try:
+            return virtual_user(make_client(), context, number, iterations, should_stop)
+        except ScenarioError as error:
+            print(f"usuário {number}: {error}", file=sys.stderr)
+            return 0, 1
+
+    start = time.perf_counter()
+    if parallel:
+        with ThreadPoolExecutor(max_workers=len(numbers)) as executor:
+            results = list(executor.map(run, numbers))
+    else:
+        results = [run(number) for number in numbers]
+    elapsed = time.perf_counter() - start
+    return (
+        elapsed,
+        sum(result[0] for result in results),
+        sum(result[1] for result in results),
+    )
+
+
+def run_inprocess(args):
+    """
+    Jornadas pelo cliente de testes num banco descartável.
+
+    O cliente de testes compartilha a conexão com o banco, então os
+    usuários virtuais são executados um de cada vez.
+    """
+    setup_test_environment()
+    recorder = Recorder()
+
+    def make_client():
+        return InProcessClient(recorder)
+
+    with temporary_database(), override_settings(TESTING=True):
+        with recorder.paused():
+            context = setup_marketplace(make_client(), int(time.time()), args.products)
+            if args.warmup:
+                run_users(
+                    make_client, context, [args.users], args.warmup, parallel=False
+                )
+        elapsed, journeys, failed = run_users(
+            make_client, context, range(args.users), args.iterations, parallel=False
+        )
+        return summarize(recorder, elapsed, journeys, failed)
+
+
+def run_http(args):
+    """
+    Usuários virtuais concorrentes contra um servidor em execução.
+
+    O servidor deve ter TESTING=True para o pagamento simulado sempre
+    aprovar os pedidos.
+    """
+    recorder = Recorder()
+    run_id = int(time.time())
+    with recorder.paused():
+        context = setup_marketplace(
+            HTTPClient(recorder, args.base_url), run_id, args.products
+        )
+    before = scrape_query_totals(args.base_url, args.metrics_token)
+    iterations = None if args.duration else args.iterations
+    elapsed, journeys, failed = run_users(
+        lambda: HTTPClient(recorder, args.base_url),
+        context,
+        range(args.users),
+        iterations,
+        args.duration,
+    )
+    after = scrape_query_totals(args.base_url, args.metrics_token)
+    query_totals = {
+        endpoint: [
+            value - before.get(endpoint, [0, 0])[i] for i, value in enumerate(totals)
+        ]
+        for endpoint, totals in after.items()
+    }
+    return summarize(recorder, elapsed, journeys, failed, query_totals)
+
+
+def compare(baseline, current, threshold):
+    """
+    Compara dois resultados por endpoint.
+
+    Uma regressão é um p95 maior que o da base em mais de `threshold`
+    (fração) e de MIN_LATENCY_DELTA_MS, mais queries por requisição (além
+    de QUERY_TOLERANCE) ou novos erros.
+
+    Returns:
+        list: descrições das regressões encontradas
+    """
+    regressions = []
+    print(
+        f"\n{'endpoint':<36} {'p95 base':>9} {'p95 novo':>9} {'var':>7}"
+        f" {'q base':>7} {'q novo':>7}"
+    )
+    for endpoint, new in current["endpoints"].items():
+        old = baseline["endpoints"].get(endpoint)
+        if old is None:
+            print(f"{endpoint:<36} (novo endpoint)")
+            continue
+        change = (new["p95_ms"] - old["p95_ms"]) / old["p95_ms"] if old["p95_ms"] else 0
+        print(
+            f"{endpoint:<36} {old['p95_ms']:>9.2f} {new['p95_ms']:>9.2f}"
+            f" {change:>+7.0%} {old['queries_mean'] or '-':>7} {new['queries_mean'] or '-':>7}"
+        )
+        if change > threshold and new["p95_ms"] - old["p95_ms"] > MIN_LATENCY_DELTA_MS:
+            regressions.append(f"{endpoint}: p95 {change:+.0%}")
+        if (
+            old["queries_mean"] is not None
+            and new["queries_mean"] is not None
+            and new["queries_mean"] > old["queries_mean"] + QUERY_TOLERANCE
+        ):
+            regressions.append(
+                f"{endpoint}: queries {old['queries_mean']} -> {new['queries_mean']}"
+            )
+        if new["errors"] > old["errors"]:
+            regressions.append(f"{endpoint}: erros {old['errors']} -> {new['errors']}")
+    return regressions
+
+
+def metadata(args):
+    return {
+        "mode": args.mode,
+        "users": args.users,
+        "iterations": args.iterations,
+        "duration": getattr(args, "duration", 0),
+        "products": args.products,
+        "python": platform.python_version(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    def add_run_arguments(subparser, users):
+        subparser.add_argument("--users", type=int, default=users)
+        subparser.add_argument("--iterations", type=int, default=10)
+        subparser.add_argument("--products", type=int, default=10)
+        subparser.add_argument("--output", help="arquivo JSON com os resultados")
+
+    inprocess = modes.add_parser("inprocess", help="cliente de testes do Django")
+    add_run_arguments(inprocess, users=1)
+    inprocess.add_argument("--warmup", type=int, default=1)
+
+    http = modes.add_parser("http", help="carga concorrente contra um servidor")
+    add_run_arguments(http, users=8)
+    http.add_argument("--base-url", default="http://localhost:8000")
+    http.add_argument(
+        "--metrics-token",
+        default=os.getenv("METRICS_TOKEN", ""),
+        help="METRICS_TOKEN do servidor (padrão: variável de ambiente)",
+    )
+    http.add_argument(
+        "--duration", type=float, default=0, help="segundos (ignora --iterations)"
+    )
+
+    compare_parser = modes.add_parser("compare", help="compara dois resultados")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2)
+
+    args = parser.parse_args()
+
+    if args.mode == "compare":
+        with open(args.baseline) as baseline, open(args.current) as current:
+            regressions = compare(
+                json.load(baseline), json.load(current), args.threshold
+            )
+        for regression in regressions:
+            print(f"REGRESSÃO {regression}")
+        sys.exit(1 if regressions else 0)
+
+    result = run_inprocess(args) if args.mode == "inprocess" else run_http(args)
+    result = {"meta": metadata(args), **result}
+    print_summary(result)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(result, output, indent=2)
+        print(f"Resultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
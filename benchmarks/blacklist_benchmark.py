@@ -0,0 +1,160 @@
+"""
+Benchmark do refresh de tokens com a blacklist crescendo.
+
+Cria um banco de teste descartável com N tokens na blacklist (metade já
+vencida, como após meses de refresh e logout sem limpeza) e mede:
+- a consulta à blacklist de tokens recém-emitidos (is_blacklisted) e o
+  refresh completo (POST /api/auth/token/refresh/), sem filtro
+  (TOKEN_BLACKLIST_FILTER="none": sempre o banco) e com o filtro de Bloom em
+  memória, com as queries por requisição
+- a montagem do filtro do dia a partir do banco (primeira consulta)
+- a remoção dos tokens vencidos em lotes (prune_expired_tokens)
+
+Execute da RAIZ do projeto:
+    python -m benchmarks.blacklist_benchmark
+    python -m benchmarks.blacklist_benchmark --tokens 10000 100000 --requests 300
+"""
+
+import argparse
+import random
+import time
+import uuid
+from datetime import timedelta
+
+from benchmarks.utils import report, setup_django, temporary_database
+
+setup_django()
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts import blacklist
+from apps.accounts.models import CustomUser
+
+BATCH_SIZE = 5000
+
+
+def populate(total):
+    """
+    Cria o usuário e N tokens na blacklist, com a expiração distribuída nos
+    30 dias passados e nos 7 próximos.
+    """
+    user = CustomUser.objects.create(username="bench", email="bench@example.com")
+    now = timezone.now()
+    for start in range(0, total, BATCH_SIZE):
+        count = min(BATCH_SIZE, total - start)
+        tokens = OutstandingToken.objects.bulk_create(
+            OutstandingToken(
+                user=user,
+                jti=uuid.uuid4().hex,
+                token="",
+                created_at=now,
+                expires_at=now
+                + timedelta(
+                    seconds=(
+                        random.randint(-30, 7) * 24 * 60 * 60
+                        if (start + i) % 2
+                        else random.randint(1, 7 * 24 * 60 * 60)
+                    )
+                ),
+            )
+            for i in range(count)
+        )
+        BlacklistedToken.objects.bulk_create(
+            BlacklistedToken(token=token) for token in tokens
+        )
+    return user
+
+
+def measure(user, requests):
+    """
+    Retorna as latências (ms) e as queries da consulta e do refresh.
+    """
+    tokens = [RefreshToken.for_user(user) for _ in range(requests * 2)]
+    checks, refreshes = tokens[:requests], tokens[requests:]
+
+    start = time.perf_counter()
+    blacklist.is_blacklisted(checks[0]["jti"], checks[0]["exp"])
+    first = (time.perf_counter() - start) * 1000
+
+    check_timings = []
+    with CaptureQueriesContext(connection) as check_queries:
+        for token in checks[1:]:
+            start = time.perf_counter()
+            blacklist.is_blacklisted(token["jti"], token["exp"])
+            check_timings.append((time.perf_counter() - start) * 1000)
+
+    client = Client()
+    url = reverse("token_refresh")
+    refresh_timings = []
+    with CaptureQueriesContext(connection) as refresh_queries:
+        for token in refreshes:
+            start = time.perf_counter()
+            response = client.post(
+                url, {"refresh": str(token)}, content_type="application/json"
+            )
+            refresh_timings.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.content
+    return (
+        first,
+        check_timings,
+        len(check_queries) / len(checks[1:]),
+        refresh_timings,
+        len(refresh_queries) / len(refreshes),
+    )
+
+
+def run(total, requests):
+    print(f"\n{total} tokens na blacklist, {requests} requisições")
+    with temporary_database():
+        user = populate(total)
+        for name in ("none", "memory"):
+            with override_settings(TOKEN_BLACKLIST_FILTER=name):
+                blacklist.reset_blacklist_filter()
+                cache.clear()
+                first, checks, check_queries, refreshes, refresh_queries = measure(
+                    user, requests
+                )
+            print(
+                f"  filtro {name:<7} primeira consulta {first:8.2f} ms"
+                f"   queries: consulta {check_queries:.2f}, refresh"
+                f" {refresh_queries:.2f}"
+            )
+            report(f"consulta ({name})", checks)
+            report(f"refresh ({name})", refreshes)
+        blacklist.reset_blacklist_filter()
+
+        expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+        count = expired.count()
+        start = time.perf_counter()
+        blacklist.prune_expired_tokens()
+        elapsed = time.perf_counter() - start
+        print(
+            f"  limpeza: {count} tokens vencidos em {elapsed:.2f} s"
+            f" ({count / elapsed:,.0f} tokens/s),"
+            f" restam {OutstandingToken.objects.count()}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, nargs="+", default=[10_000, 200_000])
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    for total in args.tokens:
+        run(total, args.requests)
+
+
+if __name__ == "__main__":
+    main()
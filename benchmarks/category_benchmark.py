@@ -0,0 +1,130 @@
+"""
+Benchmark das categorias: produtos aninhados x página de produtos e
+contagem agregada x Category.product_count.
+
+Cria um banco de teste descartável com dados sintéticos (DataSeeder) em 5
+categorias e mede, sem o cache de respostas:
+- detalhes da categoria: todos os produtos aninhados (serialização
+  anterior do CategoryDetailSerializer) x a view category_detail com uma
+  página de produtos; latência, queries e bytes da resposta
+- contagens da listagem de categorias: Count() dos produtos listados e em
+  estoque a cada requisição x a coluna product_count mantida pelos signals
+
+Execute da RAIZ do projeto:
+    python -m benchmarks.category_benchmark
+    python -m benchmarks.category_benchmark --products 1000 50000 --repeat 10
+"""
+
+import argparse
+import time
+
+from benchmarks.utils import report, setup_django, temporary_database
+
+setup_django()
+
+import orjson
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from django.urls import reverse
+
+from apps.core.seeding import DataSeeder
+from apps.products.models import Category, Product
+from apps.products.serializers import CategoryDetailSerializer, ProductListSerializer
+
+CATEGORIES = 5
+
+
+def populate(products):
+    DataSeeder(
+        categories=CATEGORIES,
+        stores=50,
+        products=products,
+        **{
+            name: 0
+            for name in DataSeeder.DEFAULTS
+            if name not in ("categories", "stores", "products")
+        },
+    ).run()
+    return Category.objects.order_by("-product_count").first()
+
+
+def nested_payload(category):
+    """
+    Resposta anterior do category_detail: a categoria com todos os produtos.
+    """
+    data = CategoryDetailSerializer(category).data
+    data["products"] = ProductListSerializer(
+        ProductListSerializer.setup_eager_loading(
+            Product.objects.filter(category=category, is_listed=True)
+        ),
+        many=True,
+    ).data
+    return orjson.dumps(data)
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            result = function()
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings, len(captured), result
+
+
+def run(products, repeat):
+    print(f"\n{products} produtos em {CATEGORIES} categorias")
+    with temporary_database():
+        category = populate(products)
+        client = Client(HTTP_ACCEPT="application/json")
+        url = reverse("category_detail", kwargs={"slug": category.slug})
+
+        def paginated():
+            cache.clear()
+            return client.get(url).content
+
+        print(f"  detalhes de '{category.name}' ({category.product_count} produtos)")
+        for label, function in (
+            ("aninhados", lambda: nested_payload(category)),
+            ("paginados", paginated),
+        ):
+            timings, queries, content = measure(function, repeat)
+            print(f"    {label:<10} {len(content) / 1024:10.1f} KB   {queries} queries")
+            report(f"    {label}", timings)
+
+        listed = Q(products__is_listed=True, products__in_stock=True)
+        print("  contagens da listagem de categorias")
+        for label, function in (
+            (
+                "Count()",
+                lambda: list(
+                    Category.objects.annotate(
+                        total=Count("products", filter=listed)
+                    ).values_list("id", "total")
+                ),
+            ),
+            (
+                "coluna",
+                lambda: list(Category.objects.values_list("id", "product_count")),
+            ),
+        ):
+            timings, _, _ = measure(function, repeat)
+            report(f"    {label}", timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, nargs="+", default=[1000, 20_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    for products in args.products:
+        run(products, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
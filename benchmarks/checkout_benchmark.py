@@ -0,0 +1,172 @@
+"""
+Benchmark do checkout com repetições simultâneas da mesma requisição.
+
+Cria um banco de teste descartável (arquivo SQLite, compartilhado pelas
+threads) com N compradores, cada um com um carrinho de dois produtos, e
+envia cada checkout R vezes ao mesmo tempo, como um cliente que repete a
+requisição após um timeout:
+- sem chave: cada repetição cria outro pedido e outra cobrança
+- Idempotency-Key: uma repetição cria o pedido e as demais devolvem o
+  mesmo pedido
+
+Cada repetição que falha (no SQLite, "database is locked" quando duas
+transações disputam a escrita) é enviada de novo até ser aceita. Mede a
+vazão (requisições e checkouts por segundo), a latência e conta os pedidos
+e pagamentos criados. O pagamento fica na fila de tarefas e não é
+executado.
+
+Execute da RAIZ do projeto:
+    python -m benchmarks.checkout_benchmark
+    python -m benchmarks.checkout_benchmark --checkouts 500 --retries 4 --threads 8
+"""
+
+import argparse
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+
+from benchmarks.utils import report, setup_django, temporary_database
+
+setup_django()
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import CustomUser, Store
+from apps.cart.models import Cart, CartItem
+from apps.orders.models import Order, Payment
+from apps.products.models import Product
+
+MAX_ATTEMPTS = 50
+
+
+def populate(checkouts):
+    seller = CustomUser.objects.create(
+        username="bench_seller", email="bench_seller@example.com", user_type="seller"
+    )
+    store = Store.objects.create(name="Loja Checkout", owner=seller)
+    products = [
+        Product.objects.create(
+            name=f"Produto {i}",
+            slug=f"produto-{i}",
+            price=1500,
+            store=store,
+            stock_quantity=10**9,
+        )
+        for i in range(2)
+    ]
+    buyers = CustomUser.objects.bulk_create(
+        CustomUser(username=f"buyer{i}", email=f"buyer{i}@example.com")
+        for i in range(checkouts)
+    )
+    carts = Cart.objects.bulk_create(
+        Cart(cart_code=f"CART{i:08d}", user=buyer) for i, buyer in enumerate(buyers)
+    )
+    CartItem.objects.bulk_create(
+        CartItem(cart=cart, product=product, quantity=1)
+        for cart in carts
+        for product in products
+    )
+    return [
+        (f"Bearer {RefreshToken.for_user(buyer).access_token}", cart.cart_code)
+        for buyer, cart in zip(buyers, carts)
+    ]
+
+
+def run_checkouts(buyers, retries, threads, use_key):
+    """
+    Envia as repetições de cada checkout juntas, distribuídas entre as
+    threads, até cada uma ser aceita. Retorna as latências (ms), os status
+    e o tempo total (s).
+    """
+    jobs = queue.Queue()
+    for number, (token, cart_code) in enumerate(buyers):
+        key = f"checkout-{number}" if use_key else None
+        for _ in range(retries):
+            jobs.put((token, cart_code, key))
+
+    url = reverse("create_order")
+    timings, statuses = [], []
+
+    def client_thread():
+        client = Client()
+        try:
+            while True:
+                try:
+                    token, cart_code, key = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                headers = {"HTTP_AUTHORIZATION": token}
+                if key:
+                    headers["HTTP_IDEMPOTENCY_KEY"] = key
+                data = {
+                    "cart_code": cart_code,
+                    "shipping_address": "Rua 1",
+                    "payment_method": "card",
+                }
+                for _ in range(MAX_ATTEMPTS):
+                    start = time.perf_counter()
+                    response = client.post(
+                        url, data, content_type="application/json", **headers
+                    )
+                    timings.append((time.perf_counter() - start) * 1000)
+                    statuses.append(response.status_code)
+                    if response.status_code == 201:
+                        break
+                    time.sleep(random.uniform(0, 0.01))
+        finally:
+            connection.close()
+
+    workers = [threading.Thread(target=client_thread) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return timings, statuses, time.perf_counter() - start
+
+
+def run(checkouts, retries, threads):
+    print(f"\n{checkouts} checkouts x {retries} repetições, {threads} threads")
+    for label, use_key in (("sem chave", False), ("Idempotency-Key", True)):
+        with temporary_database():
+            buyers = populate(checkouts)
+            timings, statuses, elapsed = run_checkouts(
+                buyers, retries, threads, use_key
+            )
+            orders = Order.objects.count()
+            print(
+                f"  {label:<16} {len(statuses) / elapsed:7.1f} req/s"
+                f"   {len(buyers) / elapsed:7.1f} checkouts/s   pedidos {orders:>5}"
+                f"   pagamentos {Payment.objects.count():>5}"
+                f"   duplicados {orders - len(buyers):>5}"
+                f"   falhas {len(statuses) - statuses.count(201):>4}"
+            )
+            report(label, timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--checkouts", type=int, default=200)
+    parser.add_argument("--retries", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    # Banco em arquivo: o banco de teste em memória não é compartilhado
+    # entre as conexões das threads
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            test_settings = connection.settings_dict.setdefault("TEST", {})
+            test_settings["NAME"] = os.path.join(directory, "checkout.sqlite3")
+        run(args.checkouts, args.retries, args.threads)
+
+
+if __name__ == "__main__":
+    main()
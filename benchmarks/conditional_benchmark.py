@@ -0,0 +1,116 @@
+"""
+Benchmark do GET condicional do catálogo: resposta completa x 304.
+
+Cria um banco de teste descartável com dados sintéticos (DataSeeder) e,
+para cada endpoint do catálogo, mede latência, queries e bytes da resposta
+200 completa e da revalidação com If-None-Match (304), simulando um
+cliente móvel que reabre as mesmas telas sem que o catálogo tenha mudado.
+
+Execute da RAIZ do projeto:
+    python -m benchmarks.conditional_benchmark
+    python -m benchmarks.conditional_benchmark --products 20000 --repeat 50
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.utils import report, setup_django, temporary_database
+
+# Um único processo: as versões do cache local valem como validadores
+os.environ.setdefault("CONDITIONAL_GET_CACHE_VALIDATORS", "true")
+setup_django()
+
+from django.core.cache import cache
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from django.urls import reverse
+
+from apps.accounts.models import Store
+from apps.core.seeding import DataSeeder
+from apps.products.models import Category, Product
+
+
+def populate(products):
+    DataSeeder(
+        categories=20,
+        stores=50,
+        products=products,
+        **{
+            name: 0
+            for name in DataSeeder.DEFAULTS
+            if name not in ("categories", "stores", "products")
+        },
+    ).run()
+    store = Store.objects.filter(products__isnull=False).first()
+    return {
+        "product_list": reverse("product_list") + "?page_size=50",
+        "product_detail": reverse(
+            "product_detail", kwargs={"slug": Product.objects.first().slug}
+        ),
+        "category_list": reverse("category_list"),
+        "category_detail": reverse(
+            "category_detail",
+            kwargs={"slug": Category.objects.filter(products__isnull=False)[0].slug},
+        ),
+        "store_products": reverse("store_products", kwargs={"slug": store.slug}),
+    }
+
+
+def measure(client, url, repeat, **headers):
+    timings = []
+    for _ in range(repeat):
+        reset_queries()
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = client.get(url, **headers)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings, len(captured), response
+
+
+def run(products, repeat):
+    urls = populate(products)
+    client = Client(HTTP_ACCEPT="application/json")
+    total_full = total_revalidated = 0
+
+    for name, url in urls.items():
+        cache.clear()
+        full, full_queries, response = measure(client, url, repeat)
+        etag = response["ETag"]
+        revalidated, queries, not_modified = measure(
+            client, url, repeat, HTTP_IF_NONE_MATCH=etag
+        )
+        assert not_modified.status_code == 304, not_modified.status_code
+
+        # Corpo + cabeçalhos, aproximadamente o que trafega na rede
+        full_bytes = len(response.serialize())
+        revalidated_bytes = len(not_modified.serialize())
+        total_full += full_bytes
+        total_revalidated += revalidated_bytes
+
+        print(f"\n{name} ({connection.vendor}, {products} produtos)")
+        report(f"200 ({full_queries} q)", full)
+        report(f"304 ({queries} q)", revalidated)
+        print(f"  bytes            200 {full_bytes:>9}   304 {revalidated_bytes:>9}")
+
+    saved = 1 - total_revalidated / total_full
+    print(
+        f"\ntelas do catálogo: {total_full} -> {total_revalidated} bytes "
+        f"por revalidação ({saved:.1%} a menos)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    with temporary_database():
+        run(args.products, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Benchmark das exportações: lista completa em memória x streaming.
+
+Cria um banco de teste descartável com uma loja com N itens de pedido e
+mede tempo, bytes e o pico de RSS (memória residente do processo, acima
+da base antes da requisição) de:
+- lista em memória: todos os pedidos serializados numa única resposta,
+  como get_store_orders fazia antes da paginação
+- export_store_orders / export_store_order_items: CSV em streaming
+
+Execute da RAIZ do projeto (Linux, lê /proc/self/statm):
+    python -m benchmarks.export_benchmark
+    python -m benchmarks.export_benchmark --lines 1000000 --skip-full
+"""
+
+import argparse
+import gc
+import os
+import threading
+import time
+
+from benchmarks.utils import setup_django, temporary_database
+
+setup_django()
+
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import CustomUser, Store
+from apps.core.renderers import FastJSONRenderer
+from apps.orders.models import Order, OrderItem
+from apps.orders.serializers import OrderSerializer
+from apps.products.models import Product
+
+BATCH_SIZE = 5000
+ITEMS_PER_ORDER = 5
+
+
+def rss():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class PeakRSS:
+    """
+    Amostra o RSS numa thread enquanto o bloco executa.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.baseline = self.peak = 0
+
+    def sample(self):
+        while not self.done.is_set():
+            self.peak = max(self.peak, rss())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        gc.collect()
+        self.baseline = self.peak = rss()
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.done.set()
+        self.thread.join()
+        self.peak = max(self.peak, rss())
+
+    @property
+    def growth_mb(self):
+        return (self.peak - self.baseline) / 1024 / 1024
+
+
+def populate(lines):
+    seller = CustomUser.objects.create(
+        username="bench_seller", email="bench_seller@example.com", user_type="seller"
+    )
+    buyer = CustomUser.objects.create(
+        username="bench_buyer", email="bench_buyer@example.com"
+    )
+    store = Store.objects.create(name="Loja Export", owner=seller)
+    products = Product.objects.bulk_create(
+        Product(name=f"Produto {i}", slug=f"produto-{i}", price=1500, store=store)
+        for i in range(1000)
+    )
+
+    total_orders = -(-lines // ITEMS_PER_ORDER)
+    for start in range(0, total_orders, BATCH_SIZE):
+        orders = Order.objects.bulk_create(
+            Order(
+                order_number=f"ORD-{i:08d}",
+                user=buyer,
+                total_amount=1500 * ITEMS_PER_ORDER,
+                shipping_address="Rua das Acácias, 123, Luanda",
+            )
+            for i in range(start, min(start + BATCH_SIZE, total_orders))
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(
+                order=order,
+                product=products[(order.id * ITEMS_PER_ORDER + i) % len(products)],
+                quantity=1,
+                price=1500,
+            )
+            for order in orders
+            for i in range(ITEMS_PER_ORDER)
+        )
+    return seller
+
+
+def full_list(seller):
+    orders = OrderSerializer.setup_eager_loading(
+        Order.objects.filter(items__product__store=seller.store)
+        .distinct()
+        .order_by("-created_at")
+    )
+    return len(FastJSONRenderer().render(OrderSerializer(orders, many=True).data))
+
+
+def export(client, name, params):
+    response = client.get(reverse(name), params)
+    assert response.status_code == 200, response.status_code
+    return sum(len(chunk) for chunk in response.streaming_content)
+
+
+def measure(function):
+    with PeakRSS() as memory:
+        start = time.perf_counter()
+        size = function()
+        elapsed = time.perf_counter() - start
+    return elapsed, size, memory.growth_mb
+
+
+def run(lines, skip_full):
+    print(f"\nloja com {lines} itens de pedido")
+    seller = populate(lines)
+    token = RefreshToken.for_user(seller).access_token
+    client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    cases = [
+        ("export pedidos csv", "export_store_orders", {}),
+        ("export itens csv", "export_store_order_items", {}),
+        ("export itens ndjson", "export_store_order_items", {"output": "ndjson"}),
+    ]
+    cases = [
+        (label, lambda name=name, params=params: export(client, name, params))
+        for label, name, params in cases
+    ]
+    if not skip_full:
+        # Por último: a memória liberada nem sempre volta ao sistema
+        cases.append(("lista em memória", lambda: full_list(seller)))
+
+    for label, function in cases:
+        elapsed, size, growth = measure(function)
+        print(
+            f"  {label:<20} {elapsed:8.2f} s {size / 1024 / 1024:9.1f} MB"
+            f"   pico de RSS +{growth:7.1f} MB"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument(
+        "--skip-full",
+        action="store_true",
+        help="Não mede a lista em memória (lenta e pesada com milhões de itens).",
+    )
+    args = parser.parse_args()
+
+    setup_test_environment()
+    for lines in args.lines:
+        with temporary_database():
+            run(lines, args.skip_full)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark das facetas do catálogo: um COUNT por opção x uma query agrupada.
+
+Cria um banco de teste descartável com dados sintéticos (DataSeeder) e mede
+as contagens da barra de filtros de products_list, sem filtros e com
+filtros ativos (loja, em estoque e classificação mínima):
+- COUNT: uma query count() por opção de cada faceta (faixas de preço,
+  em estoque, destaque, lojas, categorias e classificações), cada uma com
+  os filtros das demais facetas
+- agrupada: facet_counts (apps/products/facets.py), uma única query
+
+Execute da RAIZ do projeto:
+    python -m benchmarks.facet_benchmark
+    python -m benchmarks.facet_benchmark --products 100000 --repeat 5
+"""
+
+import argparse
+import time
+
+from benchmarks.utils import report, setup_django, temporary_database
+
+setup_django()
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.accounts.models import Store
+from apps.core.seeding import DataSeeder
+from apps.products.facets import (
+    FACET_FILTERS,
+    RATING_THRESHOLDS,
+    facet_counts,
+    price_ranges,
+)
+from apps.products.filters import ProductFilter
+from apps.products.models import Category, Product
+
+
+def populate(products):
+    DataSeeder(
+        categories=20,
+        stores=50,
+        products=products,
+        buyers=200,
+        reviews=products * 2,
+        **{
+            name: 0
+            for name in DataSeeder.DEFAULTS
+            if name not in ("categories", "stores", "products", "buyers", "reviews")
+        },
+    ).run()
+
+
+def count_per_option(params):
+    """
+    Contagens com uma query por opção, como uma barra de filtros ingênua.
+    """
+    catalog = Product.objects.filter(is_listed=True)
+
+    def others(facet):
+        # Filtros das demais facetas
+        own = FACET_FILTERS[facet]
+        return ProductFilter(
+            {name: value for name, value in params.items() if name not in own},
+            queryset=catalog,
+        ).qs
+
+    options = [
+        ("price", {"price__gte": lower, **({"price__lt": upper} if upper else {})})
+        for lower, upper in price_ranges()
+    ]
+    options += [
+        (facet, {facet: value})
+        for facet in ("in_stock", "featured")
+        for value in (True, False)
+    ]
+    options += [
+        ("store", {"store_id": store_id})
+        for store_id in Store.objects.values_list("id", flat=True)
+    ]
+    options += [
+        ("category", {"category_id": category_id})
+        for category_id in Category.objects.values_list("id", flat=True)
+    ]
+    options += [
+        ("rating", {"rating__average_rating__gte": threshold})
+        for threshold in RATING_THRESHOLDS
+    ]
+    return [others(facet).filter(**condition).count() for facet, condition in options]
+
+
+def grouped(params):
+    filterset = ProductFilter(params, queryset=Product.objects.filter(is_listed=True))
+    assert filterset.is_valid(), filterset.errors
+    return facet_counts(filterset, Product.objects.filter(is_listed=True))
+
+
+def measure(function, params, repeat):
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            function(params)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings, len(captured)
+
+
+def run(products, repeat):
+    print(f"\n{products} produtos, 50 lojas, 20 categorias")
+    with temporary_database():
+        populate(products)
+        store = Store.objects.filter(products__isnull=False).first()
+        scenarios = {
+            "sem filtros": {},
+            "com filtros": {"store": store.slug, "in_stock": "true", "min_rating": 3},
+        }
+        for scenario, params in scenarios.items():
+            print(f"  {scenario}")
+            for label, function in (("COUNT", count_per_option), ("agrupada", grouped)):
+                timings, queries = measure(function, params, repeat)
+                print(f"    {label:<9} {queries} queries")
+                report(f"    {label}", timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, nargs="+", default=[20_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for products in args.products:
+        run(products, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark do JSON da API: JSONRenderer/JSONParser do DRF x orjson.
+
+Cria um banco de teste descartável com dados sintéticos (DataSeeder),
+serializa uma vez listas de produtos e pedidos e mede apenas a conversão
+para bytes (render) e de volta (parse), a parte que o renderer muda.
+
+Execute da RAIZ do projeto:
+    python -m benchmarks.json_benchmark
+    python -m benchmarks.json_benchmark --products 5000 --repeat 100
+"""
+
+import argparse
+import time
+from io import BytesIO
+
+from benchmarks.utils import report, setup_django, temporary_database
+
+setup_django()
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.parsers import FastJSONParser
+from apps.core.renderers import FastJSONRenderer, orjson
+from apps.core.seeding import DataSeeder
+from apps.orders.models import Order
+from apps.orders.serializers import OrderSerializer
+from apps.products.models import Product
+from apps.products.serializers import ProductDetailSerializer, ProductListSerializer
+
+
+def populate(products):
+    volumes = {name: 0 for name in DataSeeder.DEFAULTS}
+    volumes.update(
+        categories=20, stores=50, products=products, buyers=100, orders=products
+    )
+    DataSeeder(**volumes).run()
+
+
+def payloads(products):
+    def serialize(serializer, queryset):
+        queryset = serializer.setup_eager_loading(queryset)[:products]
+        return serializer(queryset, many=True).data
+
+    return {
+        "lista de produtos": serialize(ProductListSerializer, Product.objects.all()),
+        "detalhes de produtos": serialize(
+            ProductDetailSerializer, Product.objects.all()
+        ),
+        "pedidos com itens": serialize(OrderSerializer, Order.objects.all()),
+    }
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run(products, repeat):
+    populate(products)
+    for name, data in payloads(products).items():
+        content = JSONRenderer().render(data)
+        print(f"\n{name}: {len(data)} itens, {len(content) / 1024:.0f} KB")
+        for label, renderer, parser in (
+            ("drf", JSONRenderer(), JSONParser()),
+            ("orjson", FastJSONRenderer(), FastJSONParser()),
+        ):
+            report(f"render {label}", measure(lambda: renderer.render(data), repeat))
+            report(
+                f"parse {label}",
+                measure(lambda: parser.parse(BytesIO(content)), repeat),
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    if orjson is None:
+        parser.error("orjson não está instalado (pip install orjson)")
+    with temporary_database():
+        run(args.products, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark do filtro de visibilidade do catálogo: JOIN com a loja x
+Product.is_listed.
+
+Cria um banco de teste descartável com N produtos em 100 lojas (uma
+fração delas inativa) e mede uma página de 20 produtos ordenada por data e por preço,
+no início e no fim do catálogo, e a busca de detalhes por slug:
+- JOIN: filtro store__is_active=True (consulta anterior do catálogo), com
+  os índices anteriores (created_at, id) e (price, id) recriados
+- is_listed: coluna do produto com os índices parciais do catálogo
+
+Imprime também o plano de execução de cada consulta.
+
+Execute da RAIZ do projeto:
+    python -m benchmarks.listing_benchmark
+    python -m benchmarks.listing_benchmark --products 500000 --inactive 0.1 0.9
+"""
+
+import argparse
+import time
+
+from benchmarks.utils import report, setup_django, temporary_database
+
+setup_django()
+
+from django.db import connection, models
+
+from apps.accounts.models import CustomUser, Store
+from apps.products.models import Product
+
+BATCH_SIZE = 5000
+PAGE_SIZE = 20
+STORES = 100
+
+
+def populate(total, inactive):
+    stores = []
+    for i in range(STORES):
+        seller = CustomUser.objects.create(
+            username=f"bench_seller{i}",
+            email=f"seller{i}@example.com",
+            user_type="seller",
+        )
+        stores.append(
+            Store.objects.create(
+                name=f"Loja {i}", owner=seller, is_active=i >= STORES * inactive
+            )
+        )
+    for start in range(0, total, BATCH_SIZE):
+        Product.objects.bulk_create(
+            Product(
+                name=f"Produto {i}",
+                slug=f"produto-{i}",
+                price=(i * 7919) % 100000,
+                store=(store := stores[i % STORES]),
+                is_listed=store.is_active,
+            )
+            for i in range(start, min(start + BATCH_SIZE, total))
+        )
+    # Índices do catálogo antes do is_listed
+    with connection.schema_editor() as editor:
+        for fields in (["created_at", "id"], ["price", "id"]):
+            editor.add_index(
+                Product, models.Index(fields=fields, name=f"bench_{fields[0]}_idx")
+            )
+    return Product.objects.order_by("id").values_list("slug", flat=True)[total // 2]
+
+
+def queries(slug):
+    """
+    Consultas equivalentes com cada filtro: (nome, JOIN, is_listed).
+    """
+    join = Product.objects.filter(store__is_active=True)
+    listed = Product.objects.filter(is_listed=True)
+    last = Product.objects.order_by("-created_at", "-id").values_list(
+        "created_at", "id"
+    )[PAGE_SIZE * 10]
+    return [
+        (
+            "página por data",
+            join.order_by("created_at", "id")[:PAGE_SIZE],
+            listed.order_by("created_at", "id")[:PAGE_SIZE],
+        ),
+        (
+            "página por preço",
+            join.order_by("price", "id")[:PAGE_SIZE],
+            listed.order_by("price", "id")[:PAGE_SIZE],
+        ),
+        (
+            "fim do catálogo",
+            join.filter(created_at__gte=last[0]).order_by("created_at", "id")[
+                :PAGE_SIZE
+            ],
+            listed.filter(created_at__gte=last[0]).order_by("created_at", "id")[
+                :PAGE_SIZE
+            ],
+        ),
+        ("detalhes por slug", join.filter(slug=slug), listed.filter(slug=slug)),
+    ]
+
+
+def measure(queryset, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        list(queryset.all())
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run(total, inactive, repeat):
+    print(f"\n{total} produtos em {STORES} lojas ({inactive:.0%} inativas)")
+    with temporary_database():
+        slug = populate(total, inactive)
+        for name, join, listed in queries(slug):
+            print(f"  {name}")
+            for label, queryset in (("JOIN", join), ("is_listed", listed)):
+                plan = " | ".join(queryset.explain().splitlines())
+                print(f"    {label:<10} {plan}")
+                report(f"    {label}", measure(queryset, repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=200_000)
+    parser.add_argument("--inactive", type=float, nargs="+", default=[0.1, 0.9])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    for inactive in args.inactive:
+        run(args.products, inactive, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark da mescla de carrinhos: um get_or_create/save por item x lote.
+
+Cria um banco de teste descartável e mede a mescla de um carrinho anônimo
+com N itens num carrinho de usuário que já contém metade desses produtos,
+com o laço antigo e com merge_into_cart() (apps/cart/storage.py).
+
+Execute da RAIZ do projeto:
+    python -m benchmarks.merge_benchmark
+    python -m benchmarks.merge_benchmark --sizes 10 200 1000 --repeat 50
+"""
+
+import argparse
+import time
+
+from benchmarks.utils import report, setup_django, temporary_database
+
+setup_django()
+
+from django.db import connection, reset_queries, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.accounts.models import CustomUser, Store
+from apps.cart.models import Cart, CartItem
+from apps.cart.storage import merge_into_cart
+from apps.products.models import Product
+
+
+def populate(size):
+    owner = CustomUser.objects.create(username="bench_seller", user_type="seller")
+    store = Store.objects.create(name="Loja", owner=owner)
+    products = Product.objects.bulk_create(
+        Product(
+            name=f"Produto {i}",
+            slug=f"produto-{i}",
+            price=10,
+            store=store,
+            stock_quantity=1_000_000,
+        )
+        for i in range(size)
+    )
+    return [product.id for product in products]
+
+
+def legacy_merge(cart, items):
+    """
+    Estratégia anterior: um get_or_create e um save por item.
+    """
+    products = Product.objects.in_bulk(list(items))
+    for product_id, quantity in items.items():
+        product = products.get(product_id)
+        if product is None or not product.in_stock:
+            continue
+        user_item, _ = CartItem.objects.get_or_create(
+            cart=cart, product=product, defaults={"quantity": 0}
+        )
+        user_item.quantity = min(user_item.quantity + quantity, product.stock_quantity)
+        user_item.save()
+
+
+def measure(merge, product_ids, repeat):
+    timings = []
+    queries = 0
+    for i in range(repeat):
+        cart = Cart.objects.create(cart_code=f"B{merge.__name__[:3]}{i:07d}")
+        # Carrinho do usuário com metade dos produtos
+        CartItem.objects.bulk_create(
+            CartItem(cart=cart, product_id=product_id, quantity=1)
+            for product_id in product_ids[::2]
+        )
+        items = {product_id: 2 for product_id in product_ids}
+
+        reset_queries()
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            with transaction.atomic():
+                merge(cart, items)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = len(captured)
+    return timings, queries
+
+
+def run(size, repeat):
+    print(f"\ncarrinho com {size} itens ({connection.vendor})")
+    product_ids = populate(size)
+    for label, merge in (("laço", legacy_merge), ("lote", merge_into_cart)):
+        timings, queries = measure(merge, product_ids, repeat)
+        report(f"{label} ({queries} q)", timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 200])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with temporary_database():
+            run(size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
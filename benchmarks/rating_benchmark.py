@@ -0,0 +1,115 @@
+"""
+Benchmark da manutenção de ProductRating: agregação completa x diferença.
+
+Cria um banco de teste descartável com um produto com N avaliações e mede
+o custo de cada nova avaliação com a agregação Avg/Count antiga e com a
+atualização incremental atual (apps/reviews/ratings.py).
+
+Execute da RAIZ do projeto:
+    python -m benchmarks.rating_benchmark
+    python -m benchmarks.rating_benchmark --sizes 1000 100000 --writes 200
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.utils import report, setup_django, temporary_database
+
+setup_django()
+
+from django.db import connection
+from django.db.models import Avg, Count, signals
+
+from apps.accounts.models import CustomUser, Store
+from apps.products.models import Product
+from apps.reviews import signals as review_signals
+from apps.reviews.models import ProductRating, Review
+from apps.reviews.ratings import recompute_ratings
+
+BATCH_SIZE = 5000
+
+
+def populate(size, writes, seed=42):
+    """
+    Cria um produto com `size` avaliações e `writes` usuários sem avaliação.
+    """
+    rng = random.Random(seed)
+    owner = CustomUser.objects.create(username="bench_seller", user_type="seller")
+    store = Store.objects.create(name="Loja", owner=owner)
+    product = Product.objects.create(name="Produto", price=10, store=store)
+
+    users = []
+    for start in range(0, size + writes, BATCH_SIZE):
+        batch = [
+            CustomUser(username=f"bench_{i}", email=f"bench_{i}@example.com")
+            for i in range(start, min(start + BATCH_SIZE, size + writes))
+        ]
+        users.extend(CustomUser.objects.bulk_create(batch))
+
+    for start in range(0, size, BATCH_SIZE):
+        Review.objects.bulk_create(
+            Review(product=product, user=user, rating=rng.randint(1, 5))
+            for user in users[start : min(start + BATCH_SIZE, size)]
+        )
+    recompute_ratings([product.id])
+    return product, users[size:]
+
+
+def full_aggregation(sender, instance, **kwargs):
+    """
+    Estratégia anterior: recalcula Avg/Count de todas as avaliações.
+    """
+    stats = instance.product.reviews.aggregate(avg=Avg("rating"), total=Count("id"))
+    ProductRating.objects.update_or_create(
+        product=instance.product,
+        defaults={
+            "average_rating": stats["avg"] or 0.0,
+            "total_reviews": stats["total"],
+        },
+    )
+
+
+def measure(product, users, rng):
+    timings = []
+    for user in users:
+        start = time.perf_counter()
+        Review.objects.create(product=product, user=user, rating=rng.randint(1, 5))
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run(size, writes):
+    print(f"\n{size} avaliações no produto ({connection.vendor})")
+    product, users = populate(size, writes * 2)
+    rng = random.Random(7)
+
+    report("incremental", measure(product, users[:writes], rng))
+
+    # Troca temporariamente o signal pela agregação completa
+    signals.post_save.disconnect(
+        review_signals.update_product_rating_on_save, sender=Review
+    )
+    signals.post_save.connect(full_aggregation, sender=Review)
+    try:
+        report("agregação", measure(product, users[writes:], rng))
+    finally:
+        signals.post_save.disconnect(full_aggregation, sender=Review)
+        signals.post_save.connect(
+            review_signals.update_product_rating_on_save, sender=Review
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--writes", type=int, default=100)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with temporary_database():
+            run(size, args.writes)
+
+
+if __name__ == "__main__":
+    main()
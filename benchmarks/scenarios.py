@@ -0,0 +1,188 @@
+"""
+Cenários de carga da API, os mesmos de tests/test_api.py.
+
+Os cenários recebem um cliente (ver api_benchmark.py) com o método
+request(method, path, data=None, token=None, expected=...) que retorna o
+JSON da resposta e levanta ScenarioError quando o status não é o esperado.
+Assim a mesma jornada é executada pelo cliente de testes do Django ou
+contra um servidor em execução.
+"""
+
+import itertools
+import sys
+from urllib.parse import urlsplit
+
+PASSWORD = "Test@123"
+SHIPPING_ADDRESS = "Rua das Acácias, 123, Luanda, Talatona, Angola"
+SEARCH_QUERY = "benchmark"
+
+
+class ScenarioError(Exception):
+    """
+    Uma requisição do cenário retornou um status inesperado.
+    """
+
+    def __init__(self, method, path, status, body=""):
+        super().__init__(f"{method} {path} retornou {status}: {body[:200]}")
+        self.status = status
+
+
+class MarketplaceContext:
+    """
+    Dados criados na preparação e compartilhados pelos usuários virtuais.
+    """
+
+    def __init__(self, run_id, products):
+        self.run_id = run_id
+        self.products = products  # [{"id": ..., "slug": ...}]
+
+
+def _user_data(username, user_type):
+    return {
+        "username": username,
+        "email": f"{username}@test.com",
+        "password": PASSWORD,
+        "confirm_password": PASSWORD,
+        "first_name": "Benchmark",
+        "last_name": "Teste",
+        "user_type": user_type,
+    }
+
+
+def register_and_login(client, username, user_type="buyer"):
+    """
+    Registra um usuário e retorna o JSON do login (access, user, ...).
+    """
+    client.request("POST", "/api/v1/auth/register/", _user_data(username, user_type))
+    return client.request(
+        "POST",
+        "/api/v1/auth/token/",
+        {"username": username, "password": PASSWORD},
+    )
+
+
+def setup_marketplace(client, run_id, products=10, stock=1_000_000):
+    """
+    Cria o vendedor aprovado, a loja e os produtos usados pelas jornadas.
+    """
+    seller = register_and_login(client, f"bench_seller_{run_id}", "seller")
+    admin = register_and_login(client, f"bench_admin_{run_id}", "admin")
+    client.request(
+        "POST",
+        f"/api/v1/auth/admin/approve-seller/{seller['user']['id']}/",
+        token=admin["access"],
+    )
+    client.request(
+        "POST",
+        "/api/v1/auth/store/create/",
+        {"name": f"Loja Benchmark {run_id}", "description": "Loja do benchmark"},
+        token=seller["access"],
+    )
+
+    for index in range(products):
+        client.request(
+            "POST",
+            "/api/v1/products/seller/create/",
+            {
+                "name": f"Produto Benchmark {run_id} {index}",
+                "description": "Produto criado pelo benchmark da API",
+                "price": "1500.00",
+                "stock_quantity": stock,
+                "in_stock": True,
+            },
+            token=seller["access"],
+        )
+
+    # A criação não retorna id e slug; lidos da lista paginada do vendedor
+    created = []
+    path = "/api/v1/products/seller/?page_size=100"
+    while path:
+        page = client.request("GET", path, token=seller["access"])
+        created.extend(
+            {"id": product["id"], "slug": product["slug"]}
+            for product in page["results"]
+        )
+        path = (
+            page["next"]
+            and urlsplit(page["next"])._replace(scheme="", netloc="").geturl()
+        )
+    return MarketplaceContext(run_id, created)
+
+
+def buyer_journey(client, token, product):
+    """
+    Navegação -> carrinho anônimo -> mescla -> checkout -> avaliação.
+    """
+    # Navegação
+    client.request("GET", "/api/v1/products/")
+    client.request("GET", "/api/v1/products/categories/")
+    client.request("GET", f"/api/v1/products/search/?query={SEARCH_QUERY}")
+    client.request("GET", f"/api/v1/products/{product['slug']}/")
+    client.request("GET", f"/api/v1/reviews/product/{product['id']}/", token=token)
+
+    # Carrinho anônimo
+    cart_code = client.request("POST", "/api/v1/cart/create/")["cart_code"]
+    client.request(
+        "POST",
+        "/api/v1/cart/add/",
+        {"cart_code": cart_code, "product_id": product["id"], "quantity": 2},
+    )
+    client.request("GET", f"/api/v1/cart/{cart_code}/")
+
+    # Mescla com o carrinho do usuário
+    client.request("POST", "/api/v1/cart/create-user/", token=token)
+    client.request(
+        "POST", "/api/v1/cart/merge/", {"temp_cart_code": cart_code}, token=token
+    )
+    user_cart = client.request("GET", "/api/v1/cart/user/", token=token)
+
+    # Checkout
+    order = client.request(
+        "POST",
+        "/api/v1/orders/create/",
+        {
+            "cart_code": user_cart["cart_code"],
+            "shipping_address": SHIPPING_ADDRESS,
+            "payment_method": "reference",
+        },
+        token=token,
+    )["order"]
+    client.request("GET", "/api/v1/orders/", token=token)
+    client.request("GET", f"/api/v1/orders/{order['order_number']}/", token=token)
+
+    # Avaliação (400 quando o comprador já avaliou o produto)
+    client.request(
+        "POST",
+        "/api/v1/reviews/add/",
+        {"product_id": product["id"], "rating": 5, "comment": "Benchmark"},
+        token=token,
+        expected=(201, 400),
+    )
+
+
+def virtual_user(client, context, number, iterations, should_stop=None):
+    """
+    Executa as jornadas de um comprador, alternando entre os produtos.
+    Com iterations=None executa até should_stop() retornar True.
+
+    Returns:
+        tuple: (jornadas concluídas, jornadas com erro)
+    """
+    login = register_and_login(client, f"bench_buyer_{context.run_id}_{number}")
+    products = itertools.islice(
+        itertools.cycle(context.products), number, None
+    )  # usuários diferentes começam por produtos diferentes
+    completed = failed = 0
+    rounds = itertools.count() if iterations is None else range(iterations)
+    for _ in rounds:
+        if should_stop is not None and should_stop():
+            break
+        try:
+            buyer_journey(client, login["access"], next(products))
+        except ScenarioError as error:
+            if not failed:
+                print(f"usuário {number}: {error}", file=sys.stderr)
+            failed += 1
+        else:
+            completed += 1
+    return completed, failed
@@ -0,0 +1,131 @@
+"""
+Benchmark da busca de produtos: icontains x índice invertido x PostgreSQL.
+
+Cria um banco de teste descartável (o banco configurado não é alterado),
+insere N produtos sintéticos e mede a latência de cada backend para um
+conjunto de consultas.
+
+Execute da RAIZ do projeto:
+    python -m benchmarks.search_benchmark
+    python -m benchmarks.search_benchmark --sizes 10000 100000 1000000 --repeat 20
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.utils import report, setup_django, temporary_database
+
+setup_django()
+
+from django.db import connection
+
+from apps.accounts.models import CustomUser, Store
+from apps.products.models import Category, Product
+from apps.products.search import (
+    IContainsSearchBackend,
+    InvertedIndexBackend,
+    PostgresSearchBackend,
+)
+
+WORDS = (
+    "telemóvel portátil computador carregador cabo auscultadores teclado rato "
+    "monitor impressora cadeira mesa candeeiro camisola calças sapatos mochila "
+    "livro caderno caneta garrafa panela frigideira toalha lençol almofada "
+    "relógio óculos perfume sabonete champô bola bicicleta capacete"
+).split()
+ADJECTIVES = (
+    "novo usado preto branco azul vermelho grande pequeno leve resistente "
+    "original barato premium compacto sem fio recarregável"
+).split()
+CATEGORIES = ("Eletrônicos", "Roupas", "Livros", "Móveis", "Casa", "Desporto")
+QUERIES = ("portátil", "cabo usb", "cadeiras", "eletronicos", "sapatos pretos", "xyz")
+BATCH_SIZE = 5000
+
+
+def populate(size, seed=42):
+    """
+    Insere `size` produtos sintéticos distribuídos entre algumas lojas.
+    """
+    rng = random.Random(seed)
+    categories = [Category.objects.create(name=name) for name in CATEGORIES]
+    stores = []
+    for i in range(20):
+        owner = CustomUser.objects.create(
+            username=f"bench_seller_{i}",
+            email=f"bench{i}@example.com",
+            user_type="seller",
+        )
+        stores.append(Store.objects.create(name=f"Loja {i}", owner=owner))
+
+    batch = []
+    for i in range(size):
+        name = f"{rng.choice(WORDS).capitalize()} {rng.choice(ADJECTIVES)} {i}"
+        description = " ".join(rng.choice(WORDS + ADJECTIVES) for _ in range(20))
+        batch.append(
+            Product(
+                name=name,
+                description=description,
+                slug=f"produto-{i}",
+                price=rng.randint(100, 100000),
+                category=rng.choice(categories),
+                store=rng.choice(stores),
+            )
+        )
+        if len(batch) == BATCH_SIZE:
+            Product.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Product.objects.bulk_create(batch)
+
+
+def measure(backend, repeat, limit):
+    """
+    Retorna as latências (ms) de todas as consultas executadas.
+    """
+    timings = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            backend.search(query, limit)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run(size, repeat, limit):
+    print(f"\n{size} produtos ({connection.vendor})")
+    start = time.perf_counter()
+    populate(size)
+    print(f"  dados inseridos em {time.perf_counter() - start:.1f} s")
+
+    backends = [("icontains", IContainsSearchBackend())]
+
+    index = InvertedIndexBackend()
+    start = time.perf_counter()
+    index.rank("")  # Força a construção do índice
+    print(f"  índice invertido construído em {time.perf_counter() - start:.1f} s")
+    backends.append(("inverted_index", index))
+
+    if connection.vendor == "postgresql":
+        backends.append(("postgres", PostgresSearchBackend()))
+
+    for label, backend in backends:
+        backend.search(QUERIES[0], limit)  # Aquecimento
+        report(label, measure(backend, repeat, limit))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    # Um banco novo por tamanho, descartado ao final
+    for size in args.sizes:
+        with temporary_database():
+            run(size, args.repeat, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Benchmark dos pedidos da loja: listas IN + OFFSET x EXISTS + cursor.
+
+Cria um banco de teste descartável com uma loja com N pedidos (e outros N
+pedidos de outra loja, metade deles mistos) e mede uma página de 20
+pedidos no início e no fim da lista:
+- IN + OFFSET: a consulta anterior de get_store_orders (ids dos produtos e
+  dos pedidos em subconsultas IN, todos os itens de cada pedido), paginada
+  com OFFSET
+- EXISTS + cursor: get_store_orders atual (EXISTS correlacionado, cursor
+  em (created_at, id) e apenas os itens da loja)
+
+Execute da RAIZ do projeto:
+    python -m benchmarks.store_orders_benchmark
+    python -m benchmarks.store_orders_benchmark --orders 100000 --repeat 20
+"""
+
+import argparse
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.utils import report, setup_django, temporary_database
+
+setup_django()
+
+from django.test.utils import setup_test_environment
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.accounts.models import CustomUser, Store
+from apps.orders.models import Order, OrderItem
+from apps.orders.pagination import OrderCursorPagination
+from apps.orders.serializers import OrderSerializer
+from apps.orders.views import get_store_orders
+from apps.products.models import Product
+
+BATCH_SIZE = 5000
+PAGE_SIZE = 20
+
+
+def populate(total):
+    buyer = CustomUser.objects.create(
+        username="bench_buyer", email="bench_buyer@example.com"
+    )
+    stores = []
+    for name in ("loja", "outra"):
+        seller = CustomUser.objects.create(
+            username=f"bench_{name}", email=f"{name}@example.com", user_type="seller"
+        )
+        store = Store.objects.create(name=f"Loja {name}", owner=seller)
+        products = Product.objects.bulk_create(
+            Product(name=f"{name} {i}", slug=f"{name}-{i}", price=10, store=store)
+            for i in range(100)
+        )
+        stores.append((seller, products))
+    (seller, products), (_, other_products) = stores
+
+    # Pedidos intercalados: da loja (com um item de outra loja a cada dois)
+    # e só de outra loja
+    for start in range(0, 2 * total, BATCH_SIZE):
+        orders = Order.objects.bulk_create(
+            Order(
+                order_number=f"ORD-{i:08d}",
+                user=buyer,
+                total_amount=20,
+                shipping_address="Rua 1",
+            )
+            for i in range(start, min(start + BATCH_SIZE, 2 * total))
+        )
+        items = []
+        for order in orders:
+            if order.id % 2:
+                product = products[order.id % 100]
+                items.append(
+                    OrderItem(order=order, product=product, quantity=1, price=10)
+                )
+            if order.id % 4 != 1:
+                product = other_products[order.id % 100]
+                items.append(
+                    OrderItem(order=order, product=product, quantity=1, price=10)
+                )
+        OrderItem.objects.bulk_create(items)
+    return seller
+
+
+def legacy_page(store, offset):
+    store_products = store.products.values_list("id", flat=True)
+    order_items = OrderItem.objects.filter(product_id__in=store_products)
+    order_ids = order_items.values_list("order_id", flat=True).distinct()
+    orders = OrderSerializer.setup_eager_loading(
+        Order.objects.filter(id__in=order_ids).order_by("-created_at")
+    )
+    return OrderSerializer(orders[offset : offset + PAGE_SIZE], many=True).data
+
+
+def cursor_page(seller, cursor):
+    request = APIRequestFactory().get(
+        "/api/v1/orders/seller/orders/", {"page_size": PAGE_SIZE, "cursor": cursor}
+    )
+    force_authenticate(request, seller)
+    response = get_store_orders(request)
+    assert response.status_code == 200, response.data
+    return response.data["results"]
+
+
+def deep_cursor(seller):
+    """
+    Cursor da última página, como o "next" da penúltima.
+    """
+    orders = Order.objects.filter(items__product__store=seller.store).distinct()
+    last = orders.order_by("created_at", "id")[PAGE_SIZE]
+    paginator = OrderCursorPagination()
+    paginator.ordering = paginator.default_ordering
+    paginator.base_url = "/"
+    link = paginator.encode_cursor(last, reverse=False)
+    return parse_qs(urlsplit(link).query)["cursor"][0]
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = function()
+        timings.append((time.perf_counter() - start) * 1000)
+    assert len(rows) == PAGE_SIZE, len(rows)
+    return timings
+
+
+def run(total, repeat):
+    seller = populate(total)
+    store = seller.store
+    store_orders = Order.objects.filter(items__product__store=store).distinct()
+    last_offset = store_orders.count() - PAGE_SIZE
+    print(f"\nloja com {last_offset + PAGE_SIZE} pedidos de {Order.objects.count()}")
+
+    cursor = deep_cursor(seller)
+    report("IN + OFFSET 1ª", measure(lambda: legacy_page(store, 0), repeat))
+    report("IN + OFFSET fim", measure(lambda: legacy_page(store, last_offset), repeat))
+    report("EXISTS 1ª", measure(lambda: cursor_page(seller, ""), repeat))
+    report("EXISTS fim", measure(lambda: cursor_page(seller, cursor), repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    for total in args.orders:
+        with temporary_database():
+            run(total, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
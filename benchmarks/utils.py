@@ -0,0 +1,59 @@
+"""
+Utilitários comuns dos benchmarks.
+"""
+
+import math
+import os
+import statistics
+import sys
+from contextlib import contextmanager
+
+
+def setup_django():
+    """
+    Configura o Django quando o benchmark é executado como script.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecommerce.settings")
+
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+@contextmanager
+def temporary_database():
+    """
+    Cria um banco de teste descartável; o banco configurado não é alterado.
+    """
+    from django.db import connection
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def percentile(ordered, fraction):
+    """
+    Percentil (método nearest-rank) de uma lista já ordenada.
+    """
+    return ordered[max(math.ceil(len(ordered) * fraction) - 1, 0)]
+
+
+def report(label, timings):
+    """
+    Imprime média, p50 e p95 das latências (ms).
+    """
+    ordered = sorted(timings)
+    p95 = percentile(ordered, 0.95)
+    print(
+        f"  {label:<16} média {statistics.mean(ordered):9.3f} ms"
+        f"   p50 {statistics.median(ordered):9.3f} ms   p95 {p95:9.3f} ms"
+    )
@@ -1,6 +1,7 @@
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import sys
 
 load_dotenv()
 
@@ -17,6 +18,21 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv("DEBUG", "False").lower() in ("true", "1", "yes")
 
+# Execução da suíte de testes (python manage.py test)
+RUNNING_TESTS = sys.argv[1:2] == ["test"]
+
+# Modo simulação do pagamento (sempre ativo nos testes)
+TESTING = RUNNING_TESTS or os.getenv("TESTING", "False").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+
+# Gateway de pagamento (apps/orders/gateways.py): "simulator" ou o caminho
+# de uma classe. O segredo assina as notificações do webhook do gateway
+PAYMENT_GATEWAY = os.getenv("PAYMENT_GATEWAY", "simulator")
+PAYMENT_WEBHOOK_SECRET = os.getenv("PAYMENT_WEBHOOK_SECRET", "")
+
 ALLOWED_HOSTS = [
     host.strip() for host in os.getenv("ALLOWED_HOSTS", "").split(",") if host.strip()
 ]
@@ -43,6 +59,7 @@ THIRDS_APPs = [
 ]
 
 LOCAL_APPS = [
+    "apps.core.apps.CoreConfig",
     "apps.accounts.apps.AccountsConfig",
     "apps.products.apps.ProductsConfig",
     "apps.cart.apps.CartConfig",
@@ -54,6 +71,8 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRDS_APPs + LOCAL_APPS
 
 MIDDLEWARE = [
+    # Primeiro, para medir a requisição inteira (desativado sem METRICS_ENABLED)
+    "apps.core.middleware.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -96,6 +115,112 @@ DATABASES = {
 }
 
 
+# Cache
+# Com REDIS_URL definido usa o Redis (django-redis); nos testes e sem Redis
+# configurado usa a memória local do processo.
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL and not RUNNING_TESTS:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
+            "KEY_PREFIX": "ecommerce",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "ecommerce",
+        }
+    }
+
+# Tempo (segundos) dos detalhes de produto em cache
+PRODUCT_DETAIL_CACHE_TIMEOUT = int(os.getenv("PRODUCT_DETAIL_CACHE_TIMEOUT", 60 * 15))
+
+# Tempo (segundos) do usuário autenticado em cache (apps/accounts/authentication.py)
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", 60))
+# Autenticação a partir dos claims do token, sem ler o usuário do banco.
+# Requer um cache compartilhado pelos processos (REDIS_URL): com o cache em
+# memória local, a desativação ou a troca de tipo de um usuário não chega
+# aos outros workers. Nos testes (um processo) fica ativa
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv(
+    "AUTH_TRUST_TOKEN_CLAIMS", str(RUNNING_TESTS or bool(REDIS_URL))
+).lower() in ("true", "1", "yes")
+# Validadores do GET condicional a partir de versões guardadas no cache
+# (apps/products/views.py). Também requer um cache compartilhado: com o
+# cache em memória local cada worker tem as suas versões e poderia
+# responder 304 a um cliente com dados antigos. Desativados, a listagem e
+# os detalhes de produtos e o detalhe da categoria respondem sem validadores
+CONDITIONAL_GET_CACHE_VALIDATORS = os.getenv(
+    "CONDITIONAL_GET_CACHE_VALIDATORS", str(RUNNING_TESTS or bool(REDIS_URL))
+).lower() in ("true", "1", "yes")
+
+# Filtro de Bloom na frente da blacklist de tokens refresh
+# (apps/accounts/blacklist.py): "redis" (requer REDIS_URL), "memory" (na
+# memória do processo; só com um único processo, como nos testes) ou "none"
+# (consulta sempre o banco). Capacidade: tokens bloqueados por dia de expiração
+TOKEN_BLACKLIST_FILTER = os.getenv(
+    "TOKEN_BLACKLIST_FILTER",
+    "memory" if RUNNING_TESTS else ("redis" if REDIS_URL else "none"),
+)
+TOKEN_BLACKLIST_BLOOM_CAPACITY = int(
+    os.getenv("TOKEN_BLACKLIST_BLOOM_CAPACITY", 100_000)
+)
+
+# Cache stale-while-revalidate das listagens públicas do catálogo
+# (apps/core/response_cache.py): segundos em que a resposta é fresca, até
+# ser removida do cache e de espera máxima pelo recálculo de outra requisição
+RESPONSE_CACHE_SOFT_TTL = int(os.getenv("RESPONSE_CACHE_SOFT_TTL", 30))
+RESPONSE_CACHE_HARD_TTL = int(os.getenv("RESPONSE_CACHE_HARD_TTL", 60 * 10))
+RESPONSE_CACHE_LOCK_TIMEOUT = int(os.getenv("RESPONSE_CACHE_LOCK_TIMEOUT", 10))
+# Nos testes o recálculo de entradas vencidas é feito na própria requisição
+RESPONSE_CACHE_BACKGROUND_REFRESH = not RUNNING_TESTS
+
+# Fila de tarefas em segundo plano (apps/core/tasks.py): espera com a fila
+# vazia, tentativas e espera exponencial entre elas (segundos). Nos testes
+# as tarefas são executadas na hora, dentro da requisição
+TASK_QUEUE_EAGER = RUNNING_TESTS or os.getenv("TASK_QUEUE_EAGER", "False").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+TASK_POLL_INTERVAL = float(os.getenv("TASK_POLL_INTERVAL", 1))
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", 5))
+TASK_RETRY_DELAY = int(os.getenv("TASK_RETRY_DELAY", 10))
+TASK_RETRY_MAX_DELAY = int(os.getenv("TASK_RETRY_MAX_DELAY", 60 * 60))
+
+# Linhas lidas do banco por lote nas exportações em streaming (CSV/NDJSON)
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
+
+# Backend da busca de produtos: "auto" usa o full-text do PostgreSQL quando
+# disponível e o índice invertido em memória nos demais bancos
+PRODUCT_SEARCH_BACKEND = os.getenv("PRODUCT_SEARCH_BACKEND", "auto")
+
+# Limites (Kz) das faixas da faceta de preço do catálogo
+# (apps/products/facets.py): [0, 10.000), [10.000, 25.000), ..., [500.000, sem limite)
+PRODUCT_PRICE_FACET_RANGES = [
+    int(limit)
+    for limit in os.getenv(
+        "PRODUCT_PRICE_FACET_RANGES", "0,10000,25000,50000,100000,250000,500000"
+    ).split(",")
+]
+
+# Armazenamento dos carrinhos anônimos: "database", "redis" (requer
+# REDIS_URL) ou "cache". Fora do banco expiram após CART_STORAGE_TTL segundos
+CART_STORAGE_BACKEND = os.getenv("CART_STORAGE_BACKEND", "database")
+CART_STORAGE_TTL = int(os.getenv("CART_STORAGE_TTL", 60 * 60 * 24 * 7))
+
+# Métricas por rota (latência, queries, tempo de banco) expostas em /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "False").lower() in ("true", "1", "yes")
+# Token exigido em /metrics (Authorization: Bearer <token>); vazio, o
+# endpoint fica fechado
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -154,11 +279,22 @@ AUTH_USER_MODEL = "accounts.CustomUser"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # JWT com o usuário montado a partir dos claims do token
+        "apps.accounts.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # JSON com orjson quando instalado (apps/core/renderers.py e parsers.py)
+    "DEFAULT_RENDERER_CLASSES": [
+        "apps.core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "apps.core.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_FILTER_BACKENDS": [
@@ -237,6 +373,8 @@ CORS_ALLOW_HEADERS = [
     "authorization",
     "content-type",
     "dnt",
+    # Checkout idempotente (apps/orders/views.py)
+    "idempotency-key",
     "origin",
     "user-agent",
     "x-csrftoken",
@@ -253,8 +391,15 @@ CORS_ALLOW_METHODS = [
     "PUT",
 ]
 
-# Expor headers específicos ao frontend
-CORS_EXPOSE_HEADERS = ["Content-Type", "X-CSRFToken"]
+# Expor headers específicos ao frontend (ETag e Last-Modified para o GET
+# condicional com If-None-Match / If-Modified-Since)
+CORS_EXPOSE_HEADERS = [
+    "Content-Type",
+    "X-CSRFToken",
+    "Idempotent-Replayed",
+    "ETag",
+    "Last-Modified",
+]
 
 APPEND_SLASH = True
 
@@ -200,6 +200,7 @@ def create_test_data():
     print("  1. Executar: python test_api_completo.py")
     print("  2. Acessar: http://localhost:8000/api/docs/")
     print("  3. Testar com Postman/Thunder Client")
+    print("  4. Gerar dados em volume: python manage.py seed_data")
     print("\n")
 
 
@@ -490,6 +490,14 @@ class APITester:
                     headers=headers,
                 )
 
+                # Acompanhar o pagamento (processado pela fila de tarefas)
+                self.test(
+                    "Obter Pagamento do Pedido",
+                    "GET",
+                    f"{BASE_URL}/api/v1/orders/{self.order_number}/payment/",
+                    headers=headers,
+                )
+
     def test_reviews(self):
         """Testa avaliações"""
         if not self.buyer_token or not self.product_id: